@@ -1,9 +1,13 @@
 import os, threading, asyncio, json
-from flask import Flask, render_template, request, jsonify, abort, session
+from flask import Flask, render_template, request, jsonify, abort, session, Response, stream_with_context
 import jwt
 from datetime import datetime, timedelta
 from chatbot.database import auth_user, init_db
+from chatbot.chat_logger import detect_preference_intent, log_chat_message, chat_log_writer
+from chatbot.response_cache import response_cache
+from chatbot.single_flight import general_question_flight
 from chatbot.mcp.client_sse import InteractiveBankingAssistant
+from chatbot.mcp.session_manager import AssistantSessionManager
 from preference_analyzer import PreferenceAnalyzer
 
 # Initialize Flask app pointing to local templates/ and static/
@@ -17,6 +21,9 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 60
 # Instantiate & initialize the agent at startup
 assistant = InteractiveBankingAssistant()
 
+# One conversation context per user, all sharing the agent's MCP connection
+session_manager = AssistantSessionManager(assistant)
+
 # Instantiate preference analyzer
 preference_analyzer = PreferenceAnalyzer()
 
@@ -73,7 +80,6 @@ def auth_login():
 @app.route("/chat", methods=["POST"])
 def chat():
     import time
-    import sqlite3
     
     # Mesurer le temps de début
     start_time = time.time()
@@ -90,31 +96,16 @@ def chat():
     if not msg:
         return jsonify({"reply": "💡 I didn't get any text."}), 400
 
-    # Variables pour la base de données
-    conversation_id = None
-    intent_detected = None
-    confidence_score = 0.0
     bot_response = ""
 
-    try:
-        # 🆕 ANALYSER LES PRÉFÉRENCES AVANT DE RÉPONDRE
-        detected_prefs = preference_analyzer.analyze_message(user, msg)
-        if detected_prefs:
-            print(f"🔍 Préférences détectées pour {user}: {detected_prefs}")
-            # Vous pourriez extraire l'intent principal ici si votre analyzer le fournit
-            if detected_prefs:
-                # Prendre la première préférence comme intent principal
-                first_pref = next(iter(detected_prefs.items()))
-                intent_detected = f"{first_pref[0]}:{first_pref[1]}"
-                confidence_score = 0.7  # ou une valeur basée sur votre logique
-        
-    except Exception as e:
-        print(f"⚠️  Erreur analyse préférences: {e}")
+    # 🆕 ANALYSER LES PRÉFÉRENCES AVANT DE RÉPONDRE
+    intent_detected, confidence_score = detect_preference_intent(preference_analyzer, user, msg)
 
     try:
         # Schedule your send_message onto the background loop
+        user_assistant = session_manager.get(user)
         future = asyncio.run_coroutine_threadsafe(
-            assistant.send_message(msg),
+            user_assistant.send_message(msg),
             background_loop
         )
         result = future.result(timeout=30)   # wait up to 30s
@@ -134,66 +125,65 @@ def chat():
     response_time = time.time() - start_time
     
     # 🆕 SAUVEGARDER DANS LA BASE DE DONNÉES
-    try:
-        conn = sqlite3.connect('General_DB.db')
-        cursor = conn.cursor()
-        
-        # D'abord, obtenir ou créer une conversation_id pour cet utilisateur
-        # (vous pourriez vouloir une logique plus sophistiquée ici)
-        cursor.execute("""
-            SELECT id FROM chat_conversations 
-            WHERE user_id = ? 
-            ORDER BY created_at DESC 
-            LIMIT 1
-        """, (user,))
-        
-        conv_result = cursor.fetchone()
-        if conv_result:
-            conversation_id = conv_result[0]
-        else:
-            # Créer une nouvelle conversation si nécessaire
-            cursor.execute("""
-                INSERT INTO chat_conversations (user_id, created_at)
-                VALUES (?, CURRENT_TIMESTAMP)
-            """, (user,))
-            conversation_id = cursor.lastrowid
-        
-        # Insérer le message dans chat_messages
-        cursor.execute("""
-            INSERT INTO chat_messages (
-                conversation_id, 
-                user_message, 
-                bot_response, 
-                intent_detected, 
-                confidence_score, 
-                response_time,
-                timestamp
-            ) VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
-        """, (
-            conversation_id,
-            msg,
-            bot_response,
-            intent_detected,
-            confidence_score,
-            response_time
-        ))
-        
-        conn.commit()
-        conn.close()
-        
-        print(f"💾 Message sauvegardé - User: {user}, Intent: {intent_detected}, Time: {response_time:.2f}s")
-        
-    except Exception as e:
-        print(f"❌ Erreur sauvegarde DB: {e}")
-        # Ne pas faire échouer la requête si la DB échoue
+    log_chat_message(user, msg, bot_response, intent_detected, confidence_score, response_time)
     
     # Retourner la réponse comme avant
-    if isinstance(result, str):
-        return jsonify({"reply": result})
-    elif isinstance(result, dict) and "error" in result:
-        return jsonify({"reply": result["error"]})
-    else:
-        return jsonify({"reply": json.dumps(result, indent=2)})
+    return jsonify({"reply": bot_response})
+
+async def _next_stream_event(stream):
+    """Return the next event of an async generator, or None when it is exhausted."""
+    try:
+        return await stream.__anext__()
+    except StopAsyncIteration:
+        return None
+
+
+@app.route("/chat/stream", methods=["POST"])
+def chat_stream():
+    """Same as /chat, but streams the reply as Server-Sent Events."""
+    import time
+    
+    start_time = time.time()
+    
+    auth_header = request.headers.get("Authorization", "")
+    if not auth_header.startswith("Bearer "):
+        return jsonify({"reply": "🔒 Please login to continue."}), 401
+    token = auth_header.split(" ", 1)[1]
+    user = verify_access_token(token)
+
+    msg = request.json.get("message", "").strip()
+    if not msg:
+        return jsonify({"reply": "💡 I didn't get any text."}), 400
+
+    intent_detected, confidence_score = detect_preference_intent(preference_analyzer, user, msg)
+    stream = session_manager.get(user).send_message_stream(msg)
+
+    def generate():
+        bot_response = ""
+        while True:
+            try:
+                event = asyncio.run_coroutine_threadsafe(
+                    _next_stream_event(stream),
+                    background_loop
+                ).result(timeout=30)
+            except Exception as e:
+                event = {"type": "done", "content": f"❌ Internal error: {e}"}
+            if event is None:
+                break
+            if event["type"] == "done":
+                bot_response = event["content"]
+            yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+            if event["type"] == "done":
+                break
+        
+        response_time = time.time() - start_time
+        log_chat_message(user, msg, bot_response, intent_detected, confidence_score, response_time)
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @app.route('/api/user/preferences/test', methods=['POST'])
 def add_test_preferences():
@@ -441,6 +431,39 @@ def get_preferences_stats():
             'error': str(e),
             'status': 'error'
         })
+
+@app.route('/api/debug/chat-log-stats')
+def get_chat_log_stats():
+    """Métriques du writer de logs (profondeur de file, latence des flush)"""
+    return jsonify({
+        **chat_log_writer.stats(),
+        'status': 'success'
+    })
+
+@app.route('/api/debug/response-cache-stats')
+def get_response_cache_stats():
+    """Taux de hit du cache de réponses et latence économisée"""
+    return jsonify({
+        **response_cache.stats(),
+        'status': 'success'
+    })
+
+@app.route('/api/debug/coalescing-stats')
+def get_coalescing_stats():
+    """Requêtes LLM identiques regroupées en un seul appel"""
+    return jsonify({
+        **general_question_flight.stats(),
+        'status': 'success'
+    })
+
+@app.route('/api/debug/mcp-stats')
+def get_mcp_stats():
+    """Sessions MCP connectées, reconnexions et latence par outil"""
+    stats = assistant.session.stats() if assistant.session else {'connected': 0}
+    return jsonify({
+        **stats,
+        'status': 'success'
+    })
         
 if __name__ == "__main__":
     init_db()
@@ -0,0 +1,161 @@
+"""ASGI (Quart) serving mode for the chat app.
+
+Same /auth/login and /chat API as app.py, but /chat awaits the assistant
+directly on the server event loop instead of blocking a worker thread on a
+future. Preference analysis runs in worker threads and chat logging is
+handed to the background chat log writer.
+
+Run with:  hypercorn asgi_app:app --bind 0.0.0.0:3001
+"""
+import os, asyncio, json, time
+from datetime import datetime, timedelta
+import jwt
+from quart import Quart, render_template, request, jsonify, Response
+from chatbot.database import auth_user, init_db
+from chatbot.chat_logger import detect_preference_intent, log_chat_message, chat_log_writer
+from chatbot.llm_transport import close_clients
+from chatbot.mcp.client_sse import InteractiveBankingAssistant
+from chatbot.mcp.session_manager import AssistantSessionManager
+from preference_analyzer import PreferenceAnalyzer
+
+app = Quart(__name__, template_folder="templates", static_folder="static")
+
+# JWT configuration (shared with app.py)
+SECRET_KEY = os.getenv("SECRET_KEY", "your_secret_key")
+ALGORITHM = "HS256"
+ACCESS_TOKEN_EXPIRE_MINUTES = 60
+CHAT_TIMEOUT_SECONDS = 30
+
+assistant = InteractiveBankingAssistant()
+session_manager = AssistantSessionManager(assistant)
+preference_analyzer = PreferenceAnalyzer()
+
+
+@app.before_serving
+async def startup():
+    await asyncio.to_thread(init_db)
+    await assistant.initialize_session()
+
+
+@app.after_serving
+async def shutdown():
+    await assistant.close_session()
+    await asyncio.to_thread(chat_log_writer.close)
+    await asyncio.to_thread(close_clients)
+
+
+def create_access_token(username: str) -> str:
+    expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    payload = {"sub": username, "exp": expire}
+    return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
+
+
+def authenticated_user():
+    """Return the JWT subject of the current request, or None if not authenticated."""
+    auth_header = request.headers.get("Authorization", "")
+    if not auth_header.startswith("Bearer "):
+        return None
+    token = auth_header.split(" ", 1)[1]
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except jwt.InvalidTokenError:
+        return None
+    return payload.get("sub")
+
+
+@app.route("/", methods=["GET"])
+async def index():
+    return await render_template("chat.html")
+
+
+@app.route("/auth/login", methods=["POST"])
+async def auth_login():
+    data = await request.get_json() or {}
+    username = data.get("username")
+    password = data.get("password")
+    if not username or not password:
+        return jsonify({"status": "fail", "error": 'Missing "username" or "password"'}), 400
+
+    if not await asyncio.to_thread(auth_user, username, password):
+        return jsonify({"status": "fail"}), 401
+
+    token = create_access_token(username)
+    return jsonify({"status": "success", "access_token": token, "token_type": "bearer"}), 200
+
+
+@app.route("/chat", methods=["POST"])
+async def chat():
+    start_time = time.time()
+
+    user = authenticated_user()
+    if not user:
+        return jsonify({"reply": "🔒 Please login to continue."}), 401
+
+    data = await request.get_json() or {}
+    msg = data.get("message", "").strip()
+    if not msg:
+        return jsonify({"reply": "💡 I didn't get any text."}), 400
+
+    # Preference analysis hits SQLite: keep it off the event loop
+    intent_detected, confidence_score = await asyncio.to_thread(
+        detect_preference_intent, preference_analyzer, user, msg
+    )
+
+    try:
+        result = await asyncio.wait_for(
+            session_manager.get(user).send_message(msg),
+            timeout=CHAT_TIMEOUT_SECONDS
+        )
+        if isinstance(result, str):
+            bot_response = result
+        elif isinstance(result, dict) and "error" in result:
+            bot_response = result["error"]
+        else:
+            bot_response = json.dumps(result, indent=2)
+    except Exception as e:
+        bot_response = f"❌ Internal error: {e}"
+
+    response_time = time.time() - start_time
+
+    # Enqueued only: the background writer does the SQLite work
+    log_chat_message(user, msg, bot_response, intent_detected, confidence_score, response_time)
+
+    return jsonify({"reply": bot_response})
+
+
+@app.route("/chat/stream", methods=["POST"])
+async def chat_stream():
+    """Same as /chat, but streams the reply as Server-Sent Events."""
+    start_time = time.time()
+
+    user = authenticated_user()
+    if not user:
+        return jsonify({"reply": "🔒 Please login to continue."}), 401
+
+    data = await request.get_json() or {}
+    msg = data.get("message", "").strip()
+    if not msg:
+        return jsonify({"reply": "💡 I didn't get any text."}), 400
+
+    intent_detected, confidence_score = await asyncio.to_thread(
+        detect_preference_intent, preference_analyzer, user, msg
+    )
+
+    async def generate():
+        bot_response = ""
+        async for event in session_manager.get(user).send_message_stream(msg):
+            if event["type"] == "done":
+                bot_response = event["content"]
+            yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+        response_time = time.time() - start_time
+        log_chat_message(user, msg, bot_response, intent_detected, confidence_score, response_time)
+
+    return Response(
+        generate(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+if __name__ == "__main__":
+    app.run(host="0.0.0.0", port=3001)
@@ -6,6 +6,8 @@ from datetime import datetime, timedelta
 import json
 import os
 from functools import wraps
+from chatbot.config import GENERAL_DB_FILE
+from chatbot.db_pool import connect
 
 app = Flask(__name__)
 app.secret_key = 'your-secret-key-change-this'
@@ -24,7 +26,7 @@ class AdminUser(UserMixin):
 
 @login_manager.user_loader
 def load_user(user_id):
-    conn = sqlite3.connect('General_DB.db')
+    conn = connect(GENERAL_DB_FILE)
     cursor = conn.cursor()
     cursor.execute('SELECT * FROM admin_users WHERE id = ?', (user_id,))
     user_data = cursor.fetchone()
@@ -47,7 +49,7 @@ def admin_required(f):
 def log_system_event(level, message, module=None, user_id=None):
     """Fonction pour enregistrer les événements système"""
     try:
-        conn = sqlite3.connect('General_DB.db')
+        conn = connect(GENERAL_DB_FILE)
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -63,7 +65,7 @@ def log_system_event(level, message, module=None, user_id=None):
 
 # Initialisation des tables backoffice dans General_DB.db
 def init_backoffice_tables():
-    conn = sqlite3.connect('General_DB.db')
+    conn = connect(GENERAL_DB_FILE)
     cursor = conn.cursor()
     
     # Vérifier et créer les tables backoffice si elles n'existent pas
@@ -187,7 +189,7 @@ def login():
         username = request.form['username']
         password = request.form['password']
         
-        conn = sqlite3.connect('General_DB.db')
+        conn = connect(GENERAL_DB_FILE)
         cursor = conn.cursor()
         cursor.execute('SELECT * FROM admin_users WHERE username = ?', (username,))
         user_data = cursor.fetchone()
@@ -216,7 +218,7 @@ def logout():
 @app.route('/')
 @login_required
 def dashboard():
-    conn = sqlite3.connect('General_DB.db')
+    conn = connect(GENERAL_DB_FILE)
     cursor = conn.cursor()
     
     # Statistiques générales des conversations
@@ -321,7 +323,7 @@ def conversations():
     per_page = 20
     offset = (page - 1) * per_page
     
-    conn = sqlite3.connect('General_DB.db')
+    conn = connect(GENERAL_DB_FILE)
     cursor = conn.cursor()
     
     # Récupérer les conversations avec le nombre de messages calculé
@@ -355,7 +357,7 @@ def conversations():
 @app.route('/conversation/<int:conv_id>')
 @login_required
 def conversation_detail(conv_id):
-    conn = sqlite3.connect('General_DB.db')
+    conn = connect(GENERAL_DB_FILE)
     cursor = conn.cursor()
     
     # Détails de la conversation
@@ -384,7 +386,7 @@ def conversation_detail(conv_id):
 @app.route('/analytics')
 @login_required
 def analytics():
-    conn = sqlite3.connect('General_DB.db')
+    conn = connect(GENERAL_DB_FILE)
     cursor = conn.cursor()
     
     # Données pour les graphiques (7 derniers jours)
@@ -546,7 +548,7 @@ def analytics():
 @login_required
 def api_stats():
     """API endpoint pour récupérer les statistiques en temps réel"""
-    conn = sqlite3.connect('General_DB.db')
+    conn = connect(GENERAL_DB_FILE)
     cursor = conn.cursor()
     
     try:
@@ -624,7 +626,7 @@ def api_stats():
 @login_required
 def banking_overview():
     """Vue d'ensemble du système bancaire"""
-    conn = sqlite3.connect('General_DB.db')
+    conn = connect(GENERAL_DB_FILE)
     cursor = conn.cursor()
     
     try:
@@ -684,7 +686,7 @@ def banking_overview():
 @login_required
 @admin_required
 def configuration():
-    conn = sqlite3.connect('General_DB.db')
+    conn = connect(GENERAL_DB_FILE)
     cursor = conn.cursor()
     
     # Récupérer toutes les configurations ordonnées par nom
@@ -734,7 +736,7 @@ def update_config():
         flash('Le nom et la valeur de configuration sont obligatoires', 'error')
         return redirect(url_for('configuration'))
     
-    conn = sqlite3.connect('General_DB.db')
+    conn = connect(GENERAL_DB_FILE)
     cursor = conn.cursor()
     
     try:
@@ -782,7 +784,7 @@ def update_config():
 @login_required
 @admin_required
 def delete_config(config_id):
-    conn = sqlite3.connect('General_DB.db')
+    conn = connect(GENERAL_DB_FILE)
     cursor = conn.cursor()
     
     try:
@@ -824,7 +826,7 @@ def get_config(config_name):
     API endpoint pour récupérer une configuration spécifique
     Utile pour les requêtes AJAX
     """
-    conn = sqlite3.connect('General_DB.db')
+    conn = connect(GENERAL_DB_FILE)
     cursor = conn.cursor()
     
     cursor.execute('''
@@ -854,7 +856,7 @@ def export_config():
     """
     Exporter toutes les configurations en JSON
     """
-    conn = sqlite3.connect('General_DB.db')
+    conn = connect(GENERAL_DB_FILE)
     cursor = conn.cursor()
     
     cursor.execute('''
@@ -889,7 +891,7 @@ def get_bot_config(config_name, default_value=None):
     Fonction utilitaire pour récupérer une configuration
     Peut être utilisée dans d'autres parties de l'application
     """
-    conn = sqlite3.connect('General_DB.db')
+    conn = connect(GENERAL_DB_FILE)
     cursor = conn.cursor()
     
     cursor.execute('SELECT config_value FROM bot_config WHERE config_name = ?', (config_name,))
@@ -902,7 +904,7 @@ def set_bot_config(config_name, config_value, description="", updated_by=None):
     """
     Fonction utilitaire pour définir une configuration programmatiquement
     """
-    conn = sqlite3.connect('General_DB.db')
+    conn = connect(GENERAL_DB_FILE)
     cursor = conn.cursor()
     
     try:
@@ -932,7 +934,7 @@ def log_chat_message():
     if not data:
         return jsonify({'error': 'No data provided'}), 400
     
-    conn = sqlite3.connect('General_DB.db')
+    conn = connect(GENERAL_DB_FILE)
     cursor = conn.cursor()
     
     # Créer ou récupérer la conversation
@@ -0,0 +1,81 @@
+"""Per-call latency of the get_account_balance lookups against the size of Accounts.
+
+Grows a scratch bank database through --sizes accounts and, at each size, times:
+  * list_scan:  the former tool body, list_accounts() then a linear search;
+  * indexed:    the user-scoped single-row lookup now used by the tool;
+  * batch_of_3: three balances in one round trip (get_accounts_by_numbers).
+
+The account cache is disabled, so every call reaches SQLite. The indexed and
+batch columns should stay flat as the table grows; list_scan grows linearly.
+
+    python -m benchmarks.account_balance --sizes 1000 10000 100000
+"""
+import argparse
+import contextlib
+import io
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+USER_ACCOUNTS = ["1234567890", "2345678901", "3456789012"]
+
+
+def per_call_ms(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000],
+                        help="Numbers of extra accounts (owned by other users) to measure at")
+    parser.add_argument("--repeat", type=int, default=200, help="Timed calls per lookup")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Must be set before chatbot.config is imported
+        db_file = os.path.join(tmp, "bank.db")
+        os.environ["CHATBOT_DB_FILE"] = db_file
+        os.environ["ACCOUNT_CACHE_TTL_SECONDS"] = "0"
+
+        from chatbot.account import list_accounts
+        from chatbot.database import init_db, get_account_by_number, get_accounts_by_numbers
+        from chatbot.db_pool import close_all_pools
+
+        def list_scan(account_number):
+            for account in list_accounts():
+                if account.account_number == account_number:
+                    return account
+            return None
+
+        init_db()
+        seeded = 0
+        print(f"{'accounts':>10s} {'list_scan':>12s} {'indexed':>12s} {'batch_of_3':>12s}")
+        for size in sorted(args.sizes):
+            con = sqlite3.connect(db_file)
+            con.executemany(
+                "INSERT INTO Accounts VALUES (?, ?, 'Chequing', 1000, 'MAD')",
+                ((f"9{i:011d}", f"user{i % 5000}") for i in range(seeded, size))
+            )
+            con.commit()
+            con.execute("ANALYZE")
+            con.close()
+            seeded = max(seeded, size)
+
+            # load_accounts() prints on every call
+            with contextlib.redirect_stdout(io.StringIO()):
+                scan = per_call_ms(lambda: list_scan(USER_ACCOUNTS[0]), max(1, min(args.repeat, 1000000 // size)))
+            indexed = per_call_ms(lambda: get_account_by_number(USER_ACCOUNTS[0], "test1"), args.repeat)
+            batch = per_call_ms(lambda: get_accounts_by_numbers(USER_ACCOUNTS, "test1"), args.repeat)
+            print(f"{size:>10d} {scan:>10.3f}ms {indexed:>10.3f}ms {batch:>10.3f}ms")
+        close_all_pools()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Per-turn breakdown of the banking agent loop.
+
+Sends a scripted conversation through InteractiveBankingAssistant (against the
+running MCP server) and reports, per question and on average, the number of LLM
+calls, LLM time, tool time and tokens recorded in last_turn_metrics.
+
+Point it at the local fake model to measure the loop itself:
+
+    python -m benchmarks.fake_openai --latency-ms 300 &
+    OPENAI_BASE_URL=http://127.0.0.1:8090/v1 python -m benchmarks.agent_loop
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from chatbot.mcp.client_sse import InteractiveBankingAssistant
+
+QUESTIONS = [
+    "What is my chequing account balance?",
+    "And what was that balance again?",
+    "Show me the transaction history of my chequing account",
+    "List my accounts",
+    "Which of my accounts has the highest balance?",
+]
+
+
+async def run(user_id, questions):
+    assistant = InteractiveBankingAssistant(user_id=user_id)
+    with contextlib.redirect_stdout(io.StringIO()):
+        await assistant.initialize_session()
+    try:
+        turns = []
+        for question in questions:
+            with contextlib.redirect_stdout(io.StringIO()):
+                await assistant.send_message(question)
+            metrics = dict(assistant.last_turn_metrics)
+            turns.append(metrics)
+            print(f"{question[:50]:50s} {metrics.get('llm_calls', 0):>3d} LLM "
+                  f"{metrics.get('llm_time', 0) * 1000:>7.0f} ms  {metrics.get('tool_calls', 0):>3d} tools "
+                  f"{metrics.get('tool_time', 0) * 1000:>7.0f} ms  "
+                  f"{metrics.get('prompt_tokens', 0) + metrics.get('completion_tokens', 0):>6d} tok  "
+                  f"{metrics.get('stopped_by', '-')}")
+        return turns
+    finally:
+        await assistant.close_session()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--user", default="test1")
+    args = parser.parse_args()
+
+    turns = [t for t in asyncio.run(run(args.user, QUESTIONS)) if t]
+    if turns:
+        count = len(turns)
+        print(f"\nAverage over {count} banking turns: "
+              f"{sum(t['llm_calls'] for t in turns) / count:.2f} LLM calls, "
+              f"{sum(t['llm_time'] for t in turns) / count * 1000:.0f} ms LLM, "
+              f"{sum(t['tool_time'] for t in turns) / count * 1000:.0f} ms tools")
+
+
+if __name__ == "__main__":
+    main()
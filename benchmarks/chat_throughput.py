@@ -0,0 +1,84 @@
+"""Load benchmark for the /chat endpoint.
+
+Fires concurrent /chat requests at one or more running chat servers and reports
+throughput and latency percentiles, e.g. to compare the threaded Flask app
+(app.py, port 3000) with the ASGI app (asgi_app.py, port 3001):
+
+    python -m benchmarks.chat_throughput --url http://127.0.0.1:3000 --url http://127.0.0.1:3001
+"""
+import argparse
+import json
+import statistics
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+
+def _post(url, payload, token=None, timeout=60):
+    headers = {"Content-Type": "application/json"}
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    req = urllib.request.Request(url, data=json.dumps(payload).encode(), headers=headers)
+    with urllib.request.urlopen(req, timeout=timeout) as res:
+        return json.loads(res.read())
+
+
+def login(base_url, username, password):
+    """Return an access token for the given credentials."""
+    data = _post(f"{base_url}/auth/login", {"username": username, "password": password})
+    return data["access_token"]
+
+
+def run(base_url, token, message, requests_count, concurrency):
+    """Send requests_count /chat requests with the given concurrency."""
+    latencies = []
+    errors = 0
+
+    def one(_):
+        start = time.perf_counter()
+        try:
+            _post(f"{base_url}/chat", {"message": message}, token)
+            return time.perf_counter() - start, None
+        except Exception as e:
+            return time.perf_counter() - start, e
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for latency, error in pool.map(one, range(requests_count)):
+            latencies.append(latency)
+            if error:
+                errors += 1
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "url": base_url,
+        "requests": requests_count,
+        "concurrency": concurrency,
+        "errors": errors,
+        "throughput_rps": requests_count / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", action="append", required=True, help="Base URL of a chat server (repeatable)")
+    parser.add_argument("--username", default="test1")
+    parser.add_argument("--password", default="password1")
+    parser.add_argument("--message", default="What is my chequing balance?")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    for base_url in args.url:
+        token = login(base_url, args.username, args.password)
+        result = run(base_url, token, args.message, args.requests, args.concurrency)
+        print(f"{result['url']}: {result['throughput_rps']:.1f} req/s, "
+              f"p50 {result['p50_ms']:.0f} ms, p95 {result['p95_ms']:.0f} ms, "
+              f"{result['errors']} errors ({result['requests']} requests, concurrency {result['concurrency']})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Query plan check for the account and transaction-history queries.
+
+Builds a scratch database from init.sql plus the migrations, seeds it with
+--rows transfers, then:
+  * fails (exit code 1) if any checked query falls back to a full scan of
+    Transfers or Accounts;
+  * reports the latency of each query, which should stay flat as --rows grows.
+
+    python -m benchmarks.check_query_plans --rows 1000000
+"""
+import argparse
+import os
+import random
+import re
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from chatbot.config import DB_INIT_SQL
+from chatbot.database import apply_migrations, ACCOUNT_HISTORY_PAGE_SQL
+
+FULL_SCAN = re.compile(r"^SCAN (Transfers|Accounts)\b")
+
+# name -> (sql, params); params use account 1234567890 of user test1
+CHECKED_QUERIES = {
+    "history_first_page": (ACCOUNT_HISTORY_PAGE_SQL, {
+        "account_number": "1234567890", "since": "2000-01-01",
+        "cursor_datetime": "9999-12-31T23:59:59", "cursor_id": "", "limit": 21}),
+    "history_deep_page": (ACCOUNT_HISTORY_PAGE_SQL, {
+        "account_number": "1234567890", "since": "2000-01-01",
+        "cursor_datetime": "2020-02-01T00:00:00", "cursor_id": "", "limit": 21}),
+    "accounts_by_user": ("""
+        SELECT AccountNumber, AccountName, Balance FROM Accounts WHERE UserId = ? ORDER BY AccountName
+    """, ("test1",)),
+    "total_balance_by_user": ("""
+        SELECT SUM(Balance) AS TotalBalance FROM Accounts WHERE UserId = ?
+    """, ("test1",)),
+    "account_by_number": ("""
+        SELECT AccountNumber, AccountName, Balance FROM Accounts WHERE AccountNumber = ? AND UserId = ?
+    """, ("1234567890", "test1")),
+}
+
+
+def build_database(path, rows):
+    """Create the schema, apply migrations and seed `rows` random transfers."""
+    with open(DB_INIT_SQL) as sql_file:
+        con = sqlite3.connect(path)
+        con.executescript(sql_file.read())
+    apply_migrations(con)
+
+    accounts = [row[0] for row in con.execute("SELECT AccountNumber FROM Accounts")]
+    start = datetime(2020, 1, 1)
+    batch = []
+    for i in range(rows):
+        from_account, to_account = random.sample(accounts, 2)
+        when = (start + timedelta(seconds=i * 60)).isoformat()
+        batch.append((f"T{i:012d}", from_account, to_account, when, 1, 0, 0))
+        if len(batch) == 50000:
+            con.executemany("INSERT INTO Transfers VALUES (?, ?, ?, ?, ?, ?, ?)", batch)
+            batch.clear()
+    con.executemany("INSERT INTO Transfers VALUES (?, ?, ?, ?, ?, ?, ?)", batch)
+    con.commit()
+    con.execute("ANALYZE")
+    return con
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100000, help="Number of transfers to seed")
+    parser.add_argument("--repeat", type=int, default=200, help="Timed executions per query")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        con = build_database(os.path.join(tmp, "bank.db"), args.rows)
+        failures = 0
+        for name, (sql, params) in CHECKED_QUERIES.items():
+            plan = [row[3] for row in con.execute("EXPLAIN QUERY PLAN " + sql, params)]
+            scans = [step for step in plan if FULL_SCAN.match(step)]
+
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                con.execute(sql, params).fetchall()
+            per_query_ms = (time.perf_counter() - start) / args.repeat * 1000
+
+            status = "FULL SCAN" if scans else "ok"
+            print(f"{name:24s} {status:9s} {per_query_ms:8.3f} ms  | {' / '.join(plan)}")
+            failures += bool(scans)
+        con.close()
+
+    if failures:
+        print(f"\n❌ {failures} quer{'y' if failures == 1 else 'ies'} fell back to a full table scan")
+        sys.exit(1)
+    print(f"\n✅ All queries use an index ({args.rows} transfers)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""Local fake of the OpenAI chat completions endpoint.
+
+Lets the assistant (and its agent loop) run end to end without the real API,
+with a fixed, configurable model latency:
+
+  * a user message about a balance, transactions or the account list gets a
+    matching tool call (get_account_balance, get_transaction_history,
+    list_user_accounts);
+  * once tool results are in the conversation, the model answers in text
+    quoting them;
+  * anything else gets a short text answer.
+
+Both plain and streamed (stream=true) responses are supported, with usage
+counts estimated from the message sizes.
+
+    python -m benchmarks.fake_openai --port 8090 --latency-ms 300
+    OPENAI_BASE_URL=http://127.0.0.1:8090/v1 python app.py
+"""
+import argparse
+import json
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+TOOL_RULES = [
+    (("balance", "solde"), "get_account_balance", {"account_number": "1234567890"}),
+    (("transaction", "history", "historique"), "get_transaction_history", {"account_number": "1234567890"}),
+    (("accounts", "comptes"), "list_user_accounts", {}),
+]
+
+
+def estimate_tokens(value):
+    return max(1, len(json.dumps(value)) // 4)
+
+
+def fake_reply(body):
+    """Return (content, tool_calls) for a chat completions request body."""
+    messages = body.get("messages", [])
+    last = messages[-1] if messages else {}
+
+    if last.get("role") == "tool":
+        results = [m["content"] for m in messages if m.get("role") == "tool"]
+        return "Here is what I found: " + " | ".join(r[:200] for r in results), None
+
+    if body.get("tools") and last.get("role") == "user":
+        text = str(last.get("content", "")).lower()
+        tool_names = {tool["function"]["name"] for tool in body["tools"]}
+        for keywords, name, arguments in TOOL_RULES:
+            if name in tool_names and any(keyword in text for keyword in keywords):
+                return None, [{
+                    "id": f"call_{uuid.uuid4().hex[:12]}",
+                    "type": "function",
+                    "function": {"name": name, "arguments": json.dumps(arguments)}
+                }]
+
+    return "This is a reply from the fake model.", None
+
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    latency = 0.0
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def _send_json(self, status, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if not self.path.endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+            return
+
+        time.sleep(self.latency)
+        content, tool_calls = fake_reply(body)
+        prompt_tokens = estimate_tokens(body.get("messages", []))
+        completion_tokens = estimate_tokens(content or tool_calls)
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens
+        }
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        model = body.get("model", "fake")
+        created = int(time.time())
+
+        if not body.get("stream"):
+            self._send_json(200, {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content, "tool_calls": tool_calls},
+                    "finish_reason": "tool_calls" if tool_calls else "stop"
+                }],
+                "usage": usage
+            })
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+
+        def send_chunk(delta, finish_reason=None):
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.flush()
+
+        if tool_calls:
+            for index, call in enumerate(tool_calls):
+                send_chunk({"tool_calls": [dict(call, index=index)]})
+        else:
+            for word in content.split(" "):
+                send_chunk({"content": word + " "})
+        send_chunk({}, "tool_calls" if tool_calls else "stop")
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+        self.close_connection = True
+
+
+def serve(host="127.0.0.1", port=8090, latency_ms=0):
+    FakeOpenAIHandler.latency = latency_ms / 1000
+    server = ThreadingHTTPServer((host, port), FakeOpenAIHandler)
+    print(f"🧪 Fake OpenAI endpoint on http://{host}:{port}/v1 (latency {latency_ms} ms)")
+    server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency-ms", type=int, default=0, help="Simulated model latency per request")
+    args = parser.parse_args()
+    serve(args.host, args.port, args.latency_ms)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Latency of the rule-based fast path vs the LLM agent loop.
+
+Sends questions that the fast path can answer through InteractiveBankingAssistant
+(against the running MCP server) twice: once with the fast path, once with it
+disabled so the model picks the tool. Reports p50/p95 turn latency per path,
+and the time the router itself takes to classify a message.
+
+    python -m benchmarks.fake_openai --latency-ms 300 &
+    OPENAI_BASE_URL=http://127.0.0.1:8090/v1 python -m benchmarks.fast_path --rounds 20
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from chatbot.fast_path import fast_path_router
+from chatbot.mcp.client_sse import InteractiveBankingAssistant
+
+QUESTIONS = [
+    "What is my chequing balance?",
+    "solde de mon compte épargne",
+    "balance of 1234567890",
+    "Show the transaction history of my chequing account",
+    "afficher mes comptes",
+]
+
+
+def percentiles(samples):
+    """Return (p50, p95) of a list of durations, in milliseconds."""
+    if len(samples) < 2:
+        value = samples[0] * 1000 if samples else 0.0
+        return value, value
+    cuts = statistics.quantiles(samples, n=20, method="inclusive")
+    return cuts[9] * 1000, cuts[18] * 1000
+
+
+async def run(user_id, questions, rounds, fast_path):
+    assistant = InteractiveBankingAssistant(user_id=user_id)
+    if not fast_path:
+        assistant.fast_path = None
+    with contextlib.redirect_stdout(io.StringIO()):
+        await assistant.initialize_session()
+    try:
+        samples, paths = [], {}
+        for _ in range(rounds):
+            for question in questions:
+                start = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    await assistant.send_message(question)
+                samples.append(time.perf_counter() - start)
+                path = assistant.last_turn_metrics.get("path", "-")
+                paths[path] = paths.get(path, 0) + 1
+                # Keep the context small and identical between rounds
+                assistant.conversation_history.clear()
+        return samples, paths
+    finally:
+        await assistant.close_session()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--user", default="test1")
+    parser.add_argument("--rounds", type=int, default=10)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    for _ in range(1000):
+        for question in QUESTIONS:
+            fast_path_router.route(question)
+    router_us = (time.perf_counter() - start) / (1000 * len(QUESTIONS)) * 1e6
+    print(f"Router: {router_us:.1f} µs per message")
+
+    for label, fast_path in (("fast path", True), ("LLM loop", False)):
+        samples, paths = asyncio.run(run(args.user, QUESTIONS, args.rounds, fast_path))
+        p50, p95 = percentiles(samples)
+        print(f"{label:10s} {len(samples):>4d} turns  p50 {p50:>8.1f} ms  p95 {p95:>8.1f} ms  paths {paths}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Per-call overhead of the MCP transports: SSE vs in-process.
+
+Calls get_account_balance through each transport, sequentially and with
+concurrent callers, including the result parsing done by the assistant
+(_parse_function_result), and reports mean / p50 / p95 per call. The tool
+itself (a cached SQLite lookup) is the same in both cases, so the difference
+is the transport overhead.
+
+The SSE transport needs the MCP server running (python chatbot/mcp/server_sse.py);
+the in-process transport imports it in this process.
+
+    python -m benchmarks.mcp_transport --calls 500 --concurrency 8
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import logging
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from chatbot.config import ACCOUNT_MAPPINGS, DEFAULT_USER_ID, MCP_HOST, MCP_PORT
+from chatbot.mcp.client_sse import InteractiveBankingAssistant
+from chatbot.mcp.inprocess_client import InProcessMCPClient
+from chatbot.mcp.managed_client import ManagedMCPClient
+
+
+async def timed_call(client, assistant, arguments):
+    start = time.perf_counter()
+    result = await client.call_tool("get_account_balance", arguments)
+    assistant._parse_function_result(result)
+    return time.perf_counter() - start
+
+
+async def measure(client, assistant, arguments, calls, concurrency):
+    """Return the per-call durations of `calls` calls made by `concurrency` callers, and the wall time."""
+    durations = []
+
+    async def caller(count):
+        for _ in range(count):
+            durations.append(await timed_call(client, assistant, arguments))
+
+    start = time.perf_counter()
+    share, extra = divmod(calls, concurrency)
+    await asyncio.gather(*[caller(share + (1 if i < extra else 0)) for i in range(concurrency)])
+    return durations, time.perf_counter() - start
+
+
+def report(label, durations, wall):
+    cuts = statistics.quantiles(durations, n=20, method="inclusive")
+    print(f"{label:28s} mean {statistics.mean(durations) * 1e6:>9.0f} µs  p50 {cuts[9] * 1e6:>9.0f} µs  "
+          f"p95 {cuts[18] * 1e6:>9.0f} µs  {len(durations) / wall:>8.0f} calls/s")
+
+
+async def run(transport, calls, concurrency, user_id):
+    if transport == "sse":
+        client = ManagedMCPClient(f"http://{MCP_HOST}:{MCP_PORT}/sse")
+    else:
+        client = InProcessMCPClient()
+    # The clients are never used: only the result parsing of the assistant is
+    assistant = InteractiveBankingAssistant(user_id=user_id, openai_client=object())
+    arguments = {"user_id": user_id, "account_number": ACCOUNT_MAPPINGS["checking"]}
+    with contextlib.redirect_stdout(io.StringIO()):
+        await client.start()
+        # Warm up: connections, caches, imports
+        await measure(client, assistant, arguments, 20, 1)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            sequential = await measure(client, assistant, arguments, calls, 1)
+            concurrent = await measure(client, assistant, arguments, calls, concurrency)
+        report(f"{transport} sequential", *sequential)
+        report(f"{transport} x{concurrency} concurrent", *concurrent)
+    finally:
+        await client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--transport", choices=["sse", "inprocess", "both"], default="both")
+    parser.add_argument("--calls", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--user", default=DEFAULT_USER_ID)
+    args = parser.parse_args()
+    # One INFO line per HTTP request would dominate the SSE timings
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    transports = ["inprocess", "sse"] if args.transport == "both" else [args.transport]
+    for transport in transports:
+        asyncio.run(run(transport, args.calls, args.concurrency, args.user))
+
+
+if __name__ == "__main__":
+    main()
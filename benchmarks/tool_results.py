@@ -0,0 +1,242 @@
+"""CPU cost of a tool result, from the tool's return value to the formatted answer.
+
+Serves the same data through two in-memory FastMCP servers: one with the
+previous tools (dicts and strings, turned into JSON text plus structured
+content validated by the client against an output schema) and one with the
+typed results (encode_result, decoded once by the assistant). For each tool it
+reports, in µs per call:
+
+  * round trip: session.call_tool + parsing + formatting, over the in-memory
+    MCP transport (JSON-RPC included, no network);
+  * parse + format: the assistant side only, from the CallToolResult;
+
+best of --repeat runs, and the size of the result text.
+
+Measured here (--calls 300 --repeat 3, two runs), parse + format legacy/typed:
+balance x1.1-1.3, RAG answer x1.2-1.3, transfer x1.7-2.4, accounts x2.1-3.0,
+transactions x1.8. Single-row results gain least: their decoding costs about
+as much as the previous json.loads, the gain comes from the cheaper dispatch
+and formatting. The round trip timings vary by ±30% from run to run on a
+loaded machine; compare several runs.
+
+    python -m benchmarks.tool_results --calls 1000 --repeat 5
+"""
+import argparse
+import asyncio
+import contextlib
+import functools
+import json
+import logging
+import os
+import sys
+import time
+import timeit
+from dataclasses import asdict
+from decimal import Decimal
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from mcp.server.fastmcp import FastMCP
+from mcp.shared.memory import create_connected_server_and_client_session
+
+from chatbot.mcp.client_sse import InteractiveBankingAssistant
+from chatbot.response_formatter import ResponseFormatter
+from chatbot.tool_results import (
+    AccountBalance, AccountList, AccountSummary, BalanceResult, RagAnswer, Transaction,
+    TransactionPage, TransferResult, register_typed_tool
+)
+
+BALANCE = BalanceResult(balances=(AccountBalance("1234567890", "Checking", "1520.35"),))
+ACCOUNTS = AccountList(accounts=tuple(
+    AccountSummary(f"12345678{i:02d}", f"Account {i}", f"{i * 100}.00") for i in range(4)
+))
+HISTORY = TransactionPage(transactions=tuple(
+    Transaction(str(i), "2026-01-15", "Transfer to 9876543210", "25.00", "debit", f"{1000 - i * 25}.00")
+    for i in range(20)
+), next_cursor="MjAyNi0wMS0xNXwxMjM=")
+TRANSFER = TransferResult(ok=True, from_account="1234567890", to_account="9876543210", amount="50")
+RAG = RagAnswer(answer="You can order a new card from the app. " * 5, sources=("cards.pdf", "faq.pdf"))
+
+CALLS = [
+    ("get_account_balance", {"user_id": "test1", "account_number": "1234567890"}),
+    ("list_user_accounts", {"user_id": "test1"}),
+    ("get_transaction_history", {"user_id": "test1", "account_number": "1234567890"}),
+    ("transfer_funds", {"user_id": "test1", "from_account": "1234567890", "to_account": "9876543210", "amount": "50"}),
+    ("answer_banking_question", {"question": "How do I order a new card?"}),
+]
+
+
+def legacy_server() -> FastMCP:
+    """The tools as they returned their results before the typed results."""
+    server = FastMCP(name="legacy")
+
+    @server.tool()
+    def get_account_balance(user_id: str, account_number: str = "") -> dict:
+        return asdict(BALANCE.balances[0])
+
+    @server.tool()
+    def list_user_accounts(user_id: str) -> list[dict]:
+        return [{**asdict(account), "balance": Decimal(account.balance)} for account in ACCOUNTS.accounts]
+
+    @server.tool()
+    def get_transaction_history(user_id: str, account_number: str, days: int = 30,
+                                cursor: str = "", page_size: int = 20) -> dict:
+        return {"transactions": [asdict(transaction) for transaction in HISTORY.transactions],
+                "next_cursor": HISTORY.next_cursor}
+
+    @server.tool()
+    def transfer_funds(user_id: str, from_account: str, to_account: str, amount: str) -> str:
+        return f"✅ Transferred MAD{amount} from {from_account} to {to_account}."
+
+    @server.tool()
+    def answer_banking_question(question: str) -> dict:
+        return {"answer": RAG.answer, "sources": list(RAG.sources)}
+
+    return server
+
+
+def typed_server() -> FastMCP:
+    server = FastMCP(name="typed")
+    typed_tool = functools.partial(register_typed_tool, server)
+
+    @typed_tool
+    def get_account_balance(user_id: str, account_number: str = "") -> BalanceResult:
+        return BALANCE
+
+    @typed_tool
+    def list_user_accounts(user_id: str) -> AccountList:
+        return ACCOUNTS
+
+    @typed_tool
+    def get_transaction_history(user_id: str, account_number: str, days: int = 30,
+                                cursor: str = "", page_size: int = 20) -> TransactionPage:
+        return HISTORY
+
+    @typed_tool
+    def transfer_funds(user_id: str, from_account: str, to_account: str, amount: str) -> TransferResult:
+        return TRANSFER
+
+    @typed_tool
+    def answer_banking_question(question: str) -> RagAnswer:
+        return RAG
+
+    return server
+
+
+def legacy_parse(result):
+    """The assistant's previous _parse_function_result: json.loads of every text part."""
+    text_contents = [content.text for content in result.content if hasattr(content, 'text')]
+    parsed_contents = []
+    for text in text_contents:
+        try:
+            parsed_contents.append(json.loads(text))
+        except Exception:
+            parsed_contents.append(text)
+    if len(parsed_contents) == 1:
+        content = parsed_contents[0]
+        if isinstance(content, dict) and all(key in content for key in ['transaction_id', 'date', 'description']):
+            return [content]
+        return content
+    return parsed_contents
+
+
+def legacy_format(name, result):
+    """The previous ResponseFormatter: finding the fields by sniffing the keys."""
+    if name == "get_account_balance":
+        if isinstance(result, dict) and 'balance' in result:
+            return (f"Your {result.get('account_name', 'account')} ({result.get('account_number', '')}) "
+                    f"has a balance of {result.get('balance', '')} {result.get('currency', 'CAD')}.")
+        return "I found your account balance information."
+    if name == "list_user_accounts":
+        accounts = [item for item in result if isinstance(item, dict)
+                    and 'account_name' in item and 'account_number' in item] if isinstance(result, list) else []
+        return "\n".join(["Here are your accounts:"] + [
+            f"- {account.get('account_name', 'Account')} ({account.get('account_number', '')})" for account in accounts
+        ])
+    if name == "get_transaction_history":
+        transactions = result["transactions"] if isinstance(result, dict) and "transactions" in result else result
+        lines = ["Here are the recent transactions for your account:"]
+        for transaction in transactions[:5]:
+            lines.append(f"- {transaction.get('date', 'Unknown date')}: {transaction.get('description', 'Transaction')}: "
+                         f"MAD{transaction.get('amount', '0.00')}")
+        return "\n".join(lines)
+    if name == "transfer_funds":
+        return result if "Transferred" in result or "failed" in result else "I've completed the transfer for you."
+    if isinstance(result, dict) and "answer" in result:
+        response = result["answer"]
+        if result.get("sources"):
+            response += "<div class='sources-section'><strong>Sources:</strong><ul>"
+            response += "".join(f"<li>{source}</li>" for source in result["sources"]) + "</ul></div>"
+        return response
+    return result
+
+
+async def time_calls(session, name, arguments, parse_and_format, calls):
+    """Return the µs per call of `calls` round trips."""
+    start = time.perf_counter()
+    for _ in range(calls):
+        parse_and_format(name, await session.call_tool(name, arguments))
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+async def measure(paths, calls, repeat):
+    """
+    Return {path: {tool: (round trip µs, parse + format µs, result text size)}}, best of `repeat` runs.
+
+    The runs of the paths are interleaved, so that a slower period of the machine affects them alike.
+    """
+    timings = {label: {} for label in paths}
+    async with contextlib.AsyncExitStack() as stack:
+        sessions = {}
+        for label, (server, _) in paths.items():
+            sessions[label] = await stack.enter_async_context(create_connected_server_and_client_session(server))
+            await sessions[label].list_tools()
+        for name, arguments in CALLS:
+            results = {label: await session.call_tool(name, arguments) for label, session in sessions.items()}
+            round_trips = {label: [] for label in paths}
+            parsing = {label: [] for label in paths}
+            for _ in range(repeat):
+                for label, (_, parse_and_format) in paths.items():
+                    result = results[label]
+                    round_trips[label].append(
+                        await time_calls(sessions[label], name, arguments, parse_and_format, calls)
+                    )
+                    parsing[label].append(
+                        timeit.timeit(lambda: parse_and_format(name, result), number=calls * 10) / (calls * 10) * 1e6
+                    )
+            for label in paths:
+                timings[label][name] = (min(round_trips[label]), min(parsing[label]),
+                                        sum(len(content.text) for content in results[label].content))
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    # One INFO line per request would dominate the round trip timings
+    logging.getLogger("mcp").setLevel(logging.WARNING)
+
+    # Only the result parsing of the assistant is used
+    assistant = InteractiveBankingAssistant(user_id="test1", openai_client=object())
+
+    def typed(name, result):
+        return ResponseFormatter.format_response(name, assistant._parse_function_result(result))
+
+    def legacy(name, result):
+        return legacy_format(name, legacy_parse(result))
+
+    timings = asyncio.run(measure({"legacy": (legacy_server(), legacy), "typed": (typed_server(), typed)},
+                                  args.calls, args.repeat))
+
+    print(f"{'tool':26s} {'round trip legacy/typed':>28s} {'parse+format legacy/typed':>28s} {'size legacy/typed':>20s}")
+    for name, _ in CALLS:
+        (legacy_rt, legacy_pf, legacy_size), (typed_rt, typed_pf, typed_size) = timings["legacy"][name], timings["typed"][name]
+        print(f"{name:26s} {legacy_rt:>9.0f} / {typed_rt:<6.0f} µs x{legacy_rt / typed_rt:<4.1f}"
+              f" {legacy_pf:>9.1f} / {typed_pf:<6.1f} µs x{legacy_pf / typed_pf:<4.1f}"
+              f" {legacy_size:>9d} / {typed_size:<6d}")
+
+
+if __name__ == "__main__":
+    main()
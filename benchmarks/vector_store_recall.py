@@ -0,0 +1,129 @@
+"""Recall@k and latency of the vector store backends: NumPy (exact, IVF) vs Chroma.
+
+Builds each store from the same synthetic corpus (clustered, normalized
+vectors, like the embeddings of documents on a few topics) and searches it
+with the same queries through similarity_search_by_vector, documents
+included. Reports, per backend:
+
+  * build: time to add the corpus (the embeddings are precomputed);
+  * open: time to open the store again and answer a first query (startup);
+  * recall@k against an exact float64 search;
+  * mean / p50 / p95 query latency.
+
+Chroma is skipped if chromadb is not installed.
+
+    python -m benchmarks.vector_store_recall --rows 20000 --dimensions 384 --ivf-lists 128 --probes 8
+"""
+import argparse
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from chatbot.rag.numpy_store import NumpyVectorStore
+
+
+class PrecomputedEmbeddings:
+    """Embeddings of the texts "0", "1", ...: rows of a matrix (no model, no network)."""
+
+    def __init__(self, vectors):
+        self.vectors = vectors
+
+    def embed_documents(self, texts):
+        return [self.vectors[int(text)].tolist() for text in texts]
+
+    def embed_query(self, text):
+        return self.vectors[int(text)].tolist()
+
+
+def synthetic_corpus(rows, dimensions, queries, topics, seed=0):
+    """Return (corpus, queries): normalized vectors around `topics` random centers."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(topics, dimensions))
+
+    def around_centers(count):
+        vectors = centers[rng.integers(0, topics, count)] + 0.5 * rng.normal(size=(count, dimensions))
+        return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+    return around_centers(rows), around_centers(queries)
+
+
+def exact_neighbors(corpus, queries, k):
+    """Ids of the k nearest corpus vectors of each query (float64 brute force)."""
+    scores = queries.astype(np.float64) @ corpus.astype(np.float64).T
+    return [set(np.argsort(-row)[:k].tolist()) for row in scores]
+
+
+def build(factory, corpus, batch_size=1000):
+    store = factory()
+    start = time.perf_counter()
+    for batch_start in range(0, len(corpus), batch_size):
+        ids = [str(i) for i in range(batch_start, min(batch_start + batch_size, len(corpus)))]
+        store.add_texts(ids, metadatas=[{"row": int(i)} for i in ids], ids=ids)
+    return time.perf_counter() - start
+
+
+def measure(label, factory, corpus, queries, truth, k):
+    build_seconds = build(factory, corpus)
+    start = time.perf_counter()
+    store = factory()
+    store.similarity_search_by_vector(queries[0].tolist(), k=k)
+    open_seconds = time.perf_counter() - start
+
+    durations, recalls = [], []
+    for query, expected in zip(queries, truth):
+        start = time.perf_counter()
+        documents = store.similarity_search_by_vector(query.tolist(), k=k)
+        durations.append(time.perf_counter() - start)
+        recalls.append(len(expected & {document.metadata["row"] for document in documents}) / k)
+    cuts = statistics.quantiles(durations, n=20, method="inclusive")
+    print(f"{label:26s} build {build_seconds:>7.2f}s  open {open_seconds * 1e3:>8.1f} ms  "
+          f"recall@{k} {statistics.mean(recalls):.3f}  mean {statistics.mean(durations) * 1e6:>7.0f} µs  "
+          f"p50 {cuts[9] * 1e6:>7.0f} µs  p95 {cuts[18] * 1e6:>7.0f} µs")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--dimensions", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--topics", type=int, default=100)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--ivf-lists", type=int, default=128, help="lists of the NumPy IVF index (0: skip)")
+    parser.add_argument("--probes", type=int, default=8)
+    args = parser.parse_args()
+    logging.getLogger("chromadb").setLevel(logging.WARNING)
+
+    corpus, queries = synthetic_corpus(args.rows, args.dimensions, args.queries, args.topics)
+    truth = exact_neighbors(corpus, queries, args.k)
+    embeddings = PrecomputedEmbeddings(corpus)
+    print(f"{args.rows} vectors of {args.dimensions} dimensions, {args.queries} queries")
+
+    with tempfile.TemporaryDirectory() as directory:
+        exact_dir = os.path.join(directory, "numpy")
+        measure("numpy exact", lambda: NumpyVectorStore(exact_dir, embeddings, ivf_lists=0),
+                corpus, queries, truth, args.k)
+        if args.ivf_lists:
+            ivf_dir = os.path.join(directory, "numpy-ivf")
+            measure(f"numpy ivf {args.ivf_lists}/{args.probes}",
+                    lambda: NumpyVectorStore(ivf_dir, embeddings, ivf_lists=args.ivf_lists, ivf_probes=args.probes),
+                    corpus, queries, truth, args.k)
+        try:
+            import chromadb  # noqa: F401
+            from langchain_community.vectorstores import Chroma
+        except ImportError:
+            print("chroma                     skipped (chromadb not installed)")
+            return
+        chroma_dir = os.path.join(directory, "chroma")
+        measure("chroma", lambda: Chroma(persist_directory=chroma_dir, embedding_function=embeddings),
+                corpus, queries, truth, args.k)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""Chat message logging shared by the Flask and ASGI chat apps.
+
+Messages are not written on the request path: log_chat_message() only enqueues
+them, and a background ChatLogWriter thread inserts them in batches, one
+transaction every CHAT_LOG_FLUSH_INTERVAL_MS or CHAT_LOG_BATCH_SIZE rows.
+"""
+import atexit
+import queue
+import sqlite3
+import threading
+import time
+from typing import Optional, Tuple, Dict, Any
+
+from chatbot.config import (
+    GENERAL_DB_FILE, CHAT_LOG_QUEUE_SIZE, CHAT_LOG_BATCH_SIZE, CHAT_LOG_FLUSH_INTERVAL_MS
+)
+
+
+def detect_preference_intent(preference_analyzer, user: str, msg: str) -> Tuple[Optional[str], float]:
+    """
+    Analyse les préférences du message et en déduit l'intent principal.
+
+    :param preference_analyzer: Instance de PreferenceAnalyzer
+    :param user: ID de l'utilisateur
+    :param msg: Message de l'utilisateur
+    :return: Tuple (intent_detected, confidence_score)
+    """
+    intent_detected = None
+    confidence_score = 0.0
+    try:
+        detected_prefs = preference_analyzer.analyze_message(user, msg)
+        if detected_prefs:
+            print(f"🔍 Préférences détectées pour {user}: {detected_prefs}")
+            # Prendre la première préférence comme intent principal
+            first_pref = next(iter(detected_prefs.items()))
+            intent_detected = f"{first_pref[0]}:{first_pref[1]}"
+            confidence_score = 0.7
+    except Exception as e:
+        print(f"⚠️  Erreur analyse préférences: {e}")
+    return intent_detected, confidence_score
+
+
+class ChatLogWriter:
+    """Background writer batching chat_conversations/chat_messages inserts."""
+
+    _STOP = object()
+
+    def __init__(self, db_path: str = GENERAL_DB_FILE, max_queue: int = CHAT_LOG_QUEUE_SIZE,
+                 batch_size: int = CHAT_LOG_BATCH_SIZE,
+                 flush_interval_ms: int = CHAT_LOG_FLUSH_INTERVAL_MS):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._conversation_ids = {}  # user_id -> current conversation id
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._metrics_lock = threading.Lock()
+        self._metrics = {
+            "enqueued": 0,
+            "written": 0,
+            "dropped": 0,
+            "failed": 0,
+            "flushes": 0,
+            "last_flush_ms": 0.0,
+            "max_flush_ms": 0.0,
+            "total_flush_ms": 0.0,
+        }
+
+    def start(self):
+        """Start the writer thread if it is not running yet."""
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="chat-log-writer", daemon=True)
+                self._thread.start()
+
+    def log(self, user: str, user_message: str, bot_response: str,
+            intent_detected: Optional[str], confidence_score: float, response_time: float) -> bool:
+        """Enqueue a message. Returns False if the queue is full and the message was dropped."""
+        self.start()
+        try:
+            self._queue.put_nowait((user, user_message, bot_response, intent_detected,
+                                    confidence_score, response_time))
+        except queue.Full:
+            self._count("dropped")
+            print(f"⚠️  File de logs pleine, message de {user} ignoré")
+            return False
+        self._count("enqueued")
+        return True
+
+    def close(self, timeout: float = 5.0):
+        """Flush pending messages and stop the writer thread."""
+        if self._thread is None or not self._thread.is_alive():
+            return
+        self._queue.put(self._STOP)
+        self._thread.join(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return queue depth and flush metrics."""
+        with self._metrics_lock:
+            stats = dict(self._metrics)
+        flushes = stats.pop("total_flush_ms")
+        stats["avg_flush_ms"] = flushes / stats["flushes"] if stats["flushes"] else 0.0
+        stats["queue_depth"] = self._queue.qsize()
+        stats["cached_conversations"] = len(self._conversation_ids)
+        return stats
+
+    def _count(self, key: str, amount: int = 1):
+        with self._metrics_lock:
+            self._metrics[key] += amount
+
+    def _run(self):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            stopping = False
+            while not stopping:
+                batch = []
+                try:
+                    item = self._queue.get(timeout=self.flush_interval)
+                except queue.Empty:
+                    continue
+                deadline = time.monotonic() + self.flush_interval
+                while item is not self._STOP:
+                    batch.append(item)
+                    if len(batch) >= self.batch_size:
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = self._queue.get(timeout=remaining)
+                    except queue.Empty:
+                        break
+                else:
+                    stopping = True
+                if batch:
+                    self._flush(conn, batch)
+            # Drain whatever was enqueued after the stop request
+            leftovers = []
+            while True:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is not self._STOP:
+                    leftovers.append(item)
+            if leftovers:
+                self._flush(conn, leftovers)
+        finally:
+            conn.close()
+
+    def _conversation_id(self, cursor, user: str) -> int:
+        """Return the current conversation of a user, creating one if needed."""
+        conversation_id = self._conversation_ids.get(user)
+        if conversation_id is not None:
+            return conversation_id
+
+        cursor.execute("""
+            SELECT id FROM chat_conversations
+            WHERE user_id = ?
+            ORDER BY created_at DESC
+            LIMIT 1
+        """, (user,))
+        conv_result = cursor.fetchone()
+        if conv_result:
+            conversation_id = conv_result[0]
+        else:
+            cursor.execute("""
+                INSERT INTO chat_conversations (user_id, created_at)
+                VALUES (?, CURRENT_TIMESTAMP)
+            """, (user,))
+            conversation_id = cursor.lastrowid
+        self._conversation_ids[user] = conversation_id
+        return conversation_id
+
+    def _flush(self, conn, batch):
+        """Write a batch of messages in one transaction."""
+        start = time.perf_counter()
+        known_conversations = dict(self._conversation_ids)
+        try:
+            cursor = conn.cursor()
+            rows = [
+                (self._conversation_id(cursor, user), user_message, bot_response,
+                 intent_detected, confidence_score, response_time)
+                for user, user_message, bot_response, intent_detected, confidence_score, response_time in batch
+            ]
+            cursor.executemany("""
+                INSERT INTO chat_messages (
+                    conversation_id,
+                    user_message,
+                    bot_response,
+                    intent_detected,
+                    confidence_score,
+                    response_time,
+                    timestamp
+                ) VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+            """, rows)
+            conn.commit()
+            self._count("written", len(batch))
+        except Exception as e:
+            conn.rollback()
+            # Conversations created in the rolled back transaction no longer exist
+            self._conversation_ids = known_conversations
+            self._count("failed", len(batch))
+            print(f"❌ Erreur sauvegarde DB ({len(batch)} messages): {e}")
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        with self._metrics_lock:
+            self._metrics["flushes"] += 1
+            self._metrics["last_flush_ms"] = elapsed_ms
+            self._metrics["max_flush_ms"] = max(self._metrics["max_flush_ms"], elapsed_ms)
+            self._metrics["total_flush_ms"] += elapsed_ms
+
+
+# Process-wide writer, flushed on interpreter shutdown
+chat_log_writer = ChatLogWriter()
+atexit.register(chat_log_writer.close)
+
+
+def log_chat_message(user: str, user_message: str, bot_response: str,
+                     intent_detected: Optional[str], confidence_score: float,
+                     response_time: float):
+    """
+    Met en file un échange pour sauvegarde dans chat_messages.
+
+    L'écriture est faite en arrière-plan par chat_log_writer ; cette fonction ne bloque pas.
+    """
+    chat_log_writer.log(user, user_message, bot_response, intent_detected, confidence_score, response_time)
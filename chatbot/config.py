@@ -5,6 +5,21 @@ from pathlib import Path
 # Database settings
 DB_FILE = os.environ.get("CHATBOT_DB_FILE", "bank.db")
 DB_INIT_SQL = Path(__file__).parent / "init.sql"
+DB_MIGRATIONS_DIR = Path(__file__).parent / "migrations"
+GENERAL_DB_FILE = os.environ.get("GENERAL_DB_FILE", "General_DB.db")
+
+# SQLite connection pool settings
+DB_POOL_MAX_IDLE = int(os.environ.get("DB_POOL_MAX_IDLE", "8"))
+DB_BUSY_TIMEOUT_SECONDS = float(os.environ.get("DB_BUSY_TIMEOUT_SECONDS", "5"))
+DB_STATEMENT_CACHE_SIZE = int(os.environ.get("DB_STATEMENT_CACHE_SIZE", "256"))
+DB_CACHE_SIZE_KB = int(os.environ.get("DB_CACHE_SIZE_KB", "16384"))
+DB_MMAP_SIZE = int(os.environ.get("DB_MMAP_SIZE", str(256 * 1024 * 1024)))
+
+# Read-through cache of account balances and lists (0 disables it)
+ACCOUNT_CACHE_TTL_SECONDS = float(os.environ.get("ACCOUNT_CACHE_TTL_SECONDS", "30"))
+
+# Transaction history pagination
+MAX_HISTORY_PAGE_SIZE = int(os.environ.get("MAX_HISTORY_PAGE_SIZE", "100"))
 
 # Account number mappings (for client-side account name resolution)
 ACCOUNT_MAPPINGS = {
@@ -15,17 +30,99 @@ ACCOUNT_MAPPINGS = {
     "savings": "2345678901",
     "credit": "3456789012",
     "credit card": "3456789012",
-    "account anas": "4587986325"
+    "account anas": "4587986325",
+    # French aliases
+    "compte courant": "1234567890",
+    "courant": "1234567890",
+    "compte chèque": "1234567890",
+    "compte épargne": "2345678901",
+    "épargne": "2345678901",
+    "carte de crédit": "3456789012",
+    "crédit": "3456789012"
 }
 
 # Default user for testing
 DEFAULT_USER_ID = "test1"
 
+# Chat session settings (one assistant context per authenticated user)
+SESSION_MAX_USERS = int(os.environ.get("SESSION_MAX_USERS", "500"))
+SESSION_TTL_SECONDS = int(os.environ.get("SESSION_TTL_SECONDS", "1800"))
+
+# Conversation context: turns kept verbatim, the older ones are summarized in the background
+CONTEXT_KEEP_TURNS = int(os.environ.get("CONTEXT_KEEP_TURNS", "6"))
+CONTEXT_TOKEN_BUDGET = int(os.environ.get("CONTEXT_TOKEN_BUDGET", "3000"))
+CONTEXT_SUMMARY_MAX_TOKENS = int(os.environ.get("CONTEXT_SUMMARY_MAX_TOKENS", "300"))
+
+# Chat log writer settings (background batching of chat_messages inserts)
+CHAT_LOG_QUEUE_SIZE = int(os.environ.get("CHAT_LOG_QUEUE_SIZE", "10000"))
+CHAT_LOG_BATCH_SIZE = int(os.environ.get("CHAT_LOG_BATCH_SIZE", "100"))
+CHAT_LOG_FLUSH_INTERVAL_MS = int(os.environ.get("CHAT_LOG_FLUSH_INTERVAL_MS", "200"))
+
 # Vector database settings
 VECTOR_DB_DIR = os.environ.get("VECTOR_DB_DIR", "./chroma_db")
 DOCS_DIRECTORY = os.environ.get("DOCS_DIRECTORY", "./test_documents")
+# Vector store in VECTOR_DB_DIR: "chroma", or "numpy" (memory-mapped matrix + SQLite, see
+# chatbot/rag/numpy_store.py); with numpy, an IVF index over VECTOR_STORE_IVF_LISTS lists
+# (0: exact search) searching VECTOR_STORE_IVF_PROBES of them per query
+VECTOR_STORE_BACKEND = os.environ.get("VECTOR_STORE_BACKEND", "chroma")
+VECTOR_STORE_IVF_LISTS = int(os.environ.get("VECTOR_STORE_IVF_LISTS", "0"))
+VECTOR_STORE_IVF_PROBES = int(os.environ.get("VECTOR_STORE_IVF_PROBES", "8"))
+# Splitting of the documents into chunks (a change re-indexes every document, see chatbot/rag/ingest_manifest.py)
+RAG_CHUNK_SIZE = int(os.environ.get("RAG_CHUNK_SIZE", "1000"))
+RAG_CHUNK_OVERLAP = int(os.environ.get("RAG_CHUNK_OVERLAP", "200"))
+# Ingestion pipeline (see chatbot/rag/ingest_pipeline.py): worker processes parsing and
+# splitting files (0: one per CPU), files in flight at once, and chunks per embedding call
+INGEST_WORKERS = int(os.environ.get("INGEST_WORKERS", "0")) or os.cpu_count() or 1
+INGEST_WINDOW = int(os.environ.get("INGEST_WINDOW", "0")) or 2 * INGEST_WORKERS
+INGEST_BATCH_SIZE = int(os.environ.get("INGEST_BATCH_SIZE", "256"))
+
+# Response cache for general and RAG answers (exact + embedding similarity)
+RESPONSE_CACHE_ENABLED = os.environ.get("RESPONSE_CACHE_ENABLED", "1") == "1"
+RESPONSE_CACHE_DB = os.environ.get("RESPONSE_CACHE_DB", "response_cache.db")
+RESPONSE_CACHE_TTL_SECONDS = int(os.environ.get("RESPONSE_CACHE_TTL_SECONDS", str(24 * 3600)))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get("RESPONSE_CACHE_MAX_ENTRIES", "5000"))
+RESPONSE_CACHE_SIMILARITY = float(os.environ.get("RESPONSE_CACHE_SIMILARITY", "0.93"))
+# In-memory LRU caches of the RAG queries (see chatbot/rag/query_cache.py): query embeddings,
+# and similarity search results of the current vector store version
+QUERY_EMBEDDING_CACHE_SIZE = int(os.environ.get("QUERY_EMBEDDING_CACHE_SIZE", "2048"))
+RETRIEVAL_CACHE_SIZE = int(os.environ.get("RETRIEVAL_CACHE_SIZE", "1024"))
+EMBEDDING_MODEL = os.environ.get("EMBEDDING_MODEL", "text-embedding-3-small")
+# Document embeddings (see chatbot/rag/embedding_cache.py): backend ("openai": EMBEDDING_MODEL,
+# "hashing": computed locally, offline), cache of the computed vectors, texts per call,
+# calls in flight and retries of a rate-limited call
+EMBEDDING_BACKEND = os.environ.get("EMBEDDING_BACKEND", "openai")
+EMBEDDING_DIMENSIONS = int(os.environ.get("EMBEDDING_DIMENSIONS", "1024"))
+EMBEDDING_CACHE_DB = os.environ.get("EMBEDDING_CACHE_DB", "embedding_cache.db")
+EMBEDDING_BATCH_SIZE = int(os.environ.get("EMBEDDING_BATCH_SIZE", "128"))
+EMBEDDING_CONCURRENCY = int(os.environ.get("EMBEDDING_CONCURRENCY", "4"))
+EMBEDDING_MAX_RETRIES = int(os.environ.get("EMBEDDING_MAX_RETRIES", "5"))
+
+# Shared LLM transport (see chatbot/llm_transport.py). The API key and base URL are
+# read from OPENAI_API_KEY / OPENAI_BASE_URL; LLM_BACKEND=stub answers locally (offline)
+LLM_BACKEND = os.environ.get("LLM_BACKEND", "openai")
+LLM_HTTP2 = os.environ.get("LLM_HTTP2", "1") == "1"
+LLM_MAX_CONNECTIONS = int(os.environ.get("LLM_MAX_CONNECTIONS", "20"))
+LLM_MAX_KEEPALIVE_CONNECTIONS = int(os.environ.get("LLM_MAX_KEEPALIVE_CONNECTIONS", "10"))
+LLM_KEEPALIVE_EXPIRY_SECONDS = float(os.environ.get("LLM_KEEPALIVE_EXPIRY_SECONDS", "120"))
+LLM_CONNECT_TIMEOUT_SECONDS = float(os.environ.get("LLM_CONNECT_TIMEOUT_SECONDS", "5"))
+LLM_TIMEOUT_SECONDS = float(os.environ.get("LLM_TIMEOUT_SECONDS", "60"))
+LLM_MAX_RETRIES = int(os.environ.get("LLM_MAX_RETRIES", "3"))
+LLM_RETRY_BASE_DELAY_SECONDS = float(os.environ.get("LLM_RETRY_BASE_DELAY_SECONDS", "0.5"))
+LLM_RETRY_MAX_DELAY_SECONDS = float(os.environ.get("LLM_RETRY_MAX_DELAY_SECONDS", "8"))
 
 # API settings
 MCP_HOST = os.environ.get("MCP_HOST", "127.0.0.1")
 MCP_PORT = int(os.environ.get("MCP_PORT", "8050"))
 MCP_NAME = os.environ.get("MCP_NAME", "RBC-RAG-MCP")
+
+# MCP transport of the assistant: "sse" (MCP server process) or "inprocess"
+# (tool functions called directly, when the app and the tools run on one node)
+MCP_TRANSPORT = os.environ.get("MCP_TRANSPORT", "sse")
+
+# Managed MCP client: pool of SSE sessions, heartbeat and reconnection
+MCP_POOL_SIZE = int(os.environ.get("MCP_POOL_SIZE", "4"))
+MCP_HEARTBEAT_SECONDS = float(os.environ.get("MCP_HEARTBEAT_SECONDS", "15"))
+MCP_PING_TIMEOUT_SECONDS = float(os.environ.get("MCP_PING_TIMEOUT_SECONDS", "5"))
+MCP_CONNECT_TIMEOUT_SECONDS = float(os.environ.get("MCP_CONNECT_TIMEOUT_SECONDS", "10"))
+MCP_RECONNECT_BASE_DELAY_SECONDS = float(os.environ.get("MCP_RECONNECT_BASE_DELAY_SECONDS", "0.5"))
+MCP_RECONNECT_MAX_DELAY_SECONDS = float(os.environ.get("MCP_RECONNECT_MAX_DELAY_SECONDS", "30"))
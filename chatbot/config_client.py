@@ -39,7 +39,7 @@ IMPORTANT INSTRUCTIONS:
 
 8. NEVER call transfer_funds unless the user explicitly asks to transfer money.
 
-9. For transaction history, use get_transaction_history with the exact account number.
+9. For transaction history, use get_transaction_history with the exact account number. If the user asks for older transactions, call it again with the next_cursor from the previous result as cursor.
 
 10. NEVER call multiple functions for the same request.
 
@@ -130,21 +130,26 @@ TOOL_DEFINITIONS = [
     },
     {
         "name": "get_account_balance",
-        "description": "Get the balance of a specific account.",
+        "description": "Get the balance of a specific account. To get several balances at once, pass account_numbers instead of account_number.",
         "parameters": {
             "type": "object",
             "properties": {
                 "account_number": {
                     "type": "string",
                     "description": "The account number (must be exact account number, not name): 1234567890 for checking, 2345678901 for savings, 3456789012 for credit card"
+                },
+                "account_numbers": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Several exact account numbers, to get all their balances in one call"
                 }
             },
-            "required": ["account_number"]
+            "required": []
         }
     },
     {
         "name": "get_transaction_history",
-        "description": "Get the transaction history for a specific account.",
+        "description": "Get the transaction history for a specific account, most recent first, one page at a time.",
         "parameters": {
             "type": "object",
             "properties": {
@@ -159,6 +164,14 @@ TOOL_DEFINITIONS = [
                 "days": {
                     "type": "integer",
                     "description": "Number of days of history to retrieve (default: 30)"
+                },
+                "cursor": {
+                    "type": "string",
+                    "description": "The next_cursor returned by a previous call, to get the next (older) page. Omit for the most recent transactions."
+                },
+                "page_size": {
+                    "type": "integer",
+                    "description": "Number of transactions per page (default: 20, max: 100)"
                 }
             },
             "required": ["user_id", "account_number"]
@@ -171,3 +184,25 @@ MODEL_CONFIG = {
     "model_name": "gpt-4o-mini",
     "temperature": 0.7
 }
+
+# Tools without side effects: several of them requested in the same turn run concurrently.
+# Any other tool (e.g. transfer_funds) runs alone, in the order the model asked for it.
+READ_ONLY_TOOLS = frozenset({
+    "answer_banking_question",
+    "list_user_accounts",
+    "list_target_accounts",
+    "get_account_balance",
+    "get_transaction_history"
+})
+
+# Maximum time for a single tool call, in seconds
+TOOL_CALL_TIMEOUT = 20
+
+# Agent loop bounds for one banking turn: model calls, and prompt + completion tokens
+MAX_TOOL_ITERATIONS = 4
+TURN_TOKEN_BUDGET = 12000
+
+# Rule-based fast path: unambiguous balance / account list / history questions are
+# answered by calling the tool directly, without the model (see chatbot/fast_path.py)
+FAST_PATH_ENABLED = True
+FAST_PATH_MIN_CONFIDENCE = 0.85
@@ -1,13 +1,108 @@
+import base64
 import sqlite3
+import threading
+import time
 import uuid
 from datetime import date
 from datetime import datetime
 from datetime import timedelta
 from decimal import Decimal
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from chatbot.models import Account
-from chatbot.config import DB_FILE, DB_INIT_SQL
+from chatbot.config import DB_FILE, DB_INIT_SQL, DB_MIGRATIONS_DIR, ACCOUNT_CACHE_TTL_SECONDS
+from chatbot.db_pool import connection
+
+
+class AccountCache:
+    """
+    Cache en mémoire (read-through) des lectures de comptes, par utilisateur.
+
+    Les entrées expirent après ttl_seconds et sont invalidées explicitement après
+    chaque virement validé (voir transfer_fund_between_accounts). Les lectures non
+    filtrées par utilisateur sont rangées sous la clé None.
+    """
+
+    def __init__(self, ttl_seconds: float = ACCOUNT_CACHE_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[Optional[str], Dict[tuple, Tuple[float, Any]]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get_or_load(self, user_id: Optional[str], key: tuple, loader):
+        """
+        Retourne la valeur en cache pour (user_id, key), ou l'obtient via loader() en cas d'absence.
+
+        :param user_id: Utilisateur propriétaire des données (None pour une lecture non filtrée)
+        :param key: Clé de la lecture, ex. ('account', numéro)
+        :param loader: Fonction sans argument qui lit la valeur en base
+        """
+        found, value = self.lookup(user_id, key)
+        if found:
+            return value
+        value = loader()
+        self.store(user_id, key, value)
+        return value
+
+    def lookup(self, user_id: Optional[str], key: tuple) -> Tuple[bool, Any]:
+        """Retourne (True, valeur) si une entrée valide existe, (False, None) sinon."""
+        if self.ttl_seconds <= 0:
+            return False, None
+        with self._lock:
+            entry = self._entries.get(user_id, {}).get(key)
+            if entry and entry[0] > time.monotonic():
+                self.hits += 1
+                return True, entry[1]
+            self.misses += 1
+        return False, None
+
+    def store(self, user_id: Optional[str], key: tuple, value: Any):
+        """Enregistre une valeur lue en base."""
+        if self.ttl_seconds <= 0:
+            return
+        with self._lock:
+            self._entries.setdefault(user_id, {})[key] = (time.monotonic() + self.ttl_seconds, value)
+
+    def invalidate_users(self, user_ids):
+        """Supprime les entrées des utilisateurs donnés ainsi que les lectures non filtrées."""
+        with self._lock:
+            for user_id in set(user_ids) | {None}:
+                if self._entries.pop(user_id, None) is not None:
+                    self.invalidations += 1
+
+    def clear(self):
+        """Vide entièrement le cache."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Retourne les compteurs hits/misses et la taille du cache."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "invalidations": self.invalidations,
+                "users": len(self._entries),
+                "entries": sum(len(entries) for entries in self._entries.values()),
+                "ttl_seconds": self.ttl_seconds
+            }
+
+
+# Process-wide cache of balances and account lists
+account_cache = AccountCache()
+
+
+def _copy_accounts(accounts):
+    """Copies des dictionnaires de comptes, pour que l'appelant ne modifie pas le cache."""
+    if accounts is None:
+        return None
+    if isinstance(accounts, list):
+        return [dict(account) for account in accounts]
+    return dict(accounts)
 
 
 def auth_user(user_id: str, password: str) -> bool:
@@ -19,12 +114,9 @@ def auth_user(user_id: str, password: str) -> bool:
     :return: True if user ID and password are matched, False otherwise.
     """
     sql = "SELECT UserId FROM UserCredentials WHERE UserId=:user_id AND Password=:password"
-    con = sqlite3.connect('bank.db')
-    cur = con.cursor()
-    cur.execute(sql, {"user_id": user_id, "password": password})
-    authenticated = cur.fetchone() is not None
-    con.close()
-    return authenticated
+    with connection() as con:
+        cur = con.execute(sql, {"user_id": user_id, "password": password})
+        return cur.fetchone() is not None
 
 
 def load_accounts() -> list[Account]:
@@ -36,11 +128,8 @@ def load_accounts() -> list[Account]:
     print(f"he is here")
 
     sql = "SELECT AccountNumber, AccountName, Balance FROM Accounts"
-    con = sqlite3.connect(DB_FILE)
-    con.row_factory = sqlite3.Row
-    cur = con.cursor()
-    cur.execute(sql)
-    rows = cur.fetchall()
+    with connection() as con:
+        rows = con.execute(sql).fetchall()
     accounts = []
     for row in rows:
         account = Account()
@@ -48,7 +137,6 @@ def load_accounts() -> list[Account]:
         account.account_name = row['AccountName']
         account.balance = Decimal(str(row['Balance']))
         accounts.append(account)
-    con.close()
     return accounts
 
 
@@ -64,11 +152,8 @@ def load_transfer_target_accounts(from_account: str) -> list[Account]:
     FROM Accounts 
     WHERE AccountNumber != :from_account
     """
-    con = sqlite3.connect(DB_FILE)
-    con.row_factory = sqlite3.Row
-    cur = con.cursor()
-    cur.execute(sql, {"from_account": from_account})
-    rows = cur.fetchall()
+    with connection() as con:
+        rows = con.execute(sql, {"from_account": from_account}).fetchall()
     accounts = []
     for row in rows:
         account = Account()
@@ -76,7 +161,6 @@ def load_transfer_target_accounts(from_account: str) -> list[Account]:
         account.account_name = row['AccountName']
         account.balance = Decimal(str(row['Balance']))
         accounts.append(account)
-    con.close()
     return accounts
 
 
@@ -98,65 +182,83 @@ def transfer_fund_between_accounts(user_id: str,
     if not isinstance(amount, Decimal):
         amount = Decimal(str(amount))
     
-    con = sqlite3.connect(DB_FILE)
-    cur = con.cursor()
-    
-    try:
-        # Start a transaction
-        con.execute("BEGIN TRANSACTION")
-        
-        # Convert amount to string for SQLite
-        amount_str = str(amount)
-        
-        # Deduct from source account
-        cur.execute(
-            "UPDATE Accounts SET Balance = Balance - ? WHERE  AccountNumber=?",
-            (amount_str, user_id, from_account)
-        )
-        
-        # Add to destination account
-        cur.execute(
-            "UPDATE Accounts SET Balance = Balance + ? WHERE AccountNumber=?",
-            (amount_str, user_id, to_account)
-        )
-        
-        # Get the updated balances after the transfer
-        cur.execute("SELECT Balance FROM Accounts WHERE  AccountNumber=?", 
-                   (user_id, from_account))
-        from_account_balance = cur.fetchone()[0]
-        
-        cur.execute("SELECT Balance FROM Accounts WHERE  AccountNumber=?", 
-                   (user_id, to_account))
-        to_account_balance = cur.fetchone()[0]
-        
-        # Record the transfer with balances
-        import uuid
-        import datetime
-        transaction_id = str(uuid.uuid4())
-        current_time = datetime.datetime.now().isoformat()
+    with connection() as con:
+        cur = con.cursor()
         
-        cur.execute(
-            """
-            INSERT INTO Transfers (
-                TransactionNumber, FromAccountNumber, ToAccountNumber, 
-                TransferDateTime, Amount, FromAccountBalance, ToAccountBalance
+        try:
+            # Start a transaction (IMMEDIATE: the balance checked below cannot change before the debit)
+            con.execute("BEGIN IMMEDIATE TRANSACTION")
+            
+            if not amount.is_finite() or amount <= 0:
+                raise ValueError(f"Invalid transfer amount: {amount}")
+            if from_account == to_account:
+                raise ValueError("Cannot transfer to the same account")
+            
+            # Both accounts must belong to the user
+            cur.execute("SELECT Balance FROM Accounts WHERE AccountNumber=? AND UserId=?", (from_account, user_id))
+            row = cur.fetchone()
+            if row is None:
+                raise ValueError(f"Account {from_account} not found for user {user_id}")
+            if Decimal(str(row[0])) < amount:
+                raise ValueError(f"Insufficient funds in account {from_account}")
+            
+            # Convert amount to string for SQLite
+            amount_str = str(amount)
+            
+            # Deduct from source account
+            cur.execute(
+                "UPDATE Accounts SET Balance = Balance - ? WHERE AccountNumber=? AND UserId=?",
+                (amount_str, from_account, user_id)
             )
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-            """,
-            (transaction_id, from_account, to_account, current_time, 
-             amount_str, from_account_balance, to_account_balance)
-        )
-        
-        # Commit the transaction
-        con.commit()
-        print(f"[DEBUG] Transfer successful: {amount_str} from {from_account} to {to_account}")
-    except Exception as e:
-        # Rollback in case of error
-        con.rollback()
-        print(f"[ERROR] Database error during transfer: {str(e)}")
-        raise e
-    finally:
-        con.close()
+            if cur.rowcount != 1:
+                raise ValueError(f"Account {from_account} not found for user {user_id}")
+            
+            # Add to destination account
+            cur.execute(
+                "UPDATE Accounts SET Balance = Balance + ? WHERE AccountNumber=? AND UserId=?",
+                (amount_str, to_account, user_id)
+            )
+            if cur.rowcount != 1:
+                raise ValueError(f"Account {to_account} not found for user {user_id}")
+            
+            # Get the updated balances after the transfer
+            cur.execute("SELECT Balance FROM Accounts WHERE AccountNumber=?", (from_account,))
+            from_account_balance = cur.fetchone()[0]
+            
+            cur.execute("SELECT Balance FROM Accounts WHERE AccountNumber=?", (to_account,))
+            to_account_balance = cur.fetchone()[0]
+            
+            # Record the transfer with balances
+            transaction_id = str(uuid.uuid4())
+            current_time = datetime.now().isoformat()
+            
+            cur.execute(
+                """
+                INSERT INTO Transfers (
+                    TransactionNumber, FromAccountNumber, ToAccountNumber, 
+                    TransferDateTime, Amount, FromAccountBalance, ToAccountBalance
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (transaction_id, from_account, to_account, current_time, 
+                 amount_str, from_account_balance, to_account_balance)
+            )
+            
+            # Owners whose cached balances become stale
+            owners = [row[0] for row in cur.execute(
+                "SELECT DISTINCT UserId FROM Accounts WHERE AccountNumber IN (?, ?)",
+                (from_account, to_account)
+            )]
+            
+            # Commit the transaction
+            con.commit()
+            account_cache.invalidate_users(owners)
+            print(f"[DEBUG] Transfer successful: {amount_str} from {from_account} to {to_account}")
+        except Exception as e:
+            # Rollback in case of error
+            con.rollback()
+            print(f"[ERROR] Database error during transfer: {str(e)}")
+            raise e
 
 
 # === NOUVELLES FONCTIONS POUR LES REQUÊTES DE COMPTES ===
@@ -169,6 +271,13 @@ def get_account_by_number(account_number: str, user_id: str = None) -> Optional[
     :param user_id: ID utilisateur (optionnel pour filtrage)
     :return: Dictionnaire avec les infos du compte ou None si non trouvé
     """
+    return _copy_accounts(account_cache.get_or_load(
+        user_id, ('account', account_number),
+        lambda: _load_account_by_number(account_number, user_id)
+    ))
+
+
+def _load_account_by_number(account_number: str, user_id: str = None) -> Optional[Dict[str, Any]]:
     if user_id:
         sql = "SELECT AccountNumber, AccountName, Balance FROM Accounts WHERE AccountNumber = ? AND UserId = ?"
         params = (account_number, user_id)
@@ -176,12 +285,8 @@ def get_account_by_number(account_number: str, user_id: str = None) -> Optional[
         sql = "SELECT AccountNumber, AccountName, Balance FROM Accounts WHERE AccountNumber = ?"
         params = (account_number,)
     
-    con = sqlite3.connect(DB_FILE)
-    con.row_factory = sqlite3.Row
-    cur = con.cursor()
-    cur.execute(sql, params)
-    row = cur.fetchone()
-    con.close()
+    with connection() as con:
+        row = con.execute(sql, params).fetchone()
     
     if row:
         return {
@@ -192,6 +297,47 @@ def get_account_by_number(account_number: str, user_id: str = None) -> Optional[
     return None
 
 
+def get_accounts_by_numbers(account_numbers: List[str], user_id: str = None) -> Dict[str, Optional[Dict[str, Any]]]:
+    """
+    Récupère plusieurs comptes en un seul aller-retour vers la base.
+
+    Les comptes déjà en cache ne sont pas relus ; les autres sont lus avec une seule requête IN.
+
+    :param account_numbers: Les numéros de compte
+    :param user_id: ID utilisateur (optionnel pour filtrage)
+    :return: Dictionnaire numéro -> infos du compte (None si non trouvé), dans l'ordre demandé
+    """
+    accounts = {}
+    missing = []
+    for account_number in dict.fromkeys(account_numbers):
+        found, account = account_cache.lookup(user_id, ('account', account_number))
+        if found:
+            accounts[account_number] = account
+        else:
+            accounts[account_number] = None
+            missing.append(account_number)
+
+    if missing:
+        placeholders = ", ".join("?" * len(missing))
+        sql = f"SELECT AccountNumber, AccountName, Balance FROM Accounts WHERE AccountNumber IN ({placeholders})"
+        params = list(missing)
+        if user_id:
+            sql += " AND UserId = ?"
+            params.append(user_id)
+        with connection() as con:
+            rows = con.execute(sql, params).fetchall()
+        for row in rows:
+            accounts[row['AccountNumber']] = {
+                'account_number': row['AccountNumber'],
+                'account_name': row['AccountName'],
+                'balance': Decimal(str(row['Balance']))
+            }
+        for account_number in missing:
+            account_cache.store(user_id, ('account', account_number), accounts[account_number])
+
+    return {number: _copy_accounts(account) for number, account in accounts.items()}
+
+
 def get_account_by_name(account_name: str, user_id: str = None) -> Optional[Dict[str, Any]]:
     """
     Récupère les informations d'un compte par son nom.
@@ -207,12 +353,8 @@ def get_account_by_name(account_name: str, user_id: str = None) -> Optional[Dict
         sql = "SELECT AccountNumber, AccountName, Balance FROM Accounts WHERE LOWER(AccountName) LIKE LOWER(?)"
         params = (f"%{account_name}%",)
     
-    con = sqlite3.connect(DB_FILE)
-    con.row_factory = sqlite3.Row
-    cur = con.cursor()
-    cur.execute(sql, params)
-    row = cur.fetchone()
-    con.close()
+    with connection() as con:
+        row = con.execute(sql, params).fetchone()
     
     if row:
         return {
@@ -230,6 +372,12 @@ def get_all_accounts_info(user_id: str = None) -> List[Dict[str, Any]]:
     :param user_id: ID utilisateur (optionnel pour filtrage)
     :return: Liste des dictionnaires avec les infos des comptes
     """
+    return _copy_accounts(account_cache.get_or_load(
+        user_id, ('accounts',), lambda: _load_all_accounts_info(user_id)
+    ))
+
+
+def _load_all_accounts_info(user_id: str = None) -> List[Dict[str, Any]]:
     if user_id:
         sql = "SELECT AccountNumber, AccountName, Balance FROM Accounts WHERE UserId = ? ORDER BY AccountName"
         params = (user_id,)
@@ -237,12 +385,8 @@ def get_all_accounts_info(user_id: str = None) -> List[Dict[str, Any]]:
         sql = "SELECT AccountNumber, AccountName, Balance FROM Accounts ORDER BY AccountName"
         params = ()
     
-    con = sqlite3.connect(DB_FILE)
-    con.row_factory = sqlite3.Row
-    cur = con.cursor()
-    cur.execute(sql, params)
-    rows = cur.fetchall()
-    con.close()
+    with connection() as con:
+        rows = con.execute(sql, params).fetchall()
     
     accounts = []
     for row in rows:
@@ -254,58 +398,96 @@ def get_all_accounts_info(user_id: str = None) -> List[Dict[str, Any]]:
     return accounts
 
 
-def get_account_transactions(account_number: str, user_id: str = None, limit: int = 10) -> List[Dict[str, Any]]:
+# Keyset-paginated history of one account, newest first. Each side of the transfer
+# is an indexed range scan (see migration 0001) and the two are merged with UNION ALL,
+# so a page costs O(page_size) whatever the size of Transfers.
+ACCOUNT_HISTORY_PAGE_SQL = """
+SELECT * FROM (
+    SELECT TransactionNumber, 'DEBIT' AS Type, ToAccountNumber AS OtherAccount,
+           Amount, TransferDateTime, FromAccountBalance AS BalanceAfter
+    FROM Transfers
+    WHERE FromAccountNumber = :account_number
+      AND TransferDateTime >= :since
+      AND (TransferDateTime, TransactionNumber) < (:cursor_datetime, :cursor_id)
+    ORDER BY TransferDateTime DESC, TransactionNumber DESC
+    LIMIT :limit
+)
+UNION ALL
+SELECT * FROM (
+    SELECT TransactionNumber, 'CREDIT' AS Type, FromAccountNumber AS OtherAccount,
+           Amount, TransferDateTime, ToAccountBalance AS BalanceAfter
+    FROM Transfers
+    WHERE ToAccountNumber = :account_number
+      AND FromAccountNumber != :account_number
+      AND TransferDateTime >= :since
+      AND (TransferDateTime, TransactionNumber) < (:cursor_datetime, :cursor_id)
+    ORDER BY TransferDateTime DESC, TransactionNumber DESC
+    LIMIT :limit
+)
+ORDER BY TransferDateTime DESC, TransactionNumber DESC
+LIMIT :limit
+"""
+
+# Cursor position meaning "from the most recent transfer"
+_HISTORY_START = ("9999-12-31T23:59:59", "")
+
+
+def encode_history_cursor(transfer_datetime: str, transaction_number: str) -> str:
     """
-    Récupère les dernières transactions d'un compte.
-    
+    Encode la position (date, numéro de transaction) d'une transaction en curseur opaque.
+    """
+    raw = f"{transfer_datetime}|{transaction_number}".encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_history_cursor(cursor: str) -> Tuple[str, str]:
+    """
+    Décode un curseur produit par encode_history_cursor.
+
+    :raises ValueError: si le curseur est invalide
+    """
+    try:
+        transfer_datetime, transaction_number = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+    except Exception:
+        raise ValueError(f"Invalid history cursor: {cursor!r}")
+    return transfer_datetime, transaction_number
+
+
+def get_account_transactions_page(account_number: str, user_id: str = None, cursor: str = None,
+                                  page_size: int = 20, since: str = "") -> Dict[str, Any]:
+    """
+    Récupère une page de l'historique d'un compte, de la plus récente à la plus ancienne.
+
     :param account_number: Le numéro du compte
     :param user_id: ID utilisateur (optionnel pour filtrage)
-    :param limit: Nombre maximum de transactions à retourner
-    :return: Liste des transactions
-    """
-    # Vérifier d'abord que le compte appartient à l'utilisateur si user_id est fourni
-    if user_id:
-        account_check_sql = "SELECT 1 FROM Accounts WHERE AccountNumber = ? AND UserId = ?"
-        con_check = sqlite3.connect(DB_FILE)
-        cur_check = con_check.cursor()
-        cur_check.execute(account_check_sql, (account_number, user_id))
-        if not cur_check.fetchone():
-            con_check.close()
-            return []  # Compte non trouvé ou n'appartient pas à l'utilisateur
-        con_check.close()
-    
-    sql = """
-    SELECT 
-        TransactionNumber,
-        CASE 
-            WHEN FromAccountNumber = ? THEN 'DEBIT'
-            WHEN ToAccountNumber = ? THEN 'CREDIT'
-        END as Type,
-        CASE 
-            WHEN FromAccountNumber = ? THEN ToAccountNumber
-            WHEN ToAccountNumber = ? THEN FromAccountNumber
-        END as OtherAccount,
-        Amount,
-        TransferDateTime,
-        CASE 
-            WHEN FromAccountNumber = ? THEN FromAccountBalance
-            WHEN ToAccountNumber = ? THEN ToAccountBalance
-        END as BalanceAfter
-    FROM Transfers 
-    WHERE FromAccountNumber = ? OR ToAccountNumber = ?
-    ORDER BY TransferDateTime DESC
-    LIMIT ?
+    :param cursor: Curseur renvoyé par la page précédente (None pour la première page)
+    :param page_size: Nombre maximum de transactions par page
+    :param since: Date ISO minimale des transactions (optionnelle)
+    :return: {'transactions': [...], 'next_cursor': curseur de la page suivante ou None}
     """
-    
-    con = sqlite3.connect(DB_FILE)
-    con.row_factory = sqlite3.Row
-    cur = con.cursor()
-    cur.execute(sql, (account_number, account_number, account_number, 
-                     account_number, account_number, account_number,
-                     account_number, account_number, limit))
-    rows = cur.fetchall()
-    con.close()
-    
+    cursor_datetime, cursor_id = decode_history_cursor(cursor) if cursor else _HISTORY_START
+    params = {
+        "account_number": account_number,
+        "since": since or "",
+        "cursor_datetime": cursor_datetime,
+        "cursor_id": cursor_id,
+        # One extra row tells whether there is a next page
+        "limit": page_size + 1
+    }
+    account_check_sql = "SELECT 1 FROM Accounts WHERE AccountNumber = ? AND UserId = ?"
+
+    with connection() as con:
+        # Vérifier d'abord que le compte appartient à l'utilisateur si user_id est fourni
+        if user_id and not con.execute(account_check_sql, (account_number, user_id)).fetchone():
+            return {'transactions': [], 'next_cursor': None}
+        rows = con.execute(ACCOUNT_HISTORY_PAGE_SQL, params).fetchall()
+
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        next_cursor = encode_history_cursor(last['TransferDateTime'], last['TransactionNumber'])
+
     transactions = []
     for row in rows:
         transactions.append({
@@ -316,8 +498,20 @@ def get_account_transactions(account_number: str, user_id: str = None, limit: in
             'date_time': row['TransferDateTime'],
             'balance_after': Decimal(str(row['BalanceAfter']))
         })
+
+    return {'transactions': transactions, 'next_cursor': next_cursor}
+
+
+def get_account_transactions(account_number: str, user_id: str = None, limit: int = 10) -> List[Dict[str, Any]]:
+    """
+    Récupère les dernières transactions d'un compte.
     
-    return transactions
+    :param account_number: Le numéro du compte
+    :param user_id: ID utilisateur (optionnel pour filtrage)
+    :param limit: Nombre maximum de transactions à retourner
+    :return: Liste des transactions
+    """
+    return get_account_transactions_page(account_number, user_id, page_size=limit)['transactions']
 
 def get_total_balance(user_id: str = None) -> Decimal:
     """
@@ -326,6 +520,10 @@ def get_total_balance(user_id: str = None) -> Decimal:
     :param user_id: ID utilisateur (optionnel pour filtrage)
     :return: Solde total
     """
+    return account_cache.get_or_load(user_id, ('total',), lambda: _load_total_balance(user_id))
+
+
+def _load_total_balance(user_id: str = None) -> Decimal:
     if user_id:
         sql = "SELECT SUM(Balance) as TotalBalance FROM Accounts WHERE UserId = ?"
         params = (user_id,)
@@ -333,11 +531,8 @@ def get_total_balance(user_id: str = None) -> Decimal:
         sql = "SELECT SUM(Balance) as TotalBalance FROM Accounts"
         params = ()
     
-    con = sqlite3.connect(DB_FILE)
-    cur = con.cursor()
-    cur.execute(sql, params)
-    result = cur.fetchone()
-    con.close()
+    with connection() as con:
+        result = con.execute(sql, params).fetchone()
     
     return Decimal(str(result[0])) if result[0] else Decimal('0.00')
 
@@ -357,12 +552,8 @@ def search_accounts(query: str) -> List[Dict[str, Any]]:
     """
     
     search_term = f"%{query}%"
-    con = sqlite3.connect(DB_FILE)
-    con.row_factory = sqlite3.Row
-    cur = con.cursor()
-    cur.execute(sql, (search_term, search_term))
-    rows = cur.fetchall()
-    con.close()
+    with connection() as con:
+        rows = con.execute(sql, (search_term, search_term)).fetchall()
     
     accounts = []
     for row in rows:
@@ -390,47 +581,75 @@ def get_account_balance(account_identifier: str) -> Optional[Decimal]:
     return account['balance'] if account else None
 
 
-def get_total_balance() -> Decimal:
+def apply_migrations(con) -> int:
     """
-    Calcule le solde total de tous les comptes.
-    
-    :return: Solde total
+    Apply the pending schema migrations, in version order.
+
+    Migrations are the ``NNNN_description.sql`` files in DB_MIGRATIONS_DIR. The
+    highest applied version is tracked in the schema_version table and each
+    migration runs in its own transaction together with its version bump.
+
+    :param con: Open connection to the database to migrate.
+    :return: Number of migrations applied.
     """
-    sql = "SELECT SUM(Balance) as TotalBalance FROM Accounts"
-    con = sqlite3.connect(DB_FILE)
-    cur = con.cursor()
-    cur.execute(sql)
-    result = cur.fetchone()
-    con.close()
-    
-    return Decimal(str(result[0])) if result[0] else Decimal('0.00')
+    con.execute("""
+    CREATE TABLE IF NOT EXISTS schema_version (
+      Version   INTEGER NOT NULL PRIMARY KEY,
+      Name      TEXT    NOT NULL,
+      AppliedAt TEXT    NOT NULL
+    )
+    """)
+    con.commit()
+    current_version = con.execute("SELECT COALESCE(MAX(Version), 0) FROM schema_version").fetchone()[0]
+
+    applied = 0
+    for migration in sorted(Path(DB_MIGRATIONS_DIR).glob("*.sql")):
+        version = int(migration.name.split("_", 1)[0])
+        if version <= current_version:
+            continue
+        script = migration.read_text()
+        try:
+            con.executescript(
+                f"BEGIN;\n{script}\n"
+                f"INSERT INTO schema_version (Version, Name, AppliedAt) "
+                f"VALUES ({version}, '{migration.stem}', datetime('now'));\n"
+                f"COMMIT;"
+            )
+        except sqlite3.Error:
+            if con.in_transaction:
+                con.rollback()
+            print(f"[ERROR] Migration {migration.name} failed on {DB_FILE}")
+            raise
+        print(f"Applied migration {migration.name} to {DB_FILE}")
+        applied += 1
+    return applied
 
 
 def init_db():
     """
-    Create the database and add inital test data.
+    Create the database and add inital test data, then apply pending migrations.
     """
     # Check if database file already exists and has tables
     db_exists = Path(DB_FILE).exists()
+    table_exists = False
     
     if db_exists:
         # Check if tables already exist
-        con = sqlite3.connect(DB_FILE)
-        cur = con.cursor()
-        cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='UserCredentials'")
-        table_exists = cur.fetchone() is not None
-        con.close()
+        with connection() as con:
+            cur = con.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='UserCredentials'")
+            table_exists = cur.fetchone() is not None
         
         if table_exists:
             print(f"Database {DB_FILE} already initialized.")
-            return
     
-    # Create and initialize the database
-    with open(DB_INIT_SQL) as sql_file:
-        sql = sql_file.read()
-        con = sqlite3.connect(DB_FILE)
-        cur = con.cursor()
-        cur.executescript(sql)
-        con.commit()
-        con.close()
-        print(f"Database {DB_FILE} initialized successfully.")
\ No newline at end of file
+    if not table_exists:
+        # Create and initialize the database
+        with open(DB_INIT_SQL) as sql_file:
+            sql = sql_file.read()
+        with connection() as con:
+            con.executescript(sql)
+            con.commit()
+        print(f"Database {DB_FILE} initialized successfully.")
+
+    with connection() as con:
+        apply_migrations(con)
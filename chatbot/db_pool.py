@@ -0,0 +1,154 @@
+"""Pooled SQLite connections shared by the chatbot and the back office.
+
+Opening a connection (and re-preparing every statement) used to dominate the
+cost of the small point queries in database.py. Connections handed out here are
+kept open and reused, so sqlite3's per-connection statement cache is reused too,
+and each one is configured once with WAL journaling and tuned pragmas.
+
+Usage::
+
+    with connection() as con:            # rows are sqlite3.Row by default
+        con.execute(sql, params).fetchone()
+
+    conn = connect(GENERAL_DB_FILE)       # drop-in for sqlite3.connect(...)
+    ...
+    conn.close()                          # returns the connection to the pool
+"""
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict, List
+
+from chatbot.config import (
+    DB_FILE, DB_POOL_MAX_IDLE, DB_BUSY_TIMEOUT_SECONDS, DB_STATEMENT_CACHE_SIZE,
+    DB_CACHE_SIZE_KB, DB_MMAP_SIZE
+)
+
+
+class PooledConnection:
+    """Proxy to a pooled sqlite3 connection; close() gives it back to the pool."""
+
+    def __init__(self, pool: "ConnectionPool", con: sqlite3.Connection):
+        object.__setattr__(self, "_pool", pool)
+        object.__setattr__(self, "_con", con)
+
+    def __getattr__(self, name):
+        con = object.__getattribute__(self, "_con")
+        if con is None:
+            raise sqlite3.ProgrammingError("Cannot operate on a closed database.")
+        return getattr(con, name)
+
+    def __setattr__(self, name, value):
+        # e.g. row_factory: applies to the underlying connection
+        setattr(self._con, name, value)
+
+    def __enter__(self):
+        self._con.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return self._con.__exit__(exc_type, exc, tb)
+
+    def close(self):
+        """Return the connection to the pool (uncommitted changes are rolled back)."""
+        con = object.__getattribute__(self, "_con")
+        if con is not None:
+            object.__setattr__(self, "_con", None)
+            self._pool.release(con)
+
+
+class ConnectionPool:
+    """Pool of configured connections to one SQLite database file."""
+
+    def __init__(self, db_file: str, max_idle: int = DB_POOL_MAX_IDLE):
+        self.db_file = db_file
+        self.max_idle = max_idle
+        self._idle: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self.created = 0
+
+    def _new_connection(self) -> sqlite3.Connection:
+        con = sqlite3.connect(
+            self.db_file,
+            timeout=DB_BUSY_TIMEOUT_SECONDS,
+            check_same_thread=False,
+            cached_statements=DB_STATEMENT_CACHE_SIZE
+        )
+        con.execute("PRAGMA journal_mode=WAL")
+        con.execute("PRAGMA synchronous=NORMAL")
+        con.execute(f"PRAGMA cache_size=-{DB_CACHE_SIZE_KB}")
+        con.execute(f"PRAGMA mmap_size={DB_MMAP_SIZE}")
+        con.execute("PRAGMA temp_store=MEMORY")
+        self.created += 1
+        return con
+
+    def acquire(self) -> PooledConnection:
+        """Take an idle connection, or open a new one if none is available."""
+        with self._lock:
+            con = self._idle.pop() if self._idle else None
+        if con is None:
+            con = self._new_connection()
+        con.row_factory = None
+        return PooledConnection(self, con)
+
+    def release(self, con: sqlite3.Connection):
+        """Give a connection back; extra connections beyond max_idle are closed."""
+        try:
+            if con.in_transaction:
+                con.rollback()
+        except sqlite3.Error:
+            con.close()
+            return
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(con)
+                return
+        con.close()
+
+    def close_all(self):
+        """Close every idle connection."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for con in idle:
+            con.close()
+
+
+_pools: Dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_file: str = DB_FILE) -> ConnectionPool:
+    """Return the pool for a database file, creating it on first use."""
+    key = os.path.abspath(db_file)
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                pool = _pools[key] = ConnectionPool(key)
+    return pool
+
+
+def connect(db_file: str = DB_FILE) -> PooledConnection:
+    """Pooled replacement for sqlite3.connect(db_file)."""
+    return get_pool(db_file).acquire()
+
+
+@contextmanager
+def connection(db_file: str = DB_FILE, row_factory=sqlite3.Row):
+    """Borrow a pooled connection for the duration of a with block."""
+    con = connect(db_file)
+    con.row_factory = row_factory
+    try:
+        yield con
+    finally:
+        con.close()
+
+
+def close_all_pools():
+    """Close the idle connections of every pool."""
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        pool.close_all()
@@ -0,0 +1,153 @@
+"""Rule-based fast path for simple account questions.
+
+"What is my savings balance?", "list my accounts" or "historique du compte
+1234567890" do not need the model: the intent and the account are explicit, and
+the answer is a single tool result. FastPathRouter recognizes these questions
+and returns the tool call to make directly, with a confidence score; anything
+ambiguous (several intents, unknown account, comparisons, conditions, long
+messages) is left to the LLM. Transfers are never routed here.
+
+The aliases ("savings", "compte courant"...) resolve through ACCOUNT_MAPPINGS,
+i.e. to the accounts of the demo user: the caller checks that the accounts of a
+route belong to the user (FastPathRoute.account_numbers) and declines it
+otherwise.
+"""
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from chatbot.config import ACCOUNT_MAPPINGS
+from chatbot.config_client import FAST_PATH_MIN_CONFIDENCE
+from chatbot.intent_detector import IntentDetector
+from chatbot.response_cache import is_account_specific
+
+# Tool answering each routed intent
+ROUTED_TOOLS = {
+    "account_balance": "get_account_balance",
+    "account_list": "list_user_accounts",
+    "transactions": "get_transaction_history"
+}
+
+# English keywords, in addition to IntentDetector.BANKING_INTENTS (French)
+ENGLISH_INTENTS = {
+    "account_balance": ["balance", "how much"],
+    "account_list": ["my accounts", "list accounts", "all accounts"],
+    "transactions": ["transactions", "transaction", "history", "statement", "recent activity"],
+    "transfer": ["transfer", "send money", "wire", "move money", "pay"]
+}
+
+# Words that call for reasoning, comparison or conditions: let the model answer
+LLM_REQUIRED_PATTERN = re.compile(
+    r"\b(why|pourquoi|compare|comparer|highest|lowest|most|least|more|less|plus|moins|should|devrais"
+    r"|if|si|can i|puis-je|afford|explain|expliquer|how do|comment|since|depuis|between|entre"
+    r"|last month|mois dernier|average|moyenne|total)\b",
+    re.IGNORECASE
+)
+
+ACCOUNT_NUMBER_PATTERN = re.compile(IntentDetector.ACCOUNT_PATTERNS['account_id'])
+
+# Messages longer than this are rarely a single lookup
+MAX_FAST_PATH_WORDS = 15
+
+
+@dataclass(frozen=True)
+class FastPathRoute:
+    """Tool call answering a question without the model."""
+    intent: str
+    tool: str
+    arguments: Dict[str, Any]
+    confidence: float
+
+    @property
+    def account_numbers(self) -> List[str]:
+        """Accounts named by the route (empty for the account list)."""
+        if "account_number" in self.arguments:
+            return [self.arguments["account_number"]]
+        return list(self.arguments.get("account_numbers", ()))
+
+
+def _keyword_pattern(keywords: List[str]):
+    return re.compile(r"(?<!\w)(" + "|".join(re.escape(k) for k in sorted(keywords, key=len, reverse=True)) + r")(?!\w)")
+
+
+class FastPathRouter:
+    """Confidence-gated router from a user message to a direct tool call."""
+
+    def __init__(self, account_mappings: Dict[str, str] = None, min_confidence: float = FAST_PATH_MIN_CONFIDENCE):
+        account_mappings = ACCOUNT_MAPPINGS if account_mappings is None else account_mappings
+        self.min_confidence = min_confidence
+        intents = {intent: list(keywords) for intent, keywords in IntentDetector.BANKING_INTENTS.items()}
+        for intent, keywords in ENGLISH_INTENTS.items():
+            intents.setdefault(intent, []).extend(keywords)
+        self._intent_patterns = {intent: _keyword_pattern(keywords) for intent, keywords in intents.items()}
+        # Longest alias first: "compte épargne" before "épargne"
+        self._aliases = sorted(account_mappings.items(), key=lambda item: len(item[0]), reverse=True)
+        self._alias_pattern = _keyword_pattern([alias for alias, _ in self._aliases]) if self._aliases else None
+        self._account_mappings = {alias.lower(): number for alias, number in account_mappings.items()}
+
+    def detect_intents(self, text: str) -> List[str]:
+        """Return every intent whose keywords appear in the text."""
+        text_lower = text.lower()
+        return [intent for intent, pattern in self._intent_patterns.items() if pattern.search(text_lower)]
+
+    def resolve_accounts(self, text: str) -> List[str]:
+        """Return the account numbers named in the text (explicit numbers, then aliases), without duplicates."""
+        accounts = ACCOUNT_NUMBER_PATTERN.findall(text)
+        if self._alias_pattern:
+            accounts += [self._account_mappings[alias] for alias in self._alias_pattern.findall(text.lower())]
+        return list(dict.fromkeys(accounts))
+
+    def classify(self, text: str) -> Optional[FastPathRoute]:
+        """
+        Return the candidate route of a message and its confidence (possibly below the threshold).
+
+        Args:
+            text: User message
+
+        Returns:
+            FastPathRoute, or None if the message is not a routable account question
+        """
+        intents = self.detect_intents(text)
+        # Never a transfer, and a single intent only
+        if "transfer" in intents or len(intents) != 1 or intents[0] not in ROUTED_TOOLS:
+            return None
+        intent = intents[0]
+        accounts = self.resolve_accounts(text)
+        confidence = 1.0
+
+        if intent == "account_balance":
+            if not accounts:
+                return None
+            arguments = {"account_number": accounts[0]} if len(accounts) == 1 else {"account_numbers": accounts}
+        elif intent == "transactions":
+            if len(accounts) != 1:
+                return None
+            arguments = {"account_number": accounts[0]}
+        else:
+            # "mes comptes" / "my accounts" only: not a question about account products
+            if not is_account_specific(text):
+                return None
+            arguments = {}
+            if accounts:
+                confidence *= 0.8
+
+        # An alias is less certain than an explicit account number
+        if accounts and not ACCOUNT_NUMBER_PATTERN.search(text):
+            confidence *= 0.95
+        if LLM_REQUIRED_PATTERN.search(text):
+            confidence *= 0.5
+        if len(text.split()) > MAX_FAST_PATH_WORDS:
+            confidence *= 0.7
+
+        return FastPathRoute(intent=intent, tool=ROUTED_TOOLS[intent], arguments=arguments, confidence=confidence)
+
+    def route(self, text: str) -> Optional[FastPathRoute]:
+        """Return the route of a message if its confidence reaches min_confidence, else None."""
+        route = self.classify(text)
+        if route is None or route.confidence < self.min_confidence:
+            return None
+        return route
+
+
+# Shared router (stateless)
+fast_path_router = FastPathRouter()
@@ -0,0 +1,332 @@
+"""Shared transport of every LLM and embedding client.
+
+The assistant, the RAG chatbot and the vector store used to build their own
+OpenAI clients, each with its own connection pool (and its own TLS handshakes).
+They now all go through this module:
+
+  * one httpx client (sync) and one httpx AsyncClient per event loop, with a
+    bounded pool of keep-alive connections and HTTP/2 when h2 is installed;
+  * retries with jittered exponential backoff on connection errors, 429 and
+    5xx (honoring Retry-After), done here once instead of in each SDK;
+  * the API key and base URL come from OPENAI_API_KEY / OPENAI_BASE_URL;
+  * LLM_BACKEND=stub replaces the network with a local handler answering chat
+    completions and embeddings, so everything runs offline.
+"""
+import asyncio
+import hashlib
+import importlib.util
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+import uuid
+import weakref
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+import httpx
+from dotenv import load_dotenv
+
+from chatbot.config import (
+    EMBEDDING_MODEL, LLM_BACKEND, LLM_HTTP2, LLM_MAX_CONNECTIONS, LLM_MAX_KEEPALIVE_CONNECTIONS,
+    LLM_KEEPALIVE_EXPIRY_SECONDS, LLM_CONNECT_TIMEOUT_SECONDS, LLM_TIMEOUT_SECONDS,
+    LLM_MAX_RETRIES, LLM_RETRY_BASE_DELAY_SECONDS, LLM_RETRY_MAX_DELAY_SECONDS
+)
+
+load_dotenv()
+
+# Responses worth another attempt
+RETRY_STATUS_CODES = frozenset({408, 409, 429, 500, 502, 503, 504})
+RETRY_EXCEPTIONS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.RemoteProtocolError, httpx.ReadError)
+
+# Size of the vectors returned by the stub embeddings
+STUB_EMBEDDING_DIMENSIONS = 256
+
+
+def backoff_delay(attempt: int, response: Optional[httpx.Response] = None) -> float:
+    """Delay before the next attempt: Retry-After if the server sent one, else full jitter."""
+    if response is not None:
+        retry_after = response.headers.get("retry-after")
+        if retry_after:
+            try:
+                return min(float(retry_after), LLM_RETRY_MAX_DELAY_SECONDS)
+            except ValueError:
+                try:
+                    return min(max(parsedate_to_datetime(retry_after).timestamp() - time.time(), 0.0),
+                               LLM_RETRY_MAX_DELAY_SECONDS)
+                except (TypeError, ValueError):
+                    pass
+    return random.uniform(0, min(LLM_RETRY_MAX_DELAY_SECONDS, LLM_RETRY_BASE_DELAY_SECONDS * 2 ** attempt))
+
+
+class RetryTransport(httpx.BaseTransport):
+    """Sync transport retrying failed requests with jittered backoff."""
+
+    def __init__(self, transport: httpx.BaseTransport, max_retries: int = LLM_MAX_RETRIES):
+        self._transport = transport
+        self.max_retries = max_retries
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        for attempt in range(self.max_retries + 1):
+            last_attempt = attempt == self.max_retries
+            try:
+                response = self._transport.handle_request(request)
+            except RETRY_EXCEPTIONS:
+                if last_attempt:
+                    raise
+                time.sleep(backoff_delay(attempt))
+                continue
+            if response.status_code not in RETRY_STATUS_CODES or last_attempt:
+                return response
+            delay = backoff_delay(attempt, response)
+            response.close()
+            time.sleep(delay)
+
+    def close(self):
+        self._transport.close()
+
+
+class AsyncRetryTransport(httpx.AsyncBaseTransport):
+    """Async transport retrying failed requests with jittered backoff."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, max_retries: int = LLM_MAX_RETRIES):
+        self._transport = transport
+        self.max_retries = max_retries
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        for attempt in range(self.max_retries + 1):
+            last_attempt = attempt == self.max_retries
+            try:
+                response = await self._transport.handle_async_request(request)
+            except RETRY_EXCEPTIONS:
+                if last_attempt:
+                    raise
+                await asyncio.sleep(backoff_delay(attempt))
+                continue
+            if response.status_code not in RETRY_STATUS_CODES or last_attempt:
+                return response
+            delay = backoff_delay(attempt, response)
+            await response.aclose()
+            await asyncio.sleep(delay)
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+# ---------------------------------------------------------------------------
+# Stub backend
+# ---------------------------------------------------------------------------
+
+def stub_embedding(text: str, dimensions: int = STUB_EMBEDDING_DIMENSIONS):
+    """Deterministic embedding of a text: hashed bag of words, normalized (similar texts are close)."""
+    vector = [0.0] * dimensions
+    for word in re.findall(r"\w+", text.lower()):
+        digest = hashlib.blake2b(word.encode(), digest_size=8).digest()
+        index = int.from_bytes(digest[:4], "little") % dimensions
+        vector[index] += 1.0 if digest[4] & 1 else -1.0
+    norm = math.sqrt(sum(value * value for value in vector)) or 1.0
+    return [value / norm for value in vector]
+
+
+def _stub_handler(request: httpx.Request) -> httpx.Response:
+    """Answer OpenAI API requests locally (LLM_BACKEND=stub)."""
+    body = json.loads(request.content or b"{}")
+    model = body.get("model", "stub")
+
+    if request.url.path.endswith("/embeddings"):
+        inputs = body.get("input", [])
+        if isinstance(inputs, str) or (inputs and isinstance(inputs[0], int)):
+            inputs = [inputs]
+        data = [
+            {"object": "embedding", "index": index, "embedding": stub_embedding(str(text))}
+            for index, text in enumerate(inputs)
+        ]
+        return httpx.Response(200, json={
+            "object": "list", "data": data, "model": model,
+            "usage": {"prompt_tokens": len(data), "total_tokens": len(data)}
+        })
+
+    if not request.url.path.endswith("/chat/completions"):
+        return httpx.Response(404, json={"error": {"message": f"Unknown path {request.url.path}"}})
+
+    messages = body.get("messages", [])
+    last = str(messages[-1].get("content", "")) if messages else ""
+    content = f"[stub] {last.strip()[:200]}"
+    completion_id = f"chatcmpl-stub-{uuid.uuid4().hex[:12]}"
+    created = int(time.time())
+    usage = {"prompt_tokens": len(json.dumps(messages)) // 4, "completion_tokens": len(content) // 4}
+    usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+
+    if not body.get("stream"):
+        return httpx.Response(200, json={
+            "id": completion_id, "object": "chat.completion", "created": created, "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop"
+            }],
+            "usage": usage
+        })
+
+    def chunk(delta, finish_reason=None):
+        return "data: " + json.dumps({
+            "id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+        }) + "\n\n"
+
+    events = [chunk({"role": "assistant", "content": ""})]
+    events += [chunk({"content": word + " "}) for word in content.split(" ")]
+    events += [chunk({}, "stop"), "data: [DONE]\n\n"]
+    return httpx.Response(200, headers={"content-type": "text/event-stream"},
+                          content="".join(events).encode())
+
+
+# ---------------------------------------------------------------------------
+# Shared clients
+# ---------------------------------------------------------------------------
+
+_lock = threading.Lock()
+_http_client: Optional[httpx.Client] = None
+# AsyncClient connections belong to the event loop that opened them: one client per loop
+_async_http_clients = weakref.WeakKeyDictionary()
+_async_http_client_no_loop: Optional[httpx.AsyncClient] = None
+
+
+def is_stub_backend() -> bool:
+    return LLM_BACKEND == "stub"
+
+
+def get_api_key() -> str:
+    """Return the OpenAI API key (OPENAI_API_KEY, a placeholder with the stub backend)."""
+    api_key = os.environ.get("OPENAI_API_KEY", "")
+    if not api_key and is_stub_backend():
+        return "stub"
+    if not api_key:
+        raise ValueError("OPENAI_API_KEY environment variable is required")
+    return api_key
+
+
+def get_base_url() -> Optional[str]:
+    """Return the API base URL (OPENAI_BASE_URL, default endpoint if unset)."""
+    return os.environ.get("OPENAI_BASE_URL") or None
+
+
+def _use_http2() -> bool:
+    # httpx refuses http2=True without the h2 package: fall back to HTTP/1.1 keep-alive
+    return LLM_HTTP2 and importlib.util.find_spec("h2") is not None
+
+
+def _client_options():
+    return {
+        "timeout": httpx.Timeout(LLM_TIMEOUT_SECONDS, connect=LLM_CONNECT_TIMEOUT_SECONDS),
+        "follow_redirects": True,
+    }
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=LLM_MAX_CONNECTIONS,
+        max_keepalive_connections=LLM_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=LLM_KEEPALIVE_EXPIRY_SECONDS
+    )
+
+
+def get_http_client() -> httpx.Client:
+    """Return the process-wide sync httpx client."""
+    global _http_client
+    with _lock:
+        if _http_client is None or _http_client.is_closed:
+            if is_stub_backend():
+                transport = httpx.MockTransport(_stub_handler)
+            else:
+                transport = RetryTransport(httpx.HTTPTransport(http2=_use_http2(), limits=_limits()))
+            _http_client = httpx.Client(transport=transport, **_client_options())
+        return _http_client
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """Return the httpx AsyncClient of the running event loop (shared by every caller on that loop)."""
+    global _async_http_client_no_loop
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        # Built outside a loop (e.g. at import): used later by a single loop
+        loop = None
+    with _lock:
+        client = _async_http_clients.get(loop) if loop is not None else _async_http_client_no_loop
+        if client is None or client.is_closed:
+            if is_stub_backend():
+                transport = httpx.MockTransport(_stub_handler)
+            else:
+                transport = AsyncRetryTransport(httpx.AsyncHTTPTransport(http2=_use_http2(), limits=_limits()))
+            client = httpx.AsyncClient(transport=transport, **_client_options())
+            if loop is not None:
+                _async_http_clients[loop] = client
+            else:
+                _async_http_client_no_loop = client
+        return client
+
+
+def get_async_openai_client():
+    """Return an AsyncOpenAI client on the shared transport (retries are done by the transport)."""
+    from openai import AsyncOpenAI
+
+    return AsyncOpenAI(
+        api_key=get_api_key(),
+        base_url=get_base_url(),
+        http_client=get_async_http_client(),
+        max_retries=0
+    )
+
+
+def get_chat_model(model: str = "gpt-4o-mini", temperature: float = 0.7, **kwargs):
+    """Return a LangChain ChatOpenAI on the shared transport."""
+    from langchain_openai import ChatOpenAI
+
+    return ChatOpenAI(
+        model=model,
+        temperature=temperature,
+        openai_api_key=get_api_key(),
+        openai_api_base=get_base_url(),
+        http_client=get_http_client(),
+        http_async_client=get_async_http_client(),
+        max_retries=0,
+        **kwargs
+    )
+
+
+_embeddings = {}
+
+
+def get_embeddings(model: str = EMBEDDING_MODEL):
+    """Return the LangChain OpenAIEmbeddings of a model on the shared transport (one instance per model)."""
+    from langchain_openai import OpenAIEmbeddings
+
+    with _lock:
+        embeddings = _embeddings.get(model)
+    if embeddings is None:
+        embeddings = OpenAIEmbeddings(
+            model=model,
+            openai_api_key=get_api_key(),
+            openai_api_base=get_base_url(),
+            http_client=get_http_client(),
+            http_async_client=get_async_http_client(),
+            max_retries=0,
+            # The stub does not tokenize: send the texts as they are
+            check_embedding_ctx_length=not is_stub_backend()
+        )
+        with _lock:
+            embeddings = _embeddings.setdefault(model, embeddings)
+    return embeddings
+
+
+def close_clients():
+    """Close the shared sync client (async clients are dropped with their event loop)."""
+    global _http_client
+    with _lock:
+        client, _http_client = _http_client, None
+    if client is not None:
+        client.close()
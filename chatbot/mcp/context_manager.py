@@ -0,0 +1,150 @@
+"""Token-aware conversation context for the banking assistant.
+
+The prompt sent to the model is built from:
+  * the system prompt;
+  * a rolling summary of the older turns (if any);
+  * the last CONTEXT_KEEP_TURNS turns, verbatim.
+
+Turns that fall out of the verbatim window are folded into the summary by a
+background task, so summarization never delays a reply. The prompt is kept
+under CONTEXT_TOKEN_BUDGET tokens: the oldest verbatim messages are dropped
+first, then the summary is shortened. The last user message is always sent
+(cut down only if it exceeds the budget on its own).
+"""
+import asyncio
+from typing import Dict, List, Optional
+
+try:
+    import tiktoken
+except ImportError:  # tiktoken is optional: fall back to a character estimate
+    tiktoken = None
+
+from chatbot.config import CONTEXT_KEEP_TURNS, CONTEXT_TOKEN_BUDGET, CONTEXT_SUMMARY_MAX_TOKENS
+
+# Tokens added by the chat format around each message
+MESSAGE_OVERHEAD_TOKENS = 4
+
+_encoding = None
+
+
+def count_tokens(text: str) -> int:
+    """Count the tokens of a text with tiktoken, or estimate them (4 characters per token)."""
+    global _encoding
+    if not text:
+        return 0
+    if tiktoken is not None and _encoding is None:
+        try:
+            _encoding = tiktoken.get_encoding("o200k_base")
+        except Exception:
+            _encoding = False
+    if _encoding:
+        return len(_encoding.encode(text))
+    return len(text) // 4 + 1
+
+
+def count_message_tokens(messages: List[Dict]) -> int:
+    """Count the tokens of a list of chat messages."""
+    return sum(MESSAGE_OVERHEAD_TOKENS + count_tokens(message.get("content") or "") for message in messages)
+
+
+class ConversationContext:
+    """Verbatim window + rolling summary of one user's conversation."""
+
+    def __init__(self, keep_turns: int = CONTEXT_KEEP_TURNS, token_budget: int = CONTEXT_TOKEN_BUDGET,
+                 summary_max_tokens: int = CONTEXT_SUMMARY_MAX_TOKENS):
+        self.keep_turns = keep_turns
+        self.token_budget = token_budget
+        self.summary_max_tokens = summary_max_tokens
+        self.summary = ""
+        self.last_prompt_tokens = 0
+        self._to_summarize: List[Dict] = []
+        self._summary_task: Optional[asyncio.Task] = None
+
+    def reset(self):
+        """Forget the summary and the turns waiting to be summarized."""
+        self.summary = ""
+        self._to_summarize = []
+        if self._summary_task and not self._summary_task.done():
+            self._summary_task.cancel()
+        self._summary_task = None
+
+    def fold_old_turns(self, history: List[Dict], client=None, model: str = "gpt-4o-mini"):
+        """
+        Move the turns older than the verbatim window out of history and summarize them.
+
+        :param history: Conversation history (modified in place)
+        :param client: AsyncOpenAI client used for the summary; without one, old turns are dropped
+        :param model: Model used for the summary
+        """
+        user_indexes = [i for i, message in enumerate(history) if message["role"] == "user"]
+        if len(user_indexes) <= self.keep_turns:
+            return
+        cut = user_indexes[-self.keep_turns]
+        old_messages = history[:cut]
+        del history[:cut]
+        if client is None:
+            return
+
+        self._to_summarize.extend(old_messages)
+        if self._summary_task is None or self._summary_task.done():
+            try:
+                self._summary_task = asyncio.get_running_loop().create_task(self._summarize(client, model))
+            except RuntimeError:
+                # No event loop (synchronous caller): summarize on the next turn
+                pass
+
+    async def _summarize(self, client, model: str):
+        """Fold the pending messages into the summary, until none are left."""
+        while self._to_summarize:
+            pending, self._to_summarize = self._to_summarize, []
+            transcript = "\n".join(f"{message['role']}: {message['content']}" for message in pending)
+            prompt = (
+                "Update the summary of this banking conversation with the new messages. "
+                "Keep account numbers, amounts, dates and pending requests; drop small talk. "
+                f"Answer with the summary only, in at most {self.summary_max_tokens} tokens.\n\n"
+                f"Current summary:\n{self.summary or '(none)'}\n\nNew messages:\n{transcript}"
+            )
+            try:
+                response = await client.chat.completions.create(
+                    model=model,
+                    messages=[{"role": "user", "content": prompt}],
+                    temperature=0,
+                    max_tokens=self.summary_max_tokens
+                )
+                self.summary = (response.choices[0].message.content or "").strip()
+            except Exception as e:
+                print(f"⚠️  Résumé de conversation impossible: {e}")
+
+    def build_messages(self, system_prompt: str, history: List[Dict]) -> List[Dict]:
+        """
+        Build the messages of a request within the token budget.
+
+        :param system_prompt: System prompt of the request
+        :param history: Verbatim conversation history (last turns)
+        :return: Messages in OpenAI format; their size is stored in last_prompt_tokens
+        """
+        fixed = [{"role": "system", "content": system_prompt}]
+        recent = [{"role": message["role"], "content": message["content"]} for message in history]
+        summary = self.summary
+
+        def total():
+            summary_tokens = MESSAGE_OVERHEAD_TOKENS + count_tokens(summary) if summary else 0
+            return count_message_tokens(fixed) + summary_tokens + count_message_tokens(recent)
+
+        # Drop the oldest verbatim messages first, always keeping the last one
+        while len(recent) > 1 and total() > self.token_budget:
+            recent.pop(0)
+        # Then shorten the summary, keeping its end (the most recent facts)
+        while summary and total() > self.token_budget:
+            summary = summary[len(summary) // 4 + 1:]
+        # Finally cut the last message itself
+        while recent and recent[-1]["content"] and total() > self.token_budget:
+            content = recent[-1]["content"]
+            recent[-1]["content"] = content[:len(content) * 3 // 4]
+
+        messages = list(fixed)
+        if summary:
+            messages.append({"role": "system", "content": f"Summary of the earlier conversation: {summary}"})
+        messages.extend(recent)
+        self.last_prompt_tokens = count_message_tokens(messages)
+        return messages
@@ -0,0 +1,98 @@
+"""In-process transport to the MCP tools.
+
+When the web app and the MCP server run on the same machine, a tool call over
+SSE is pure overhead: the arguments and the result are serialized to JSON,
+sent over HTTP and parsed again. InProcessMCPClient imports the server module
+and calls its tool functions directly (in a worker thread, since they block on
+SQLite), returning their typed results (chatbot/tool_results.py) as they are. The
+arguments are validated and coerced by the tool's FastMCP argument model first
+(e.g. {"days": "30"} -> days=30), as the server does for an SSE call.
+
+It exposes the same tools (names and schemas, taken from the FastMCP server)
+and the same interface as ManagedMCPClient; MCP_TRANSPORT=inprocess selects it.
+"""
+import asyncio
+import importlib
+import inspect
+import time
+from typing import Any, Dict, Optional
+
+from mcp.types import ListToolsResult
+
+from chatbot.mcp.managed_client import ToolCallMetrics
+
+
+class InProcessMCPClient:
+    """Calls the MCP server's tool functions directly, in this process."""
+
+    def __init__(self, server_module: str = "chatbot.mcp.server_sse"):
+        """Create the client (call start() to load the tools).
+
+        Args:
+            server_module: Module defining the FastMCP server (`mcp`) and its tool functions
+        """
+        self.server_module = server_module
+        self._tools = {}
+        self._functions = {}
+        self._metadata = {}
+        self.tool_metrics = ToolCallMetrics()
+
+    async def start(self):
+        """Import the server module (initializes the database and the RAG chatbot) and bind its tools."""
+        server = await asyncio.to_thread(importlib.import_module, self.server_module)
+        tools = await server.mcp.list_tools()
+        self._tools = {tool.name: tool for tool in tools}
+        # @mcp.tool() and @typed_tool return the decorated function unchanged: it is the module attribute of the same name
+        self._functions = {
+            name: getattr(server, name) for name in self._tools if callable(getattr(server, name, None))
+        }
+        # Argument models built by FastMCP from the signatures (the same validation as a call over SSE)
+        self._metadata = {
+            tool.name: tool.fn_metadata for tool in server.mcp._tool_manager.list_tools()
+        }
+        missing = set(self._tools) - set(self._functions)
+        if missing:
+            print(f"⚠️  In-process MCP tools without a module function: {sorted(missing)}")
+        print(f"\n🔄 Connected to S2M Banking (in-process, {len(self._functions)} tools)")
+
+    async def close(self):
+        """Nothing to close: the tools run in this process."""
+        self._functions = {}
+
+    async def list_tools(self) -> ListToolsResult:
+        """List the tools, with the schemas advertised by the server."""
+        return ListToolsResult(tools=list(self._tools.values()))
+
+    async def call_tool(self, name: str, arguments: Optional[Dict[str, Any]] = None) -> Any:
+        """Call a tool and return its native result (not a CallToolResult).
+
+        Raises:
+            ValueError: unknown tool
+            pydantic.ValidationError: arguments rejected by the tool's argument model
+        """
+        function = self._functions.get(name)
+        metadata = self._metadata.get(name)
+        if function is None or metadata is None:
+            raise ValueError(f"Unknown tool: {name}")
+        start = time.perf_counter()
+        error = True
+        try:
+            arguments = metadata.arg_model.model_validate(
+                metadata.pre_parse_json(arguments or {})
+            ).model_dump_one_level()
+            if inspect.iscoroutinefunction(function):
+                result = await function(**arguments)
+            else:
+                result = await asyncio.to_thread(function, **arguments)
+            error = False
+            return result
+        finally:
+            self.tool_metrics.record(name, time.perf_counter() - start, error)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the per-tool call counters."""
+        return {
+            "transport": "inprocess",
+            "connected": 1 if self._functions else 0,
+            "tools": self.tool_metrics.stats()
+        }
@@ -0,0 +1,259 @@
+"""Managed connection to the MCP server.
+
+The assistant used to open a single SSE session at startup: if it dropped,
+every later tool call failed until the process restarted, and all users'
+calls went through that one session. ManagedMCPClient keeps a small pool of
+sessions instead:
+
+  * each slot is a task that owns its sse_client / ClientSession (the anyio
+    context managers must be entered and exited by the same task);
+  * an idle slot pings the server every MCP_HEARTBEAT_SECONDS; a failed ping
+    or a broken call makes it reconnect, with jittered exponential backoff;
+  * calls go to the least busy connected slot; a read-only call interrupted by
+    a connection failure is retried once on another slot;
+  * calls and errors are counted per tool (see stats()).
+
+It exposes call_tool() and list_tools() like ClientSession, so it can be used
+wherever a session was.
+"""
+import asyncio
+import random
+import time
+from typing import Any, Dict, Optional
+
+from mcp import ClientSession
+from mcp.client.sse import sse_client
+
+try:
+    from mcp.shared.exceptions import McpError
+except ImportError:  # renamed in recent SDKs
+    from mcp.shared.exceptions import MCPError as McpError
+
+from chatbot.config import (
+    MCP_POOL_SIZE, MCP_HEARTBEAT_SECONDS, MCP_PING_TIMEOUT_SECONDS, MCP_CONNECT_TIMEOUT_SECONDS,
+    MCP_RECONNECT_BASE_DELAY_SECONDS, MCP_RECONNECT_MAX_DELAY_SECONDS
+)
+from chatbot.config_client import READ_ONLY_TOOLS
+
+
+def _root_cause(error: BaseException) -> BaseException:
+    """First leaf exception of an exception group (anyio task groups wrap transport errors)."""
+    while getattr(error, "exceptions", None):
+        error = error.exceptions[0]
+    return error
+
+
+class ToolCallMetrics:
+    """Number of calls, errors and latency of each tool."""
+
+    def __init__(self):
+        self._metrics: Dict[str, Dict[str, float]] = {}
+
+    def record(self, tool_name: str, elapsed: float, error: bool):
+        metrics = self._metrics.setdefault(tool_name, {"calls": 0, "errors": 0, "total_time": 0.0, "max_time": 0.0})
+        metrics["calls"] += 1
+        metrics["errors"] += int(error)
+        metrics["total_time"] += elapsed
+        metrics["max_time"] = max(metrics["max_time"], elapsed)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        return {
+            name: {
+                "calls": metrics["calls"],
+                "errors": metrics["errors"],
+                "avg_ms": metrics["total_time"] / metrics["calls"] * 1000 if metrics["calls"] else 0.0,
+                "max_ms": metrics["max_time"] * 1000
+            }
+            # list(): stats() may be called from another thread (Flask debug route)
+            for name, metrics in list(self._metrics.items())
+        }
+
+
+class _Slot:
+    """One pooled session and its state."""
+
+    def __init__(self, index: int):
+        self.index = index
+        self.session: Optional[ClientSession] = None
+        self.ready = asyncio.Event()
+        self.broken = asyncio.Event()
+        self.in_flight = 0
+        self.connects = 0
+        self.task: Optional[asyncio.Task] = None
+
+
+class ManagedMCPClient:
+    """Pool of MCP sessions with heartbeat, reconnection and per-tool metrics."""
+
+    def __init__(self, url: str, pool_size: int = MCP_POOL_SIZE,
+                 heartbeat_seconds: float = MCP_HEARTBEAT_SECONDS,
+                 connect_timeout: float = MCP_CONNECT_TIMEOUT_SECONDS):
+        """Create the client (call start() to connect).
+
+        Args:
+            url: SSE endpoint of the MCP server
+            pool_size: Number of sessions kept open
+            heartbeat_seconds: Interval between pings of an idle session
+            connect_timeout: Time a call waits for a connected session before failing
+        """
+        self.url = url
+        self.pool_size = max(1, pool_size)
+        self.heartbeat_seconds = heartbeat_seconds
+        self.connect_timeout = connect_timeout
+        self._slots = [_Slot(index) for index in range(self.pool_size)]
+        self._closing = False
+        self.tool_metrics = ToolCallMetrics()
+        self.reconnects = 0
+
+    async def start(self, wait: bool = True):
+        """Start the session tasks.
+
+        Args:
+            wait: Wait (up to connect_timeout) for a first session to be connected
+        """
+        self._closing = False
+        for slot in self._slots:
+            if slot.task is None or slot.task.done():
+                slot.task = asyncio.create_task(self._run_slot(slot), name=f"mcp-slot-{slot.index}")
+        if wait:
+            try:
+                await self._wait_for_slot()
+                print(f"\n🔄 Connected to S2M Banking ({self.connected} of {self.pool_size} MCP sessions)")
+            except ConnectionError as e:
+                print(f"\n⚠️  {e}; reconnecting in the background")
+
+    async def close(self):
+        """Close every session."""
+        self._closing = True
+        tasks = [slot.task for slot in self._slots if slot.task]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for slot in self._slots:
+            slot.task = None
+
+    @property
+    def connected(self) -> int:
+        """Number of sessions currently connected."""
+        return sum(1 for slot in self._slots if slot.ready.is_set())
+
+    async def _run_slot(self, slot: _Slot):
+        """Keep one session connected for as long as the client is open."""
+        failures = 0
+        while not self._closing:
+            try:
+                async with sse_client(self.url) as (read_stream, write_stream):
+                    async with ClientSession(read_stream, write_stream) as session:
+                        await asyncio.wait_for(session.initialize(), timeout=self.connect_timeout)
+                        slot.session = session
+                        slot.broken.clear()
+                        slot.ready.set()
+                        slot.connects += 1
+                        if slot.connects > 1:
+                            self.reconnects += 1
+                            print(f"🔄 MCP session {slot.index} reconnected")
+                        failures = 0
+                        await self._heartbeat(slot, session)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Log the first failure, then every 10th reconnection attempt
+                if not self._closing and failures % 10 == 0:
+                    cause = _root_cause(e)
+                    state = "lost" if failures == 0 else f"still unreachable after {failures} attempts"
+                    print(f"⚠️  MCP session {slot.index} {state}: {type(cause).__name__}: {cause}")
+            finally:
+                slot.ready.clear()
+                slot.session = None
+            if self._closing:
+                break
+            failures += 1
+            delay = min(MCP_RECONNECT_MAX_DELAY_SECONDS, MCP_RECONNECT_BASE_DELAY_SECONDS * 2 ** (failures - 1))
+            await asyncio.sleep(random.uniform(delay / 2, delay))
+
+    async def _heartbeat(self, slot: _Slot, session: ClientSession):
+        """Ping the session while it is idle; return when it is broken."""
+        while not self._closing:
+            try:
+                await asyncio.wait_for(slot.broken.wait(), timeout=self.heartbeat_seconds)
+                # A call failed on this session: reconnect
+                return
+            except asyncio.TimeoutError:
+                pass
+            if slot.in_flight:
+                # Calls in progress prove the session is alive
+                continue
+            await asyncio.wait_for(session.send_ping(), timeout=MCP_PING_TIMEOUT_SECONDS)
+
+    async def _wait_for_slot(self) -> _Slot:
+        """Return the least busy connected slot, waiting up to connect_timeout for one."""
+        ready = [slot for slot in self._slots if slot.ready.is_set()]
+        if not ready:
+            waiters = [asyncio.create_task(slot.ready.wait()) for slot in self._slots]
+            try:
+                await asyncio.wait(waiters, timeout=self.connect_timeout, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                for waiter in waiters:
+                    waiter.cancel()
+            ready = [slot for slot in self._slots if slot.ready.is_set()]
+            if not ready:
+                raise ConnectionError(f"MCP server unreachable at {self.url}")
+        return min(ready, key=lambda slot: slot.in_flight)
+
+    async def _on_session(self, operation: str, call, retry: bool):
+        """Run call(session) on a connected session, reconnecting it if the connection fails."""
+        attempts = 2 if retry else 1
+        for attempt in range(attempts):
+            slot = await self._wait_for_slot()
+            session = slot.session
+            slot.in_flight += 1
+            try:
+                return await call(session)
+            except McpError:
+                # Error answered by the server: the session is fine
+                raise
+            except Exception as e:
+                if slot.session is session:
+                    slot.ready.clear()
+                    slot.broken.set()
+                if attempt == attempts - 1:
+                    cause = _root_cause(e)
+                    raise ConnectionError(f"MCP {operation} failed: {type(cause).__name__}: {cause}") from e
+                print(f"⚠️  MCP {operation} failed on session {slot.index}, retrying on another session")
+            finally:
+                slot.in_flight -= 1
+
+    async def call_tool(self, name: str, arguments: Optional[Dict[str, Any]] = None):
+        """Call a tool of the MCP server.
+
+        Read-only tools are retried once on another session if the connection
+        fails; other tools (e.g. transfer_funds) are not, since the server may
+        already have executed them.
+        """
+        start = time.perf_counter()
+        error = True
+        try:
+            result = await self._on_session(
+                f"call {name}", lambda session: session.call_tool(name, arguments or {}),
+                retry=name in READ_ONLY_TOOLS
+            )
+            error = bool(getattr(result, "isError", False))
+            return result
+        finally:
+            self.tool_metrics.record(name, time.perf_counter() - start, error)
+
+    async def list_tools(self):
+        """List the tools of the MCP server."""
+        return await self._on_session("list_tools", lambda session: session.list_tools(), retry=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the state of the sessions and per-tool call counters."""
+        return {
+            "transport": "sse",
+            "url": self.url,
+            "pool_size": self.pool_size,
+            "connected": self.connected,
+            "in_flight": sum(slot.in_flight for slot in self._slots),
+            "reconnects": self.reconnects,
+            "tools": self.tool_metrics.stats()
+        }
@@ -0,0 +1,107 @@
+"""Precompiled request template of the banking assistant.
+
+The tool schema and the system prompt used to be rebuilt on every banking
+turn. They are now built once per user and reused as immutable objects:
+
+  * the OpenAI tool list is derived once from TOOL_DEFINITIONS;
+  * the system prompt starts with a static part that is byte-identical for
+    every user and request (so the provider can reuse its prompt-prefix
+    cache); only the last line names the user.
+
+check_tool_definitions() compares the tools advertised by the MCP server with
+TOOL_DEFINITIONS, so a drift between the two is reported at startup.
+"""
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, List, Tuple
+
+from chatbot.config import SESSION_MAX_USERS
+from chatbot.config_client import TOOL_DEFINITIONS, MODEL_CONFIG
+
+# Static first part of the system prompt: do not interpolate anything here
+STATIC_SYSTEM_PROMPT = """You are a helpful AI assistant specializing in S2M banking services.
+
+For banking-related questions, use the available tools to help customers with:
+- Account information and balances
+- Transaction history
+- Fund transfers
+- General banking questions
+
+For non-banking questions, you can provide helpful information using your general knowledge.
+
+When a tool result is returned to you, answer the user from it. Do not call a tool
+again for data you already have in this conversation.
+
+Always be professional, helpful, and accurate in your responses."""
+
+
+@dataclass(frozen=True)
+class RequestTemplate:
+    """Parts of a chat completions request that do not change between turns."""
+    system_prompt: str
+    tools: Tuple[Dict[str, Any], ...]
+    model: str
+    temperature: float
+    max_tokens: int
+
+
+@lru_cache(maxsize=1)
+def openai_tools() -> Tuple[Dict[str, Any], ...]:
+    """Convert TOOL_DEFINITIONS to the OpenAI function format (built once)."""
+    return tuple(
+        {
+            "type": "function",
+            "function": {
+                "name": tool["name"],
+                "description": tool["description"],
+                "parameters": {
+                    "type": "object",
+                    "properties": tool["parameters"]["properties"],
+                    "required": tool["parameters"].get("required", [])
+                }
+            }
+        }
+        for tool in TOOL_DEFINITIONS
+    )
+
+
+@lru_cache(maxsize=SESSION_MAX_USERS)
+def request_template(user_id: str) -> RequestTemplate:
+    """Return the request template of a user, built on first use."""
+    return RequestTemplate(
+        system_prompt=f"{STATIC_SYSTEM_PROMPT}\n\nYou are assisting user {user_id}.",
+        tools=openai_tools(),
+        model=MODEL_CONFIG.get("model_name", "gpt-4o-mini"),
+        temperature=MODEL_CONFIG.get("temperature", 0.7),
+        max_tokens=MODEL_CONFIG.get("max_tokens", 1000)
+    )
+
+
+def check_tool_definitions(advertised_tools) -> List[str]:
+    """
+    Compare the tools advertised by the MCP server with TOOL_DEFINITIONS.
+
+    user_id may be missing from the definitions: the client fills it in. Tools
+    advertised by the server but not given to the model (e.g. handle_banking_query)
+    are not reported.
+
+    :param advertised_tools: Tools returned by session.list_tools() (objects with name and inputSchema)
+    :return: Description of each mismatch (empty if the definitions match)
+    """
+    advertised = {tool.name: tool.inputSchema or {} for tool in advertised_tools}
+    problems = []
+    for definition in TOOL_DEFINITIONS:
+        name = definition["name"]
+        schema = advertised.get(name)
+        if schema is None:
+            problems.append(f"{name}: defined but not advertised by the MCP server")
+            continue
+        server_params = set(schema.get("properties", {}))
+        client_params = set(definition["parameters"]["properties"])
+        unknown = client_params - server_params
+        if unknown:
+            problems.append(f"{name}: parameters {sorted(unknown)} not accepted by the server")
+        missing = set(schema.get("required", [])) - client_params - {"user_id"}
+        if missing:
+            problems.append(f"{name}: required parameters {sorted(missing)} missing from the definition")
+    return problems
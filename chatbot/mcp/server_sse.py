@@ -4,6 +4,7 @@ from decimal import Decimal
 import os
 import sys
 import datetime
+import logging
 
 # Add the parent directory to the Python path to import from src and chatbot
 parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
@@ -12,11 +13,22 @@ print(f"Added to Python path: {parent_dir}")
 
 # Import RAG components
 from chatbot.rag.rag_chatbot import S2MChatbot
+from chatbot.rag.query_cache import retrieval_cache
 
 # Import the actual database functions
-from chatbot.account import list_accounts, list_transfer_target_accounts, transfer_between_accounts
-from chatbot.database import init_db
+from chatbot.account import list_transfer_target_accounts, transfer_between_accounts
+from chatbot.config import MAX_HISTORY_PAGE_SIZE
+from chatbot.response_cache import response_cache
+from chatbot.single_flight import rag_flight
+from chatbot.database import (
+    init_db, get_account_transactions_page, get_all_accounts_info, get_account_by_number,
+    get_accounts_by_numbers, account_cache
+)
 from chatbot.models import Account
+from chatbot.tool_results import (
+    AccountBalance, AccountList, AccountSummary, BalanceResult, RagAnswer, Transaction,
+    TransactionPage, TransferResult, register_typed_tool
+)
 
 # Import Account Query Handler and Intent Detector
 from chatbot.account_query_handler import AccountQueryHandler
@@ -38,9 +50,16 @@ intent_detector = IntentDetector()
 # Import configuration
 from chatbot.config import MCP_NAME, MCP_HOST, MCP_PORT, DEFAULT_USER_ID
 
+logger = logging.getLogger(__name__)
+
 # Create the MCP server
 mcp = FastMCP(name=MCP_NAME, host=MCP_HOST, port=MCP_PORT)
 
+
+def typed_tool(function):
+    """Register a tool returning a typed result (see chatbot/tool_results.py)."""
+    return register_typed_tool(mcp, function)
+
 # NEW TOOL: Account Query Handler - Handle natural language banking questions
 @mcp.tool()
 def handle_banking_query(user_message: str, user_id: str = DEFAULT_USER_ID) -> dict:
@@ -98,8 +117,8 @@ def handle_banking_query(user_message: str, user_id: str = DEFAULT_USER_ID) -> d
         }
 
 # RAG Tool: Answer questions using the RAG system
-@mcp.tool()
-def answer_banking_question(question: str) -> dict:
+@typed_tool
+def answer_banking_question(question: str) -> RagAnswer:
     """
     Returns the answer and sources.
     """
@@ -109,37 +128,46 @@ def answer_banking_question(question: str) -> dict:
     # based on the system instructions
     result = chatbot.answer_question(question)
     print(f"[RAG] Found answer with {len(result['sources'])} sources")
-    return {
-        "answer": result["answer"],
-        "sources": result["sources"]
-    }
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("[RAG] Response cache: %s", response_cache.stats())
+        logger.debug("[RAG] Coalescing: %s", rag_flight.stats())
+        logger.debug("[RAG] Retrieval cache: %s", retrieval_cache.stats())
+    return RagAnswer.from_rag_result(result)
 
 # Tool 1: List all accounts belonging to a user
-@mcp.tool()
-def list_user_accounts(user_id: str) -> list[dict]:
+@typed_tool
+def list_user_accounts(user_id: str) -> AccountList:
     """List all accounts for a given user."""
-    accounts = list_accounts()
-    print(f"[DEBUG] list_user_accounts called")
+    # User-scoped and served from the account cache on repeated questions
+    accounts = get_all_accounts_info(user_id)
+    print(f"[DEBUG] list_user_accounts called with user_id={user_id}")
     print(f"[DEBUG] Accounts: {accounts}")
-    return [account.__dict__ for account in accounts]
+    print(f"[DEBUG] Account cache: {account_cache.stats()}")
+    return AccountList(accounts=tuple(
+        AccountSummary(account["account_number"], account["account_name"], str(account["balance"]))
+        for account in accounts
+    ))
 
 # Tool 2: List target accounts that can receive transfers
-@mcp.tool()
-def list_target_accounts(user_id: str, from_account: str) -> list[dict]:
+@typed_tool
+def list_target_accounts(user_id: str, from_account: str) -> AccountList:
     """List all other accounts this user can transfer to."""
     accounts = list_transfer_target_accounts(user_id, from_account)
     print(f"[DEBUG] list_target_accounts called with user_id={user_id}, from_account={from_account}")
     print(f"[DEBUG] Transfer targets: {accounts}")
-    return [account.__dict__ for account in accounts]
+    return AccountList(accounts=tuple(
+        AccountSummary(account.account_number, account.account_name, str(account.balance))
+        for account in accounts
+    ))
 
 # Tool 3: Transfer funds between two accounts
-@mcp.tool()
-def transfer_funds(user_id: str, from_account: str, to_account: str, amount: str) -> str:
+@typed_tool
+def transfer_funds(user_id: str, from_account: str, to_account: str, amount: str) -> TransferResult:
     """Transfer funds from one account to another."""
     print(f"[DEBUG] transfer_funds called with user_id={user_id}, from_account={from_account}, to_account={to_account}, amount={amount}")
+    clean_amount = amount.replace('$', '').replace(',', '')
     try:
         # Convert amount to Decimal, handling any formatting issues
-        clean_amount = amount.replace('$', '').replace(',', '')
         decimal_amount = Decimal(clean_amount)
         
         # Debug the parameters
@@ -149,96 +177,77 @@ def transfer_funds(user_id: str, from_account: str, to_account: str, amount: str
         
         # Call the transfer function
         transfer_between_accounts(user_id, from_account, to_account, decimal_amount)
-        return f"✅ Transferred MAD{clean_amount} from {from_account} to {to_account}."
+        return TransferResult(ok=True, from_account=from_account, to_account=to_account, amount=clean_amount)
     except Exception as e:
         print(f"[ERROR] Transfer failed: {str(e)}")
-        return f"❌ Transfer failed: {str(e)}"
+        return TransferResult(ok=False, from_account=from_account, to_account=to_account, amount=clean_amount,
+                              message=str(e))
 
 # Tool 4: Get account balance
-@mcp.tool()
-def get_account_balance(user_id: str, account_number: str) -> dict:
-    """Get the balance of a specific account."""
-    print(f'[DEBUG] get_account_balance called with user_id={user_id}, account_number={account_number}')
+@typed_tool
+def get_account_balance(user_id: str, account_number: str = "", account_numbers: list[str] | None = None) -> BalanceResult:
+    """Get the balance of a specific account, or of several accounts at once with account_numbers."""
+    print(f'[DEBUG] get_account_balance called with user_id={user_id}, account_number={account_number}, '
+          f'account_numbers={account_numbers}')
     
-    # Find the account in the user's accounts
-    accounts = list_accounts()
-    for account in accounts:
-        if account.account_number == account_number:
-            return {
-                "account_number": account.account_number,
-                "account_name": account.account_name,
-                "balance": str(account.balance),
-                "currency": "MAD"
-            }
+    def balance_info(account):
+        return AccountBalance(account["account_number"], account["account_name"], str(account["balance"]), "MAD")
     
-    return {"error": f"Account {account_number} not found."}
-
-# Tool 5: Get transaction history
-@mcp.tool()
-def get_transaction_history(user_id: str, account_number: str, days: int = 30) -> list[dict]:
-    """Get the transaction history for a specific account."""
-    print(f"[DEBUG] get_transaction_history called with user_id={user_id}, account_number={account_number}, days={days}")
+    # Batch form: all the balances in one round trip
+    if account_numbers:
+        accounts = get_accounts_by_numbers(account_numbers, user_id)
+        return BalanceResult(
+            balances=tuple(balance_info(account) for account in accounts.values() if account),
+            not_found=tuple(number for number, account in accounts.items() if not account)
+        )
     
-    # Connect to the database to get transaction history
-    import sqlite3
-    from chatbot.database import DB_FILE
+    # Indexed single-row lookup scoped to the user's own accounts
+    account = get_account_by_number(account_number, user_id)
+    if account:
+        return BalanceResult(balances=(balance_info(account),))
     
-    con = sqlite3.connect(DB_FILE)
-    con.row_factory = sqlite3.Row
-    cur = con.cursor()
+    return BalanceResult(balances=(), not_found=(account_number,))
+
+# Tool 5: Get transaction history
+@typed_tool
+def get_transaction_history(user_id: str, account_number: str, days: int = 30,
+                            cursor: str = "", page_size: int = 20) -> TransactionPage:
+    """Get one page of the transaction history for a specific account.
+
+    Pass the returned next_cursor back as cursor to get the following page.
+    """
+    print(f"[DEBUG] get_transaction_history called with user_id={user_id}, account_number={account_number}, "
+          f"days={days}, cursor={cursor!r}, page_size={page_size}")
     
     # Calculate the date range
     today = datetime.datetime.now()
     start_date = (today - datetime.timedelta(days=days)).isoformat()
+    page_size = max(1, min(page_size, MAX_HISTORY_PAGE_SIZE))
     
-    # Query for transactions with balances
-    cur.execute("""
-        SELECT 
-            TransactionNumber, 
-            TransferDateTime, 
-            CASE 
-                WHEN FromAccountNumber = :account_number THEN 'debit' 
-                ELSE 'credit' 
-            END as transaction_type,
-            CASE 
-                WHEN FromAccountNumber = :account_number THEN -Amount 
-                ELSE Amount 
-            END as amount,
-            CASE 
-                WHEN FromAccountNumber = :account_number THEN 'Transfer to ' || ToAccountNumber
-                ELSE 'Transfer from ' || FromAccountNumber
-            END as description,
-            CASE 
-                WHEN FromAccountNumber = :account_number THEN FromAccountBalance
-                ELSE ToAccountBalance
-            END as balance_after
-        FROM Transfers
-        WHERE (FromAccountNumber = :account_number OR ToAccountNumber = :account_number)
-        AND TransferDateTime >= :start_date
-        ORDER BY TransferDateTime DESC
-    """, {"account_number": account_number, "start_date": start_date})
-    
-    rows = cur.fetchall()
+    # Keyset page: two indexed range scans, constant cost per page
+    page = get_account_transactions_page(
+        account_number, user_id, cursor=cursor or None, page_size=page_size, since=start_date
+    )
     
     # Create transaction objects using stored balances
     transactions = []
     
-    for row in rows:
-        amount = Decimal(str(row['amount']))
+    for row in page["transactions"]:
+        debit = row["type"] == "DEBIT"
+        amount = -row["amount"] if debit else row["amount"]
         
-        transaction = {
-            "transaction_id": row['TransactionNumber'],
-            "date": row['TransferDateTime'].split('T')[0],  # Just the date part
-            "description": row['description'],
-            "amount": str(amount),
-            "transaction_type": row['transaction_type'],
-            "balance_after": str(row['balance_after'])
-        }
+        transaction = Transaction(
+            transaction_id=str(row["transaction_id"]),
+            date=row["date_time"].split('T')[0],  # Just the date part
+            description=f"Transfer {'to' if debit else 'from'} {row['other_account']}",
+            amount=str(amount),
+            transaction_type="debit" if debit else "credit",
+            balance_after=str(row["balance_after"])
+        )
         transactions.append(transaction)
     
-    con.close()
-    print(f"[DEBUG] Returning: {len(transactions)} transactions")
-    return transactions
+    print(f"[DEBUG] Returning: {len(transactions)} transactions, next_cursor={page['next_cursor']}")
+    return TransactionPage(transactions=tuple(transactions), next_cursor=page["next_cursor"])
 
 # Run the MCP server using SSE transport
 if __name__ == "__main__":
@@ -0,0 +1,68 @@
+"""Per-user assistant sessions sharing the managed MCP client."""
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any
+
+from chatbot.config import SESSION_MAX_USERS, SESSION_TTL_SECONDS
+
+
+class AssistantSessionManager:
+    """Keeps one assistant context (history + user_id) per authenticated user.
+
+    Contexts are forked from a base InteractiveBankingAssistant so they all share
+    its OpenAI clients and MCP client (a pool of MCP sessions). The pool is bounded: the least recently
+    used context is evicted when it is full, and idle contexts expire after a TTL.
+    """
+
+    def __init__(self, base_assistant, max_sessions: int = SESSION_MAX_USERS,
+                 ttl_seconds: int = SESSION_TTL_SECONDS):
+        self.base_assistant = base_assistant
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self._sessions = OrderedDict()  # user -> (assistant, last_used)
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, user: str):
+        """Return the assistant for a user, creating it if needed."""
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            entry = self._sessions.pop(user, None)
+            if entry is None:
+                # Bound to the authenticated user: the "user <id>" command is refused
+                assistant = self.base_assistant.fork(user, allow_user_switch=False)
+            else:
+                assistant = entry[0]
+            # Always point at the current shared MCP client
+            assistant.session = self.base_assistant.session
+            self._sessions[user] = (assistant, now)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+                self.evictions += 1
+            return assistant
+
+    def reset(self, user: str) -> bool:
+        """Drop the context of a user. Returns True if one existed."""
+        with self._lock:
+            return self._sessions.pop(user, None) is not None
+
+    def _expire(self, now: float):
+        """Remove contexts idle for longer than the TTL (lock must be held)."""
+        while self._sessions:
+            user, (_, last_used) = next(iter(self._sessions.items()))
+            if now - last_used <= self.ttl_seconds:
+                break
+            del self._sessions[user]
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Return pool statistics."""
+        with self._lock:
+            return {
+                "active_sessions": len(self._sessions),
+                "max_sessions": self.max_sessions,
+                "ttl_seconds": self.ttl_seconds,
+                "evictions": self.evictions
+            }
@@ -0,0 +1,13 @@
+-- Transaction history looks transfers up by one side of the transfer and sorts by date.
+-- One index per side, each covering the columns that side's history query reads.
+CREATE INDEX IF NOT EXISTS idx_transfers_from_account_datetime
+  ON Transfers (FromAccountNumber, TransferDateTime, TransactionNumber,
+                ToAccountNumber, Amount, FromAccountBalance);
+
+CREATE INDEX IF NOT EXISTS idx_transfers_to_account_datetime
+  ON Transfers (ToAccountNumber, TransferDateTime, TransactionNumber,
+                FromAccountNumber, Amount, ToAccountBalance);
+
+-- Account lists, totals and lookups are scoped to the owning user.
+CREATE INDEX IF NOT EXISTS idx_accounts_user
+  ON Accounts (UserId, AccountName, AccountNumber, Balance);
@@ -1,45 +1,39 @@
 import os
-import glob
 from langchain_community.document_loaders import PyPDFLoader, TextLoader
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 
+from chatbot.config import RAG_CHUNK_SIZE, RAG_CHUNK_OVERLAP
+from chatbot.rag.ingest_manifest import find_documents
+
+# Loader of each supported extension (see ingest_manifest.DOCUMENT_EXTENSIONS)
+LOADERS = {".pdf": PyPDFLoader, ".txt": TextLoader}
+
+def load_file(file_path):
+    """Load the pages of one PDF or text file (raises if it cannot be read)"""
+    loader = LOADERS[os.path.splitext(file_path)[1].lower()](file_path)
+    return loader.load()
+
 def load_documents(directory_path):
     """Load documents from a directory containing PDFs and text files"""
-    # Get all PDF files in the directory
-    pdf_files = glob.glob(os.path.join(directory_path, "**/*.pdf"), recursive=True)
-    
-    # Get all text files in the directory
-    txt_files = glob.glob(os.path.join(directory_path, "**/*.txt"), recursive=True)
-    
     # Load each document file individually to handle errors gracefully
     all_documents = []
     
-    # Process PDF files
-    for pdf_file in pdf_files:
-        try:
-            loader = PyPDFLoader(pdf_file)
-            documents = loader.load()
-            all_documents.extend(documents)
-            print(f"Loaded {len(documents)} pages from {os.path.basename(pdf_file)}")
-        except Exception as e:
-            print(f"Error loading file {pdf_file}")
-            print(f"  Error details: {str(e)}")
-    
-    # Process text files
-    for txt_file in txt_files:
+    for document_file in find_documents(directory_path):
         try:
-            loader = TextLoader(txt_file)
-            documents = loader.load()
+            documents = load_file(document_file)
             all_documents.extend(documents)
-            print(f"Loaded text file: {os.path.basename(txt_file)}")
+            if document_file.lower().endswith(".pdf"):
+                print(f"Loaded {len(documents)} pages from {os.path.basename(document_file)}")
+            else:
+                print(f"Loaded text file: {os.path.basename(document_file)}")
         except Exception as e:
-            print(f"Error loading file {txt_file}")
+            print(f"Error loading file {document_file}")
             print(f"  Error details: {str(e)}")
     
     print(f"Loaded {len(all_documents)} document pages in total")
     return all_documents
 
-def split_documents(documents, chunk_size=1000, chunk_overlap=200):
+def split_documents(documents, chunk_size=RAG_CHUNK_SIZE, chunk_overlap=RAG_CHUNK_OVERLAP, verbose=True):
     """Split documents into chunks for better processing"""
     text_splitter = RecursiveCharacterTextSplitter(
         chunk_size=chunk_size,
@@ -47,5 +41,6 @@ def split_documents(documents, chunk_size=1000, chunk_overlap=200):
         length_function=len,
     )
     chunks = text_splitter.split_documents(documents)
-    print(f"Split into {len(chunks)} chunks")
+    if verbose:
+        print(f"Split into {len(chunks)} chunks")
     return chunks
@@ -0,0 +1,318 @@
+"""
+Persistent cache of document embeddings.
+
+Rebuilding the vector store used to embed every chunk again, including the
+identical ones (boilerplate pages, repeated disclaimers). CachedEmbeddings
+wraps the embedding backend and keeps every vector it computed in SQLite
+(EMBEDDING_CACHE_DB), keyed by (model, SHA-256 of the text) and stored as
+float32 bytes (4 bytes per dimension). embed_documents then:
+
+  * embeds each distinct text once, however many chunks share it;
+  * reads the texts already embedded by this model from the cache;
+  * sends the rest to the backend in batches of EMBEDDING_BATCH_SIZE, with up to
+    EMBEDDING_CONCURRENCY batches in flight, and stores each batch as it returns.
+
+So the cost of a rebuild scales with the new distinct text only. On a rate
+limit (429) that outlasts the retries of the shared transport, every worker
+pauses before sending again (Retry-After or jittered exponential backoff), up
+to EMBEDDING_MAX_RETRIES times per batch.
+
+Backends (EMBEDDING_BACKEND):
+
+  * "openai": EMBEDDING_MODEL through the shared transport (chatbot/llm_transport.py);
+  * "hashing": HashingEmbeddings, computed locally (no network, no API key),
+    for offline ingestion and tests. Its vectors are not comparable with the
+    OpenAI ones: a store built with one backend must be queried with the same.
+
+    python -m chatbot.rag.embedding_cache --stats
+"""
+import argparse
+import hashlib
+import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from chatbot.config import (
+    EMBEDDING_MODEL, EMBEDDING_BACKEND, EMBEDDING_DIMENSIONS, EMBEDDING_CACHE_DB, EMBEDDING_BATCH_SIZE,
+    EMBEDDING_CONCURRENCY, EMBEDDING_MAX_RETRIES, QUERY_EMBEDDING_CACHE_SIZE
+)
+from chatbot.db_pool import connection
+from chatbot.rag.query_cache import LRUCache, normalize_query
+
+# Maximum number of hashes per SELECT ... IN (...) (SQLite's default variable limit is 999)
+_LOOKUP_SIZE = 500
+_WORD_PATTERN = re.compile(r"\w+")
+
+
+def embedding_model_id(backend=EMBEDDING_BACKEND, model=EMBEDDING_MODEL, dimensions=EMBEDDING_DIMENSIONS):
+    """
+    Return the name of the vectors produced by a backend: the cache key, and the
+    embedding model recorded in the ingest manifest.
+    """
+    if backend == "openai":
+        return model
+    if backend == "hashing":
+        return f"hashing-{dimensions}"
+    raise ValueError(f"Unknown EMBEDDING_BACKEND: {backend!r} (expected 'openai' or 'hashing')")
+
+
+def text_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).digest()
+
+
+def is_rate_limit(error):
+    """True if an embedding call failed on a rate limit (HTTP 429), whatever the SDK's exception type."""
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status == 429
+
+
+@lru_cache(maxsize=200_000)
+def _feature_slot(feature, dimensions):
+    """(index, sign) of a feature in a hashed vector."""
+    digest = hashlib.blake2b(feature.encode(), digest_size=8).digest()
+    return int.from_bytes(digest[:4], "little") % dimensions, 1.0 if digest[4] & 1 else -1.0
+
+
+class HashingEmbeddings(Embeddings):
+    """
+    Local embeddings: signed feature hashing of the words and word pairs of a text, L2-normalized.
+
+    Deterministic and offline. Texts sharing words are close, which is enough to
+    build and query a store without network, not to match a trained model's recall.
+    """
+
+    def __init__(self, dimensions=EMBEDDING_DIMENSIONS):
+        self.dimensions = dimensions
+
+    def _embed(self, text):
+        words = _WORD_PATTERN.findall(text.lower())
+        features = words + [f"{first} {second}" for first, second in zip(words, words[1:])]
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        if features:
+            indexes, signs = zip(*[_feature_slot(feature, self.dimensions) for feature in features])
+            np.add.at(vector, list(indexes), signs)
+            vector /= np.linalg.norm(vector) or 1.0
+        return vector.tolist()
+
+    def embed_documents(self, texts):
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text):
+        return self._embed(text)
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings of a backend, cached on disk by (model, text hash), computed in concurrent batches."""
+
+    def __init__(self, backend, model_id, db_path=EMBEDDING_CACHE_DB, batch_size=EMBEDDING_BATCH_SIZE,
+                 concurrency=EMBEDDING_CONCURRENCY, max_retries=EMBEDDING_MAX_RETRIES,
+                 query_cache_size=QUERY_EMBEDDING_CACHE_SIZE):
+        """
+        :param backend: LangChain Embeddings computing the missing vectors
+        :param model_id: name of the backend's vectors (see embedding_model_id)
+        :param db_path: SQLite file of the cache
+        :param batch_size: texts per backend call
+        :param concurrency: backend calls in flight at once
+        :param max_retries: retries of a batch failing on a rate limit
+        :param query_cache_size: query embeddings kept in memory (see chatbot/rag/query_cache.py)
+        """
+        self.backend = backend
+        self.model_id = model_id
+        self.db_path = db_path
+        self.batch_size = max(1, batch_size)
+        self.concurrency = max(1, concurrency)
+        self.max_retries = max_retries
+        self._lock = threading.Lock()
+        self._schema_ready = False
+        # Time before which no batch is sent (set on a rate limit, shared by the workers)
+        self._paused_until = 0.0
+        self.query_cache = LRUCache(query_cache_size)
+        self._metrics = {"texts": 0, "duplicates": 0, "hits": 0, "embedded": 0, "batches": 0,
+                         "rate_limited": 0, "embed_seconds": 0.0}
+
+    def _ensure_schema(self, con):
+        if self._schema_ready:
+            return
+        con.executescript("""
+            CREATE TABLE IF NOT EXISTS embedding_cache (
+                Model       TEXT    NOT NULL,
+                TextHash    BLOB    NOT NULL,
+                Dimensions  INTEGER NOT NULL,
+                Vector      BLOB    NOT NULL,
+                CreatedAt   REAL    NOT NULL,
+                PRIMARY KEY (Model, TextHash)
+            ) WITHOUT ROWID;
+        """)
+        self._schema_ready = True
+
+    def _count(self, key, amount=1):
+        with self._lock:
+            self._metrics[key] += amount
+
+    def stats(self):
+        """Return the counters: texts, duplicates, hits (cached), embedded, batches, rate_limited, embed_seconds."""
+        with self._lock:
+            return dict(self._metrics)
+
+    def _lookup(self, hashes):
+        """Return {hash: vector} of the hashes already embedded by this model."""
+        found = {}
+        with connection(self.db_path, row_factory=None) as con:
+            self._ensure_schema(con)
+            for start in range(0, len(hashes), _LOOKUP_SIZE):
+                part = hashes[start:start + _LOOKUP_SIZE]
+                rows = con.execute(
+                    f"SELECT TextHash, Vector FROM embedding_cache "
+                    f"WHERE Model = ? AND TextHash IN ({','.join('?' * len(part))})",
+                    (self.model_id, *part)
+                ).fetchall()
+                for digest, blob in rows:
+                    found[digest] = np.frombuffer(blob, dtype=np.float32).tolist()
+        return found
+
+    def _store(self, hashes, vectors):
+        """
+        Store the vectors of a batch.
+
+        :return: the vectors as float32 values, i.e. as they are read back from the cache later
+        """
+        matrix = np.asarray(vectors, dtype=np.float32)
+        now = time.time()
+        with connection(self.db_path, row_factory=None) as con:
+            self._ensure_schema(con)
+            con.executemany(
+                "INSERT OR REPLACE INTO embedding_cache (Model, TextHash, Dimensions, Vector, CreatedAt) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(self.model_id, digest, matrix.shape[1], row.tobytes(), now) for digest, row in zip(hashes, matrix)]
+            )
+            con.commit()
+        return matrix.tolist()
+
+    def _embed_batch(self, texts):
+        """Embed one batch, waiting out rate limits (the other workers wait too)."""
+        from chatbot.llm_transport import backoff_delay
+
+        for attempt in range(self.max_retries + 1):
+            delay = self._paused_until - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            try:
+                return self.backend.embed_documents(texts)
+            except Exception as e:
+                if not is_rate_limit(e) or attempt == self.max_retries:
+                    raise
+                self._count("rate_limited")
+                delay = backoff_delay(attempt, getattr(e, "response", None))
+                with self._lock:
+                    self._paused_until = max(self._paused_until, time.monotonic() + delay)
+                print(f"⏳ Embedding rate limited, pausing {delay:.1f}s (retry {attempt + 1}/{self.max_retries})")
+
+    def embed_documents(self, texts):
+        """
+        Embed texts, computing only those neither in the cache nor repeated in the list.
+
+        :param texts: texts to embed
+        :return: one vector per text, in order
+        """
+        texts = list(texts)
+        hashes = [text_hash(text) for text in texts]
+        # First text of each distinct hash
+        distinct = dict(zip(hashes, texts))
+        self._count("texts", len(texts))
+        self._count("duplicates", len(texts) - len(distinct))
+        vectors = self._lookup(list(distinct))
+        self._count("hits", len(vectors))
+        missing = [digest for digest in distinct if digest not in vectors]
+
+        if missing:
+            start = time.perf_counter()
+            batches = [missing[i:i + self.batch_size] for i in range(0, len(missing), self.batch_size)]
+            with ThreadPoolExecutor(max_workers=min(self.concurrency, len(batches))) as pool:
+                futures = {pool.submit(self._embed_batch, [distinct[digest] for digest in batch]): batch
+                           for batch in batches}
+                for future in as_completed(futures):
+                    batch = futures[future]
+                    # Stored as each batch returns: an interrupted run keeps what it paid for
+                    embedded = self._store(batch, future.result())
+                    vectors.update(zip(batch, embedded))
+                    self._count("batches")
+                    self._count("embedded", len(batch))
+            self._count("embed_seconds", time.perf_counter() - start)
+        return [vectors[digest] for digest in hashes]
+
+    def embed_query(self, text):
+        """Embed a query, reusing the embedding of the same (normalized) query asked recently."""
+        key = normalize_query(text)
+        embedding = self.query_cache.get(key)
+        if embedding is None:
+            embedding = self.backend.embed_query(text)
+            self.query_cache.put(key, embedding)
+        return embedding
+
+    def cache_info(self):
+        """Return {model: (vectors, bytes of vector data)} of the cache file."""
+        with connection(self.db_path, row_factory=None) as con:
+            self._ensure_schema(con)
+            rows = con.execute(
+                "SELECT Model, COUNT(*), SUM(LENGTH(Vector)) FROM embedding_cache GROUP BY Model"
+            ).fetchall()
+        return {model: (count, size) for model, count, size in rows}
+
+
+_embeddings = {}
+_embeddings_lock = threading.Lock()
+
+
+def get_backend_embeddings(backend=EMBEDDING_BACKEND):
+    """Return the uncached embeddings of a backend."""
+    if backend == "hashing":
+        return HashingEmbeddings(EMBEDDING_DIMENSIONS)
+    from chatbot.llm_transport import get_embeddings
+    return get_embeddings(EMBEDDING_MODEL)
+
+
+def get_cached_embeddings(backend=EMBEDDING_BACKEND):
+    """Return the shared CachedEmbeddings of a backend (EMBEDDING_BACKEND by default)."""
+    model_id = embedding_model_id(backend)
+    with _embeddings_lock:
+        embeddings = _embeddings.get(model_id)
+        if embeddings is None:
+            embeddings = _embeddings[model_id] = CachedEmbeddings(get_backend_embeddings(backend), model_id)
+    return embeddings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stats", action="store_true", help="print the vectors cached per model (default)")
+    parser.add_argument("--clear", metavar="MODEL", help="drop the vectors of a model")
+    args = parser.parse_args()
+
+    cache = CachedEmbeddings(backend=None, model_id=None)
+    if args.clear:
+        with connection(cache.db_path) as con:
+            cache._ensure_schema(con)
+            deleted = con.execute("DELETE FROM embedding_cache WHERE Model = ?", (args.clear,)).rowcount
+            con.commit()
+        print(f"Dropped {deleted} cached vectors of {args.clear}")
+        return
+    info = cache.cache_info()
+    print(f"Embedding cache {os.path.abspath(cache.db_path)} (current model: {embedding_model_id()})")
+    for model, (count, size) in sorted(info.items()):
+        print(f"  {model:32s} {count:>9d} vectors {size / 1e6:>9.1f} MB")
+    if not info:
+        print("  empty")
+
+
+if __name__ == "__main__":
+    main()
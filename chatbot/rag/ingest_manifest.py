@@ -0,0 +1,213 @@
+"""
+Manifest of the documents indexed in the vector store.
+
+For every file of the documents directory that is in the store, the manifest
+(ingest_manifest.json, next to the Chroma data) records its mtime, size,
+SHA-256 and the ids of its chunks. A rebuild compares the directory with it:
+
+  * files whose mtime and size are unchanged are skipped without reading them;
+  * other files are hashed, and only new or modified contents are loaded,
+    split and embedded;
+  * the chunks of removed or modified files are deleted by id.
+
+Chunk ids are derived from the file path and content hash, so adding the same
+file twice (e.g. after an interrupted run) replaces its chunks instead of
+duplicating them. A change of the split settings or of the embedding model
+invalidates every file, and so does a change of vector store backend.
+
+    python -m chatbot.rag.ingest_manifest --show      # manifest and pending changes
+    python -m chatbot.rag.ingest_manifest --sync      # apply the pending changes (prints the throughput)
+    python -m chatbot.rag.ingest_manifest --rebuild   # re-index everything
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+from datetime import datetime
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from chatbot.config import (
+    VECTOR_DB_DIR, DOCS_DIRECTORY, RAG_CHUNK_SIZE, RAG_CHUNK_OVERLAP, INGEST_WORKERS, INGEST_BATCH_SIZE,
+    VECTOR_STORE_BACKEND
+)
+from chatbot.rag.embedding_cache import embedding_model_id
+
+MANIFEST_FILE = "ingest_manifest.json"
+MANIFEST_VERSION = 1
+
+# Extensions handled by document_loader.load_file
+DOCUMENT_EXTENSIONS = (".pdf", ".txt")
+
+
+def find_documents(directory_path):
+    """
+    Return the paths of the supported documents under a directory, sorted.
+    """
+    found = []
+    for root, _, files in os.walk(directory_path):
+        for name in files:
+            if os.path.splitext(name)[1].lower() in DOCUMENT_EXTENSIONS:
+                found.append(os.path.join(root, name))
+    return sorted(found)
+
+
+def file_sha256(path):
+    """
+    Return the SHA-256 of a file's content (hex).
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as document:
+        for block in iter(lambda: document.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def chunk_ids(relative_path, sha256, count):
+    """
+    Return the ids of the chunks of a file: stable for a given path and content.
+    """
+    prefix = hashlib.sha256(f"{relative_path}\0{sha256}".encode()).hexdigest()[:20]
+    return [f"{prefix}-{index:05d}" for index in range(count)]
+
+
+def ingest_settings(chunk_size=RAG_CHUNK_SIZE, chunk_overlap=RAG_CHUNK_OVERLAP, embedding_model=None,
+                    vector_store=VECTOR_STORE_BACKEND):
+    """
+    Return the settings the chunks of the store depend on.
+
+    :param embedding_model: name of the vectors (embedding_model_id() of EMBEDDING_BACKEND by default)
+    :param vector_store: backend holding the chunks (switching backends re-indexes everything)
+    """
+    if embedding_model is None:
+        embedding_model = embedding_model_id()
+    return {"chunk_size": chunk_size, "chunk_overlap": chunk_overlap, "embedding_model": embedding_model,
+            "vector_store": vector_store}
+
+
+def new_manifest(settings):
+    return {"version": MANIFEST_VERSION, "settings": settings, "files": {}}
+
+
+def load_manifest(persist_directory=None):
+    """
+    Load the manifest of a vector store.
+
+    :return: the manifest, or None if the store has none (not built, or built before the manifest existed)
+    """
+    if persist_directory is None:
+        persist_directory = VECTOR_DB_DIR
+    try:
+        with open(os.path.join(persist_directory, MANIFEST_FILE), encoding="utf-8") as manifest_file:
+            manifest = json.load(manifest_file)
+    except FileNotFoundError:
+        return None
+    except ValueError as e:
+        print(f"⚠️  Unreadable ingest manifest, the vector store will be rebuilt: {e}")
+        return None
+    if manifest.get("version") != MANIFEST_VERSION:
+        return None
+    return manifest
+
+
+def save_manifest(manifest, persist_directory=None):
+    """
+    Write the manifest atomically (a crash leaves the previous one in place).
+    """
+    if persist_directory is None:
+        persist_directory = VECTOR_DB_DIR
+    os.makedirs(persist_directory, exist_ok=True)
+    path = os.path.join(persist_directory, MANIFEST_FILE)
+    manifest["updated_at"] = datetime.now().isoformat(timespec="seconds")
+    with open(path + ".tmp", "w", encoding="utf-8") as manifest_file:
+        json.dump(manifest, manifest_file, indent=1, sort_keys=True)
+    os.replace(path + ".tmp", path)
+
+
+def plan_changes(docs_directory, manifest, settings, verify=False):
+    """
+    Compare the documents directory with the manifest.
+
+    :param docs_directory: directory of the documents
+    :param manifest: manifest of the store (None: everything is new)
+    :param settings: current split settings and embedding model; if they differ from the
+                     manifest's, every file is re-indexed
+    :param verify: hash every file, even those whose mtime and size are unchanged
+    :return: dict with the lists "added", "changed", "removed" and "unchanged" (relative paths),
+             "files": {relative path: {"path", "mtime", "size", "sha256"}} for the files on disk,
+             and "reset": True if the manifest was made with other settings (every chunk is stale)
+    """
+    reset = manifest is not None and manifest.get("settings") != settings
+    known = {} if manifest is None or reset else manifest["files"]
+    plan = {"added": [], "changed": [], "removed": [], "unchanged": [], "files": {}, "reset": reset}
+    for path in find_documents(docs_directory):
+        relative_path = os.path.relpath(path, docs_directory).replace(os.sep, "/")
+        stat = os.stat(path)
+        record = known.get(relative_path)
+        info = {"path": path, "mtime": stat.st_mtime, "size": stat.st_size}
+        if record and not verify and record["mtime"] == stat.st_mtime and record["size"] == stat.st_size:
+            info["sha256"] = record["sha256"]
+        else:
+            info["sha256"] = file_sha256(path)
+        plan["files"][relative_path] = info
+        if record is None:
+            plan["added"].append(relative_path)
+        elif record["sha256"] != info["sha256"]:
+            plan["changed"].append(relative_path)
+        else:
+            plan["unchanged"].append(relative_path)
+    if manifest is not None:
+        plan["removed"] = sorted(set(manifest["files"]) - set(plan["files"]))
+    return plan
+
+
+def show(docs_directory, persist_directory, settings):
+    """Print the manifest and the changes a sync would apply."""
+    manifest = load_manifest(persist_directory)
+    if manifest is None:
+        print(f"No ingest manifest in {persist_directory}: the next sync indexes every document.")
+    else:
+        files = manifest["files"]
+        print(f"Ingest manifest of {persist_directory} (updated {manifest.get('updated_at', '?')})")
+        print(f"Settings: {manifest['settings']}")
+        print(f"{'file':50s} {'size':>10s} {'modified':>19s} {'sha256':>12s} {'chunks':>7s}")
+        for relative_path, record in sorted(files.items()):
+            modified = datetime.fromtimestamp(record["mtime"]).strftime("%Y-%m-%d %H:%M:%S")
+            print(f"{relative_path[-50:]:50s} {record['size']:>10d} {modified:>19s} "
+                  f"{record['sha256'][:12]:>12s} {len(record['chunk_ids']):>7d}")
+        print(f"{len(files)} files, {sum(len(record['chunk_ids']) for record in files.values())} chunks")
+        if manifest.get("settings") != settings:
+            print(f"⚠️  Current settings differ ({settings}): the next sync re-indexes every document.")
+
+    plan = plan_changes(docs_directory, manifest, settings)
+    print(f"\nPending changes in {docs_directory}: {len(plan['added'])} new, {len(plan['changed'])} modified, "
+          f"{len(plan['removed'])} removed, {len(plan['unchanged'])} unchanged")
+    for label in ("added", "changed", "removed"):
+        for relative_path in plan[label]:
+            print(f"  {label:8s} {relative_path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    action = parser.add_mutually_exclusive_group()
+    action.add_argument("--show", action="store_true", help="print the manifest and the pending changes (default)")
+    action.add_argument("--sync", action="store_true", help="index new and modified documents, drop removed ones")
+    action.add_argument("--rebuild", action="store_true", help="re-index every document")
+    parser.add_argument("--docs", default=DOCS_DIRECTORY, help="documents directory")
+    parser.add_argument("--store", default=VECTOR_DB_DIR, help="vector store directory")
+    parser.add_argument("--verify", action="store_true", help="hash every file, even with unchanged mtime and size")
+    parser.add_argument("--workers", type=int, default=INGEST_WORKERS, help="processes loading and splitting files")
+    parser.add_argument("--batch-size", type=int, default=INGEST_BATCH_SIZE, help="chunks per embedding call")
+    args = parser.parse_args()
+
+    if args.sync or args.rebuild:
+        from chatbot.rag.vector_store import sync_vector_store
+        sync_vector_store(args.docs, args.store, rebuild=args.rebuild, verify=args.verify,
+                          workers=args.workers, batch_size=args.batch_size)
+    else:
+        show(args.docs, args.store, ingest_settings())
+
+
+if __name__ == "__main__":
+    main()
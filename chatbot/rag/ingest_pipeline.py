@@ -0,0 +1,120 @@
+"""
+Streaming ingestion pipeline: parse and split documents in a process pool.
+
+PDF parsing and text splitting are CPU bound and pure Python, so they run in
+worker processes (INGEST_WORKERS), one file per task. At most INGEST_WINDOW
+files are in flight: their chunks are yielded as soon as a file is done, and a
+new file is submitted only when one has been consumed. The chunks of the whole
+corpus are never held in memory at once, whatever its size; the caller embeds
+them in batches (see vector_store.sync_vector_store).
+
+IngestStats times each stage (load, split, embed) so that the throughput of
+an ingestion job can be estimated from a smaller one.
+"""
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+
+from chatbot.config import INGEST_WORKERS, INGEST_WINDOW
+
+
+@dataclass
+class IngestStats:
+    """Counters of an ingestion run (files, chunks) and the time spent in each stage."""
+    added: int = 0
+    changed: int = 0
+    removed: int = 0
+    unchanged: int = 0
+    failed: int = 0
+    pages: int = 0
+    chunks_added: int = 0
+    chunks_deleted: int = 0
+    # Chunk texts read from the embedding cache, sent to the backend, and repeated within a batch
+    embeddings_cached: int = 0
+    embeddings_computed: int = 0
+    embeddings_duplicated: int = 0
+    # Summed over the workers: the time a single process would take
+    load_seconds: float = 0.0
+    split_seconds: float = 0.0
+    embed_seconds: float = 0.0
+    seconds: float = 0.0
+    workers: int = 1
+
+    @staticmethod
+    def _rate(count, seconds):
+        return count / seconds if seconds > 0 else 0.0
+
+    def report(self):
+        """Return the per-stage throughput, for sizing ingestion jobs."""
+        return (
+            f"load {self._rate(self.pages, self.load_seconds):.1f} pages/s per worker, "
+            f"split {self._rate(self.chunks_added, self.split_seconds):.0f} chunks/s per worker, "
+            f"embed {self._rate(self.chunks_added, self.embed_seconds):.1f} chunks/s; "
+            f"overall {self._rate(self.pages, self.seconds):.1f} pages/s, "
+            f"{self._rate(self.chunks_added, self.seconds):.1f} chunks/s with {self.workers} worker(s)"
+        )
+
+
+def load_and_split(file_path, chunk_size, chunk_overlap):
+    """
+    Load one file and split it into chunks (runs in a worker process).
+
+    :return: (chunks, number of pages, load seconds, split seconds)
+    """
+    from chatbot.rag.document_loader import load_file, split_documents
+
+    start = time.perf_counter()
+    pages = load_file(file_path)
+    loaded = time.perf_counter()
+    chunks = split_documents(pages, chunk_size, chunk_overlap, verbose=False)
+    return chunks, len(pages), loaded - start, time.perf_counter() - loaded
+
+
+def iter_split_files(jobs, chunk_size, chunk_overlap, workers=INGEST_WORKERS, window=INGEST_WINDOW):
+    """
+    Load and split files in parallel, yielding each file's chunks as soon as they are ready.
+
+    :param jobs: iterable of (key, file path); the key is yielded back with the result
+    :param workers: worker processes (1: load in this process, without a pool)
+    :param window: maximum number of files loaded or waiting to be consumed at once
+    :return: generator of (key, result, error): result is the tuple of load_and_split,
+             error the exception raised for this file (result is then None)
+    """
+    jobs = iter(jobs)
+    if workers <= 1:
+        for key, file_path in jobs:
+            try:
+                yield key, load_and_split(file_path, chunk_size, chunk_overlap), None
+            except Exception as e:
+                yield key, None, e
+        return
+
+    window = max(window, workers)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = {}
+
+        def submit_next():
+            job = next(jobs, None)
+            if job is None:
+                return False
+            key, file_path = job
+            pending[pool.submit(load_and_split, file_path, chunk_size, chunk_overlap)] = key
+            return True
+
+        while len(pending) < window and submit_next():
+            pass
+        try:
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    key = pending.pop(future)
+                    # Refill the window before handing the result over: the workers keep busy
+                    submit_next()
+                    try:
+                        yield key, future.result(), None
+                    except Exception as e:
+                        yield key, None, e
+        finally:
+            # Consumer stopped early: do not start the remaining files
+            for future in pending:
+                future.cancel()
@@ -0,0 +1,407 @@
+"""
+Vector store on a memory-mapped NumPy matrix (VECTOR_STORE_BACKEND=numpy).
+
+For our corpus sizes (thousands to a few hundred thousand chunks) the startup
+and per-query overhead of Chroma dominate the cost of the search itself.
+NumpyVectorStore keeps, in the store directory:
+
+  * vectors.f32: float32 matrix of the L2-normalized embeddings, one row per
+    chunk, memory-mapped (opening the store reads nothing, the OS pages the
+    rows in on the first queries);
+  * numpy_store.db: SQLite table of the chunks (row of the vector, id, text,
+    metadata) and of the store settings.
+
+A query is one matrix-vector product (cosine similarity) followed by an
+argpartition for the top k: exact search. With VECTOR_STORE_IVF_LISTS > 0 and
+at least IVF_TRAINING_POINTS rows per list, an IVF index (spherical k-means
+centroids) restricts the product to the rows of the VECTOR_STORE_IVF_PROBES
+lists nearest to the query: approximate, and faster on large corpora. The
+index is built on the first query after a change and saved next to the
+vectors (ivf_index.npz) for the other processes and restarts.
+benchmarks/vector_store_recall.py measures the recall and latency of both
+against Chroma.
+
+It implements the part of the LangChain VectorStore interface the chatbot
+uses: add_documents / add_texts with ids, delete, delete_collection,
+similarity_search(_by_vector, _with_score), from_documents / from_texts and
+as_retriever. Several processes may read a store while one writes it (the
+ingestion): readers pick up the changes on their next query.
+"""
+import itertools
+import json
+import os
+import threading
+import time
+import uuid
+from typing import Any, Iterable, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.vectorstores import VectorStore
+
+from chatbot.config import VECTOR_DB_DIR, VECTOR_STORE_IVF_LISTS, VECTOR_STORE_IVF_PROBES
+from chatbot.db_pool import connection
+
+VECTORS_FILE = "vectors.f32"
+METADATA_DB = "numpy_store.db"
+# IVF index of the last generation queried, reused by the other processes and after a restart
+IVF_FILE = "ivf_index.npz"
+# Minimum number of rows per IVF list: below, k-means is not worth it and the search stays exact
+IVF_TRAINING_POINTS = 39
+# k-means trains on a sample of at most this many rows per list
+IVF_SAMPLE_PER_LIST = 64
+IVF_ITERATIONS = 10
+# Rows per block when assigning every row to its list (bounds the temporary score matrix)
+_BLOCK_ROWS = 65536
+# Maximum number of ids or rows per SELECT ... IN (...)
+_LOOKUP_SIZE = 500
+
+
+def _normalize(matrix):
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def top_k(scores, k):
+    """Return the indexes of the k highest scores, best first (argpartition, then a sort of the k only)."""
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    if k < len(scores):
+        best = np.argpartition(-scores, k - 1)[:k]
+    else:
+        best = np.arange(len(scores))
+    return best[np.argsort(-scores[best], kind="stable")]
+
+
+class IVFIndex:
+    """Inverted file index: the rows grouped by their nearest k-means centroid."""
+
+    def __init__(self, centroids, rows, offsets):
+        self.centroids = centroids      # (lists, dimensions), normalized
+        self.rows = rows                # rows of the matrix, grouped by list
+        self.offsets = offsets          # rows[offsets[i]:offsets[i + 1]] belong to list i
+
+    @classmethod
+    def build(cls, matrix, live_rows, lists, seed=0):
+        """
+        Cluster the live rows of a matrix into `lists` lists (spherical k-means).
+
+        :param matrix: normalized vectors (memmap)
+        :param live_rows: rows to index
+        :param lists: number of lists
+        """
+        rng = np.random.default_rng(seed)
+        sample_rows = live_rows
+        if len(live_rows) > lists * IVF_SAMPLE_PER_LIST:
+            sample_rows = np.sort(rng.choice(live_rows, lists * IVF_SAMPLE_PER_LIST, replace=False))
+        sample = np.asarray(matrix[sample_rows])
+        centroids = sample[rng.choice(len(sample), lists, replace=False)].copy()
+        for _ in range(IVF_ITERATIONS):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            # Sum of the rows of each list: sorted by list, then one reduceat
+            order = np.argsort(assignment, kind="stable")
+            counts = np.bincount(assignment, minlength=lists)
+            filled = counts > 0
+            starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+            # An empty list keeps its previous centroid
+            centroids[filled] = _normalize(np.add.reduceat(sample[order], starts[filled]))
+
+        assignment = np.empty(len(live_rows), dtype=np.int64)
+        for start in range(0, len(live_rows), _BLOCK_ROWS):
+            block = np.asarray(matrix[live_rows[start:start + _BLOCK_ROWS]])
+            assignment[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+        order = np.argsort(assignment, kind="stable")
+        offsets = np.concatenate(([0], np.cumsum(np.bincount(assignment, minlength=lists))))
+        return cls(centroids, live_rows[order], offsets)
+
+    def save(self, path, generation):
+        np.savez(path + ".tmp.npz", generation=generation, centroids=self.centroids, rows=self.rows,
+                 offsets=self.offsets)
+        os.replace(path + ".tmp.npz", path)
+
+    @classmethod
+    def load(cls, path, generation, lists):
+        """Return the index saved for a generation and number of lists, or None."""
+        try:
+            with np.load(path) as saved:
+                if int(saved["generation"]) != generation or len(saved["centroids"]) != lists:
+                    return None
+                return cls(saved["centroids"], saved["rows"], saved["offsets"])
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def candidates(self, query, probes):
+        """Rows of the `probes` lists whose centroids are nearest to the query."""
+        nearest = top_k(self.centroids @ query, probes)
+        return np.concatenate([self.rows[self.offsets[i]:self.offsets[i + 1]] for i in nearest])
+
+
+class _Snapshot:
+    """State of the store as of one generation: the matrix and its live rows."""
+
+    def __init__(self, generation, matrix=None, live_rows=None, dead_rows=None):
+        self.generation = generation
+        self.matrix = matrix            # memmap (used rows, dimensions), or None if empty
+        self.live_rows = live_rows if live_rows is not None else np.empty(0, dtype=np.int64)
+        self.dead_rows = dead_rows if dead_rows is not None else np.empty(0, dtype=np.int64)
+        self.ivf = None
+
+
+class NumpyVectorStore(VectorStore):
+    """LangChain vector store on a memory-mapped float32 matrix, with the chunks in SQLite."""
+
+    def __init__(self, persist_directory=None, embedding_function=None, ivf_lists=VECTOR_STORE_IVF_LISTS,
+                 ivf_probes=VECTOR_STORE_IVF_PROBES):
+        """
+        :param persist_directory: directory of the store (VECTOR_DB_DIR by default)
+        :param embedding_function: LangChain Embeddings of the texts and queries
+        :param ivf_lists: lists of the IVF index (0: exact search only)
+        :param ivf_probes: lists searched per query with the IVF index
+        """
+        self.persist_directory = persist_directory or VECTOR_DB_DIR
+        self._embedding_function = embedding_function
+        self.ivf_lists = ivf_lists
+        self.ivf_probes = ivf_probes
+        os.makedirs(self.persist_directory, exist_ok=True)
+        self.db_path = os.path.join(self.persist_directory, METADATA_DB)
+        self.vectors_path = os.path.join(self.persist_directory, VECTORS_FILE)
+        self._lock = threading.Lock()
+        self._snapshot = _Snapshot(generation=None)
+        with connection(self.db_path) as con:
+            con.executescript("""
+                CREATE TABLE IF NOT EXISTS chunks (
+                    RowIndex  INTEGER PRIMARY KEY,
+                    ChunkId   TEXT    NOT NULL UNIQUE,
+                    Content   TEXT    NOT NULL,
+                    Metadata  TEXT    NOT NULL DEFAULT '{}'
+                );
+                CREATE TABLE IF NOT EXISTS store_meta (
+                    Key    TEXT PRIMARY KEY,
+                    Value  INTEGER NOT NULL
+                );
+                INSERT OR IGNORE INTO store_meta (Key, Value)
+                VALUES ('dimensions', 0), ('capacity', 0), ('generation', 0);
+            """)
+            con.commit()
+        if not os.path.exists(self.vectors_path):
+            open(self.vectors_path, "wb").close()
+
+    @property
+    def embeddings(self):
+        return self._embedding_function
+
+    # -- reading ----------------------------------------------------------
+
+    @staticmethod
+    def _meta(con):
+        return dict(con.execute("SELECT Key, Value FROM store_meta").fetchall())
+
+    def _current(self):
+        """Return the snapshot of the store, reloaded if another writer (or process) changed it."""
+        with connection(self.db_path, row_factory=None) as con:
+            generation = con.execute("SELECT Value FROM store_meta WHERE Key = 'generation'").fetchone()[0]
+            snapshot = self._snapshot
+            if generation == snapshot.generation:
+                return snapshot
+            with self._lock:
+                if self._snapshot.generation == generation:
+                    return self._snapshot
+                meta = self._meta(con)
+                live_rows = np.fromiter((row[0] for row in con.execute("SELECT RowIndex FROM chunks ORDER BY RowIndex")),
+                                        dtype=np.int64)
+        matrix = None
+        dead_rows = None
+        if len(live_rows):
+            used = int(live_rows[-1]) + 1
+            matrix = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(used, meta["dimensions"]))
+            dead_rows = np.setdiff1d(np.arange(used), live_rows, assume_unique=True)
+        with self._lock:
+            self._snapshot = _Snapshot(meta["generation"], matrix, live_rows, dead_rows)
+            return self._snapshot
+
+    def _ivf(self, snapshot):
+        """IVF index of a snapshot, loaded or built on first use (None: exact search)."""
+        if not self.ivf_lists or len(snapshot.live_rows) < self.ivf_lists * IVF_TRAINING_POINTS:
+            return None
+        if snapshot.ivf is None:
+            with self._lock:
+                if snapshot.ivf is None:
+                    path = os.path.join(self.persist_directory, IVF_FILE)
+                    ivf = IVFIndex.load(path, snapshot.generation, self.ivf_lists)
+                    if ivf is None:
+                        start = time.perf_counter()
+                        ivf = IVFIndex.build(snapshot.matrix, snapshot.live_rows, self.ivf_lists)
+                        ivf.save(path, snapshot.generation)
+                        print(f"IVF index of {len(snapshot.live_rows)} vectors built in "
+                              f"{time.perf_counter() - start:.2f}s ({self.ivf_lists} lists)")
+                    snapshot.ivf = ivf
+        return snapshot.ivf
+
+    def _search(self, embedding, k) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the rows of the k nearest chunks and their cosine similarities, best first."""
+        snapshot = self._current()
+        if snapshot.matrix is None:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        query = _normalize(embedding)
+        if query.shape[0] != snapshot.matrix.shape[1]:
+            raise ValueError(f"Query embedding has {query.shape[0]} dimensions, "
+                             f"the store {snapshot.matrix.shape[1]} (another embedding model?)")
+        ivf = self._ivf(snapshot)
+        if ivf is not None:
+            rows = ivf.candidates(query, self.ivf_probes)
+            scores = snapshot.matrix[rows] @ query
+            best = top_k(scores, k)
+            return rows[best], scores[best]
+        scores = snapshot.matrix @ query
+        # Rows of deleted chunks (zero vectors) are never returned
+        scores[snapshot.dead_rows] = -np.inf
+        best = top_k(scores, min(k, len(snapshot.live_rows)))
+        return best, scores[best]
+
+    def _documents(self, rows) -> List[Document]:
+        found = {}
+        rows = [int(row) for row in rows]
+        with connection(self.db_path, row_factory=None) as con:
+            for start in range(0, len(rows), _LOOKUP_SIZE):
+                part = rows[start:start + _LOOKUP_SIZE]
+                for row, content, metadata in con.execute(f"SELECT RowIndex, Content, Metadata FROM chunks "
+                                                          f"WHERE RowIndex IN ({','.join('?' * len(part))})", part):
+                    found[row] = Document(page_content=content, metadata=json.loads(metadata))
+        # A chunk deleted since the search is skipped
+        return [found[row] for row in rows if row in found]
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4, **kwargs: Any) -> List[Document]:
+        rows, _ = self._search(embedding, k)
+        return self._documents(rows)
+
+    def similarity_search_with_score(self, query: str, k: int = 4, **kwargs: Any) -> List[Tuple[Document, float]]:
+        """Return the k nearest chunks with their cosine distance (1 - cosine similarity: lower is closer)."""
+        rows, scores = self._search(self._embedding_function.embed_query(query), k)
+        return list(zip(self._documents(rows), (1.0 - float(score) for score in scores)))
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Document]:
+        return self.similarity_search_by_vector(self._embedding_function.embed_query(query), k)
+
+    def _select_relevance_score_fn(self):
+        return lambda distance: 1.0 - distance
+
+    def count(self) -> int:
+        """Number of chunks in the store."""
+        return len(self._current().live_rows)
+
+    # -- writing ----------------------------------------------------------
+
+    def _writable_matrix(self, con, rows_needed, dimensions):
+        """
+        Memory-map the vectors file for writing, growing it (doubling) to hold rows_needed rows.
+
+        The file never shrinks: readers may still map its previous size.
+        """
+        meta = self._meta(con)
+        if meta["dimensions"] not in (0, dimensions):
+            raise ValueError(f"Embeddings have {dimensions} dimensions, the store {meta['dimensions']} "
+                             f"(another embedding model? rebuild the store)")
+        capacity = meta["capacity"]
+        if rows_needed > capacity:
+            capacity = max(rows_needed, 2 * capacity, 1024)
+            if os.path.getsize(self.vectors_path) < capacity * dimensions * 4:
+                with open(self.vectors_path, "r+b") as vectors_file:
+                    vectors_file.truncate(capacity * dimensions * 4)
+            con.execute("UPDATE store_meta SET Value = ? WHERE Key = 'capacity'", (capacity,))
+            con.execute("UPDATE store_meta SET Value = ? WHERE Key = 'dimensions'", (dimensions,))
+        return np.memmap(self.vectors_path, dtype=np.float32, mode="r+", shape=(capacity, dimensions))
+
+    @staticmethod
+    def _free_rows(con):
+        """Rows for new chunks: those of deleted chunks first, then rows at the end."""
+        count, last = con.execute("SELECT COUNT(*), MAX(RowIndex) FROM chunks").fetchone()
+        end = -1 if last is None else last
+        if count < end + 1:
+            used = set(row[0] for row in con.execute("SELECT RowIndex FROM chunks"))
+            yield from (row for row in range(end + 1) if row not in used)
+        yield from itertools.count(end + 1)
+
+    @staticmethod
+    def _bump_generation(con):
+        con.execute("UPDATE store_meta SET Value = Value + 1 WHERE Key = 'generation'")
+
+    def add_texts(self, texts: Iterable[str], metadatas: Optional[List[dict]] = None,
+                  ids: Optional[List[str]] = None, **kwargs: Any) -> List[str]:
+        """
+        Embed and add texts; a text whose id is already in the store replaces it.
+
+        :return: the ids of the texts
+        """
+        texts = list(texts)
+        if not texts:
+            return []
+        ids = list(ids) if ids else [uuid.uuid4().hex for _ in texts]
+        metadatas = metadatas or [{}] * len(texts)
+        vectors = _normalize(self._embedding_function.embed_documents(texts))
+
+        with self._lock, connection(self.db_path, row_factory=None) as con:
+            existing = {}
+            for start in range(0, len(ids), _LOOKUP_SIZE):
+                part = ids[start:start + _LOOKUP_SIZE]
+                existing.update(con.execute(f"SELECT ChunkId, RowIndex FROM chunks "
+                                            f"WHERE ChunkId IN ({','.join('?' * len(part))})", part).fetchall())
+            free_rows = self._free_rows(con)
+            rows = []
+            for chunk_id in ids:
+                row = existing.get(chunk_id)
+                if row is None:
+                    row = existing[chunk_id] = next(free_rows)
+                rows.append(row)
+            matrix = self._writable_matrix(con, max(rows) + 1, vectors.shape[1])
+            matrix[rows] = vectors
+            # Vectors first: a crash before the commit leaves them in rows no chunk points to
+            matrix.flush()
+            del matrix
+            con.executemany(
+                "INSERT OR REPLACE INTO chunks (RowIndex, ChunkId, Content, Metadata) VALUES (?, ?, ?, ?)",
+                [(row, chunk_id, text, json.dumps(metadata or {}, ensure_ascii=False, default=str))
+                 for row, chunk_id, text, metadata in zip(rows, ids, texts, metadatas)]
+            )
+            self._bump_generation(con)
+            con.commit()
+        return ids
+
+    def delete(self, ids: Optional[List[str]] = None, **kwargs: Any) -> Optional[bool]:
+        """Delete chunks by id (unknown ids are ignored)."""
+        if not ids:
+            return True
+        with self._lock, connection(self.db_path, row_factory=None) as con:
+            rows = []
+            for start in range(0, len(ids), _LOOKUP_SIZE):
+                part = list(ids[start:start + _LOOKUP_SIZE])
+                placeholders = ','.join('?' * len(part))
+                rows.extend(row[0] for row in con.execute(
+                    f"SELECT RowIndex FROM chunks WHERE ChunkId IN ({placeholders})", part))
+                con.execute(f"DELETE FROM chunks WHERE ChunkId IN ({placeholders})", part)
+            if rows:
+                meta = self._meta(con)
+                matrix = self._writable_matrix(con, meta["capacity"], meta["dimensions"])
+                matrix[rows] = 0.0
+                matrix.flush()
+                del matrix
+            self._bump_generation(con)
+            con.commit()
+        return True
+
+    def delete_collection(self):
+        """Delete every chunk (the vectors file keeps its size, see _writable_matrix)."""
+        with self._lock, connection(self.db_path, row_factory=None) as con:
+            con.execute("DELETE FROM chunks")
+            con.execute("UPDATE store_meta SET Value = 0 WHERE Key IN ('dimensions', 'capacity')")
+            self._bump_generation(con)
+            con.commit()
+
+    @classmethod
+    def from_texts(cls, texts: List[str], embedding, metadatas: Optional[List[dict]] = None,
+                   ids: Optional[List[str]] = None, persist_directory=None, **kwargs: Any) -> "NumpyVectorStore":
+        store = cls(persist_directory=persist_directory, embedding_function=embedding)
+        store.add_texts(texts, metadatas=metadatas, ids=ids)
+        return store
@@ -0,0 +1,146 @@
+"""
+In-memory caches of the RAG query path.
+
+Every banking question used to embed its query (one embedding API call) and
+run a similarity search over the store, even when the same question had just
+been asked. Two LRU caches, bounded in entries, now skip both:
+
+  * query text -> embedding (CachedEmbeddings.embed_query, QUERY_EMBEDDING_CACHE_SIZE),
+    keyed by the whitespace/case-normalized text;
+  * (embedding, k, store version) -> retrieved chunks (RetrievalCache,
+    RETRIEVAL_CACHE_SIZE), emptied as soon as the store version changes, i.e.
+    after a rebuild or sync (see vector_store.bump_vector_store_version).
+
+The retrieval chain uses CachedRetriever; direct searches go through
+retrieval_cache.search(). Neither cache is shared between processes.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+from chatbot.config import RETRIEVAL_CACHE_SIZE
+
+
+def normalize_query(query: str) -> str:
+    """Collapse whitespace and case: queries differing only by them share their cache entries."""
+    return " ".join(query.split()).casefold()
+
+
+class LRUCache:
+    """Thread-safe mapping keeping the max_entries most recently used entries."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._metrics = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value = self._entries[key]
+            except KeyError:
+                self._metrics["misses"] += 1
+                return default
+            self._entries.move_to_end(key)
+            self._metrics["hits"] += 1
+            return value
+
+    def put(self, key, value):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._metrics["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the hit, miss and eviction counters and the number of entries."""
+        with self._lock:
+            stats = dict(self._metrics)
+        stats["entries"] = len(self._entries)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+
+def embedding_digest(embedding) -> bytes:
+    """Key of an embedding: hash of its float32 values."""
+    return hashlib.blake2b(np.asarray(embedding, dtype=np.float32).tobytes(), digest_size=16).digest()
+
+
+class RetrievalCache:
+    """LRU cache of similarity search results, for one vector store version at a time."""
+
+    def __init__(self, max_entries: int = RETRIEVAL_CACHE_SIZE):
+        self._cache = LRUCache(max_entries)
+        self._version = None
+        self._lock = threading.Lock()
+
+    def _check_version(self, version: str):
+        # A rebuilt store makes every cached result stale
+        with self._lock:
+            if version != self._version:
+                self._cache.clear()
+                self._version = version
+
+    def search(self, vector_store, query: str, k: int = 5, version: Optional[str] = None) -> List[Document]:
+        """
+        Similarity search of a query, served from the cache for a query already searched with this store version.
+
+        :param vector_store: store to search (its embeddings embed the query)
+        :param query: text of the query
+        :param k: number of chunks
+        :param version: version of the store (get_vector_store_version); None to read it from VECTOR_DB_DIR
+        :return: the k most similar chunks
+        """
+        if version is None:
+            from chatbot.rag.vector_store import get_vector_store_version
+            version = get_vector_store_version()
+        self._check_version(version)
+        embedding = vector_store.embeddings.embed_query(query)
+        key = (embedding_digest(embedding), k, version)
+        documents = self._cache.get(key)
+        if documents is None:
+            documents = tuple(vector_store.similarity_search_by_vector(embedding, k=k))
+            self._cache.put(key, documents)
+        return list(documents)
+
+    def clear(self):
+        self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self._cache.stats()
+        stats["version"] = self._version
+        return stats
+
+
+class CachedRetriever(BaseRetriever):
+    """Retriever of a vector store going through the retrieval cache (replaces vector_store.as_retriever())."""
+    vector_store: Any
+    k: int = 5
+    # Directory of the store, for its version (VECTOR_DB_DIR by default)
+    persist_directory: Optional[str] = None
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        from chatbot.rag.vector_store import get_vector_store_version
+        return retrieval_cache.search(self.vector_store, query, self.k,
+                                      get_vector_store_version(self.persist_directory))
+
+
+retrieval_cache = RetrievalCache()
@@ -2,7 +2,6 @@ import os
 import glob
 from pathlib import Path
 from dotenv import load_dotenv
-import shutil
 
 # Load environment variables
 load_dotenv()
@@ -96,50 +95,45 @@ class S2MExplorer:
     def process_documents_for_rag(self, force_rebuild=False):
         """Process documents and build/rebuild the RAG vector store"""
         try:
-            from chatbot.rag.document_loader import load_documents, split_documents
-            from chatbot.rag.vector_store import create_vector_store
+            from chatbot.rag.ingest_manifest import ingest_settings, load_manifest, plan_changes
+            from chatbot.rag.vector_store import sync_vector_store
             from chatbot.config import VECTOR_DB_DIR
             
             print("\n" + "="*70)
             print("PROCESSING DOCUMENTS FOR RAG SYSTEM")
             print("="*70)
             
-            # Check if vector store already exists
+            # Check if vector store already exists: only the changes since the last build are indexed
             if os.path.exists(VECTOR_DB_DIR) and not force_rebuild:
                 print(f"Vector store already exists at: {VECTOR_DB_DIR}")
-                rebuild = input("Do you want to rebuild it? (y/N): ").lower().strip()
-                if rebuild != 'y':
+                manifest = load_manifest(VECTOR_DB_DIR)
+                if manifest is None:
+                    print("It has no ingest manifest: updating it re-indexes every document.")
+                else:
+                    plan = plan_changes(self.output_folder, manifest, ingest_settings())
+                    print(f"Changes since the last build: {len(plan['added'])} new, {len(plan['changed'])} modified, "
+                          f"{len(plan['removed'])} removed document(s)")
+                    if plan["reset"]:
+                        print("The chunk settings or the embedding model changed: every document will be re-indexed.")
+                    elif not (plan["added"] or plan["changed"] or plan["removed"]):
+                        print("Keeping existing vector store (up to date).")
+                        return True
+                update = input("Do you want to update it? (Y/n): ").lower().strip()
+                if update == 'n':
                     print("Keeping existing vector store.")
                     return True
-                else:
-                    print("Rebuilding vector store...")
-                    shutil.rmtree(VECTOR_DB_DIR)
-            
-            # Load documents using your existing loader
-            print(f"Loading documents from: {self.output_folder}")
-            documents = load_documents(self.output_folder)
-            
-            if not documents:
-                print("❌ No documents found to process!")
-                return False
-            
-            print(f"✅ Loaded {len(documents)} document pages")
             
-            # Split documents into chunks
-            print("Splitting documents into chunks...")
-            chunks = split_documents(documents)
+            # Load, split and embed the new and modified documents
+            print(f"Indexing documents from: {self.output_folder}")
+            print("Updating vector store (this may take a few minutes for new documents)...")
+            stats = sync_vector_store(self.output_folder, VECTOR_DB_DIR, rebuild=force_rebuild)
             
-            if not chunks:
+            if not stats.chunks_added and not stats.unchanged:
                 print("❌ No chunks created from documents!")
                 return False
             
-            print(f"✅ Created {len(chunks)} chunks")
-            
-            # Create vector store with the chunks
-            print("Creating vector store (this may take a few minutes)...")
-            create_vector_store(chunks, VECTOR_DB_DIR)
-            
-            print("✅ Vector store created successfully!")
+            print(f"✅ Vector store updated: {stats.added} new, {stats.changed} modified, "
+                  f"{stats.removed} removed document(s), {stats.chunks_added} chunks embedded")
             print(f"📁 Vector store location: {VECTOR_DB_DIR}")
             
             # Test the vector store
@@ -159,14 +153,16 @@ class S2MExplorer:
     def _test_vector_store(self):
         """Test the vector store to make sure it's working"""
         try:
-            from chatbot.rag.vector_store import load_vector_store
+            from chatbot.rag.vector_store import load_vector_store, get_vector_store_version
+            from chatbot.rag.query_cache import retrieval_cache
             from chatbot.config import VECTOR_DB_DIR
             
             vector_store = load_vector_store(VECTOR_DB_DIR)
             
-            # Test query
+            # Test query (same cached path as the chatbot's searches)
             test_query = "account balance"
-            docs = vector_store.similarity_search(test_query, k=2)
+            docs = retrieval_cache.search(vector_store, test_query, k=2,
+                                          version=get_vector_store_version(VECTOR_DB_DIR))
             
             print(f"✅ Vector store test successful!")
             print(f"   Query: '{test_query}'")
@@ -0,0 +1,227 @@
+"""Response cache for general and RAG answers.
+
+FAQ-style questions ("what is a TFSA", "comment ouvrir un compte") are asked
+over and over; their answers do not depend on the user. ResponseCache stores
+those answers in SQLite and serves them again on:
+
+  * an exact match of the normalized question, or
+  * a question whose embedding has a cosine similarity of at least
+    RESPONSE_CACHE_SIMILARITY with a cached one.
+
+Entries are keyed by namespace ("general", "rag") and by version (the vector
+store version for RAG answers), so rebuilding the documents invalidates them.
+They expire after RESPONSE_CACHE_TTL_SECONDS, and the least recently used ones
+are evicted beyond RESPONSE_CACHE_MAX_ENTRIES.
+
+Callers must not cache account-specific answers (see is_account_specific) nor
+answers produced with tools or personalized for a user.
+"""
+import re
+import threading
+import time
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+
+from chatbot.config import (
+    RESPONSE_CACHE_DB, RESPONSE_CACHE_TTL_SECONDS, RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_SIMILARITY
+)
+from chatbot.db_pool import connection
+
+# Questions about the user's own accounts: never cached
+ACCOUNT_SPECIFIC_PATTERN = re.compile(
+    r"\b\d{10,12}\b"
+    r"|\b(my|mine)\s+(account|accounts|balance|card|transactions?|transfers?|savings|chequing|checking)\b"
+    r"|\b(mon|mes|ma)\s+(compte|comptes|solde|carte|transactions?|virements?|épargne|historique)\b",
+    re.IGNORECASE
+)
+
+
+def normalize_question(question: str) -> str:
+    """Lowercase the question, collapse whitespace and drop trailing punctuation."""
+    return re.sub(r"\s+", " ", question.strip().lower()).rstrip(" ?!.")
+
+
+def is_account_specific(question: str) -> bool:
+    """True if the question is about the user's own accounts (its answer must not be cached)."""
+    return bool(ACCOUNT_SPECIFIC_PATTERN.search(question))
+
+
+class ResponseCache:
+    """SQLite-backed exact + semantic cache of answers."""
+
+    def __init__(self, db_path: str = RESPONSE_CACHE_DB, ttl_seconds: int = RESPONSE_CACHE_TTL_SECONDS,
+                 max_entries: int = RESPONSE_CACHE_MAX_ENTRIES,
+                 similarity_threshold: float = RESPONSE_CACHE_SIMILARITY):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.similarity_threshold = similarity_threshold
+        self._lock = threading.Lock()
+        self._schema_ready = False
+        # (namespace, version) -> (entry ids, normalized embedding matrix), rebuilt after writes
+        self._vectors: Dict[tuple, tuple] = {}
+        self._metrics = {
+            "lookups": 0,
+            "exact_hits": 0,
+            "semantic_hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0,
+            "saved_ms": 0.0,
+        }
+
+    def _ensure_schema(self, con):
+        if self._schema_ready:
+            return
+        con.executescript("""
+            CREATE TABLE IF NOT EXISTS response_cache (
+                Id           INTEGER PRIMARY KEY,
+                Namespace    TEXT    NOT NULL,
+                Version      TEXT    NOT NULL,
+                QuestionKey  TEXT    NOT NULL,
+                Answer       TEXT    NOT NULL,
+                Payload      TEXT,
+                Embedding    BLOB,
+                LatencyMs    REAL    NOT NULL DEFAULT 0,
+                CreatedAt    REAL    NOT NULL,
+                LastUsedAt   REAL    NOT NULL,
+                Hits         INTEGER NOT NULL DEFAULT 0,
+                UNIQUE (Namespace, Version, QuestionKey)
+            );
+            CREATE INDEX IF NOT EXISTS idx_response_cache_last_used ON response_cache (LastUsedAt);
+        """)
+        self._schema_ready = True
+
+    def _count(self, key: str, amount=1):
+        with self._lock:
+            self._metrics[key] += amount
+
+    def _hit(self, con, row, kind: str) -> Dict[str, Any]:
+        con.execute("UPDATE response_cache SET LastUsedAt = ?, Hits = Hits + 1 WHERE Id = ?",
+                    (time.time(), row["Id"]))
+        con.commit()
+        self._count(kind)
+        self._count("saved_ms", row["LatencyMs"])
+        return {"answer": row["Answer"], "payload": row["Payload"], "match": kind}
+
+    def get_exact(self, namespace: str, version: str, question: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached answer for the same (normalized) question.
+
+        :return: {'answer', 'payload', 'match'} or None
+        """
+        self._count("lookups")
+        with connection(self.db_path) as con:
+            self._ensure_schema(con)
+            row = con.execute("""
+                SELECT Id, Answer, Payload, LatencyMs FROM response_cache
+                WHERE Namespace = ? AND Version = ? AND QuestionKey = ? AND CreatedAt >= ?
+            """, (namespace, version, normalize_question(question), time.time() - self.ttl_seconds)).fetchone()
+            if row:
+                return self._hit(con, row, "exact_hits")
+        return None
+
+    def get_similar(self, namespace: str, version: str,
+                    embedding: Optional[Sequence[float]]) -> Optional[Dict[str, Any]]:
+        """
+        Look up the cached answer of the most similar question, above the similarity threshold.
+
+        Call after get_exact() missed; counts a miss if nothing is close enough
+        (or if there is no embedding to compare).
+
+        :return: {'answer', 'payload', 'match', 'similarity'} or None
+        """
+        ids, matrix = self._load_vectors(namespace, version) if embedding is not None else ((), None)
+        # Embeddings of another size come from another model: no match
+        if len(ids) and matrix.shape[1] == len(embedding):
+            query = np.array(embedding, dtype=np.float32)
+            query /= np.linalg.norm(query) or 1.0
+            scores = matrix @ query
+            best = int(np.argmax(scores))
+            if scores[best] >= self.similarity_threshold:
+                with connection(self.db_path) as con:
+                    row = con.execute("""
+                        SELECT Id, Answer, Payload, LatencyMs FROM response_cache
+                        WHERE Id = ? AND CreatedAt >= ?
+                    """, (int(ids[best]), time.time() - self.ttl_seconds)).fetchone()
+                    if row:
+                        result = self._hit(con, row, "semantic_hits")
+                        result["similarity"] = float(scores[best])
+                        return result
+        self._count("misses")
+        return None
+
+    def _load_vectors(self, namespace: str, version: str):
+        key = (namespace, version)
+        with self._lock:
+            cached = self._vectors.get(key)
+        if cached is not None:
+            return cached
+        with connection(self.db_path) as con:
+            self._ensure_schema(con)
+            rows = con.execute("""
+                SELECT Id, Embedding FROM response_cache
+                WHERE Namespace = ? AND Version = ? AND Embedding IS NOT NULL AND CreatedAt >= ?
+            """, (namespace, version, time.time() - self.ttl_seconds)).fetchall()
+        if rows:
+            ids = np.array([row["Id"] for row in rows], dtype=np.int64)
+            matrix = np.vstack([np.frombuffer(row["Embedding"], dtype=np.float32) for row in rows])
+        else:
+            ids, matrix = np.empty(0, dtype=np.int64), np.empty((0, 0), dtype=np.float32)
+        with self._lock:
+            self._vectors[key] = (ids, matrix)
+        return ids, matrix
+
+    def store(self, namespace: str, version: str, question: str, answer: str,
+              embedding: Optional[Sequence[float]] = None, latency_ms: float = 0.0, payload: str = None):
+        """
+        Cache an answer.
+
+        :param embedding: Embedding of the question (enables semantic matches)
+        :param latency_ms: Time it took to produce the answer, reported as saved on each hit
+        :param payload: Optional serialized extra data returned with the answer (e.g. sources)
+        """
+        blob = None
+        if embedding is not None:
+            vector = np.asarray(embedding, dtype=np.float32)
+            blob = (vector / (np.linalg.norm(vector) or 1.0)).tobytes()
+        now = time.time()
+        with connection(self.db_path) as con:
+            self._ensure_schema(con)
+            con.execute("""
+                INSERT INTO response_cache (Namespace, Version, QuestionKey, Answer, Payload, Embedding,
+                                            LatencyMs, CreatedAt, LastUsedAt)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (Namespace, Version, QuestionKey) DO UPDATE SET
+                    Answer = excluded.Answer, Payload = excluded.Payload, Embedding = excluded.Embedding,
+                    LatencyMs = excluded.LatencyMs, CreatedAt = excluded.CreatedAt, LastUsedAt = excluded.LastUsedAt
+            """, (namespace, version, normalize_question(question), answer, payload, blob, latency_ms, now, now))
+            evicted = con.execute("DELETE FROM response_cache WHERE CreatedAt < ?",
+                                  (now - self.ttl_seconds,)).rowcount
+            evicted += con.execute("""
+                DELETE FROM response_cache WHERE Id IN (
+                    SELECT Id FROM response_cache ORDER BY LastUsedAt DESC LIMIT -1 OFFSET ?
+                )
+            """, (self.max_entries,)).rowcount
+            con.commit()
+        with self._lock:
+            self._metrics["stores"] += 1
+            self._metrics["evictions"] += evicted
+            # Evictions may touch any namespace: drop every loaded matrix
+            if evicted:
+                self._vectors.clear()
+            else:
+                self._vectors.pop((namespace, version), None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit counters, hit rate and the latency saved by hits."""
+        with self._lock:
+            stats = dict(self._metrics)
+        hits = stats["exact_hits"] + stats["semantic_hits"]
+        stats["hit_rate"] = hits / stats["lookups"] if stats["lookups"] else 0.0
+        return stats
+
+
+# Process-wide cache
+response_cache = ResponseCache()
@@ -1,29 +1,26 @@
 """Response formatter for the banking assistant."""
-import json
-import random
-from decimal import Decimal
-from typing import Dict, List, Any, Optional, Union
+from typing import Any
+
+from chatbot.tool_results import AccountList, BalanceResult, RagAnswer, ToolError, TransactionPage, TransferResult
+
+# Answer types returned as they are, without sources
+GENERAL_ANSWER_TYPES = frozenset(["general", "fallback", "forced_general"])
 
 class ResponseFormatter:
-    """Formats responses from function calls into user-friendly messages."""
+    """Formats the typed results of function calls (chatbot/tool_results.py) into user-friendly messages."""
     
     @staticmethod
     def format_response(function_name: str, result: Any) -> str:
         """Format a function result based on the function name."""
-        formatter_method = getattr(
-            ResponseFormatter, 
-            f"format_{function_name}", 
-            ResponseFormatter.format_generic
-        )
+        if isinstance(result, ToolError):
+            return ResponseFormatter.format_generic(result)
+        formatter_method = _FORMATTERS.get(function_name, ResponseFormatter.format_generic)
         return formatter_method(result)
     
     @staticmethod
     def format_generic(result: Any) -> str:
         """Generic formatter for any result."""
-        if isinstance(result, dict) and result.get("skip_response", False):
-            return ""
-        
-        if isinstance(result, dict) and "error" in result:
+        if isinstance(result, ToolError):
             return f"Merci De poser une autre question, je ne peux t'aider en cela"
             
         return ""
@@ -31,113 +28,71 @@ class ResponseFormatter:
     @staticmethod
     def format_get_account_balance(result: Any) -> str:
         """Format account balance information."""
-        try:
-            # If it's a dictionary with balance info
-            if isinstance(result, dict):
-                if 'balance' in result:
-                    return (f"Your {result.get('account_name', 'account')} "
-                           f"({result.get('account_number', '')}) has a balance of "
-                           f"{result.get('balance', '')} {result.get('currency', 'CAD')}.")
-            
-            # If it's a list, try to find the first item with balance info
-            if isinstance(result, list):
-                for item in result:
-                    if isinstance(item, dict) and 'balance' in item:
-                        return (f"Your {item.get('account_name', 'account')} "
-                               f"({item.get('account_number', '')}) has a balance of "
-                               f"{item.get('balance', '')} {item.get('currency', 'CAD')}.")
-            
-            # If we couldn't extract structured data, return a generic message
-            return "I found your account balance information."
-        except Exception as e:
-            print(f"Error formatting balance: {e}")
+        if not isinstance(result, BalanceResult):
             return "I found your account balance information."
+        if len(result.balances) == 1 and not result.not_found:
+            # The usual case: a single account
+            item = result.balances[0]
+            return f"Your {item.account_name} ({item.account_number}) has a balance of {item.balance} {item.currency}."
+        lines = [f"Your {item.account_name} ({item.account_number}) has a balance of {item.balance} {item.currency}."
+                 for item in result.balances]
+        for account_number in result.not_found:
+            lines.append(f"I couldn't find account {account_number}.")
+        return "\n".join(lines) if lines else "I couldn't find these accounts."
     
     @staticmethod
     def format_list_user_accounts(result: Any) -> str:
         """Format a list of accounts."""
-        try:
-            accounts = ResponseFormatter._extract_accounts(result)
-            if accounts and len(accounts) > 0:
-                account_lines = ["Here are your accounts:"]
-                for account in accounts:
-                    account_lines.append(
-                        f"- {account.get('account_name', 'Account')} "
-                        f"({account.get('account_number', '')})"
-                    )
-                return "\n".join(account_lines)
-            else:
-                return "You don't have any accounts set up yet."
-        except Exception as e:
-            print(f"Error formatting accounts: {e}")
+        if not isinstance(result, AccountList):
             return "I found your accounts but couldn't format them properly."
+        if not result.accounts:
+            return "You don't have any accounts set up yet."
+        account_lines = ["Here are your accounts:"]
+        for account in result.accounts:
+            account_lines.append(f"- {account.account_name} ({account.account_number})")
+        return "\n".join(account_lines)
     
     @staticmethod
     def format_transfer_funds(result: Any) -> str:
         """Format transfer result."""
-        try:
-            if isinstance(result, str):
-                if "Transferred" in result:
-                    return result
-                elif "failed" in result:
-                    return result
-                else:
-                    return "I've completed the transfer for you."
-            else:
-                return "I've completed the transfer for you."
-        except Exception as e:
-            print(f"Error formatting transfer result: {e}")
+        if not isinstance(result, TransferResult):
             return "The transfer has been processed."
+        if result.ok:
+            return f"✅ Transferred {result.currency}{result.amount} from {result.from_account} to {result.to_account}."
+        return f"❌ Transfer failed: {result.message}"
     
     @staticmethod
     def format_get_transaction_history(result: Any) -> str:
         """Format transaction history."""
-        try:
-            # Handle both list and single transaction object formats
-            transactions = []
-            
-            if isinstance(result, list):
-                transactions = result
-            elif isinstance(result, dict):
-                # Single transaction as a dict
-                transactions = [result]
-            elif isinstance(result, str):
-                # Try to parse JSON string
-                try:
-                    json_data = json.loads(result)
-                    if isinstance(json_data, list):
-                        transactions = json_data
-                    elif isinstance(json_data, dict):
-                        transactions = [json_data]
-                except:
-                    pass
-            
-            if transactions and len(transactions) > 0:
-                lines = ["Here are the recent transactions for your account:"]
-                for i, transaction in enumerate(transactions[:5]):  # Show only first 5 transactions
-                    date = transaction.get('date', 'Unknown date')
-                    desc = transaction.get('description', 'Transaction')
-                    amount = transaction.get('amount', '0.00')
-                    lines.append(f"- {date}: {desc}: MAD{amount}")
-                if len(transactions) > 5:
-                    lines.append(f"...and {len(transactions) - 5} more transactions.")
-                return "\n".join(lines)
-            else:
-                return "I couldn't find any transactions for this account."
-        except Exception as e:
-            print(f"Error formatting transaction history: {e}")
+        if not isinstance(result, TransactionPage):
             return "I found your transaction history but couldn't format it properly."
+        transactions = result.transactions
+        if not transactions:
+            return "I couldn't find any transactions for this account."
+        lines = ["Here are the recent transactions for your account:"]
+        for transaction in transactions[:5]:  # Show only first 5 transactions
+            lines.append(f"- {transaction.date}: {transaction.description}: MAD{transaction.amount}")
+        if len(transactions) > 5:
+            lines.append(f"...and {len(transactions) - 5} more transactions.")
+        if result.next_cursor:
+            lines.append("Older transactions are available, just ask to see more.")
+        return "\n".join(lines)
     
     @staticmethod
     def format_answer_banking_question(result: Any) -> str:
-        """Format RAG answer - MODIFIÉ pour permettre les questions générales."""
+        """Format RAG answer - MODIFIÉ pour permettre les questions générales.
+        
+        Accepts the RagAnswer of the tool, or the dict of S2MChatbot.answer_question.
+        """
         try:
-            if isinstance(result, dict) and "answer" in result:
-                answer = result["answer"]
-                question_type = result.get("type", "banking")
+            if not isinstance(result, RagAnswer) and isinstance(result, dict) and "answer" in result:
+                result = RagAnswer.from_rag_result(result)
+            if isinstance(result, RagAnswer):
+                answer = result.answer
+                question_type = result.answer_type
                 
                 # NOUVEAU: Si c'est une question générale, retourner directement la réponse
-                if question_type in ["general", "fallback", "forced_general"]:
+                if question_type in GENERAL_ANSWER_TYPES:
                     return answer
                 
                 # Pour les questions bancaires, garder la logique existante mais plus permissive
@@ -151,8 +106,8 @@ class ResponseFormatter:
                     response = answer
                 
                 # Ajouter les sources seulement pour les questions bancaires
-                if question_type == "banking" and "sources" in result and result["sources"]:
-                    sources = result["sources"]
+                if question_type == "banking" and result.sources:
+                    sources = result.sources
                     if len(sources) == 1:
                         # Truncate long source URLs if needed
                         source = sources[0]
@@ -174,13 +129,10 @@ class ResponseFormatter:
                         response += sources_html
                 
                 return response
+            elif isinstance(result, str) and result:
+                return result
             else:
-                # Try to extract answer from complex object
-                answer = ResponseFormatter._extract_rag_answer(result)
-                if answer:
-                    return answer
-                else:
-                    return "I couldn't find specific information about that in my knowledge base."
+                return "I couldn't find specific information about that in my knowledge base."
         except Exception as e:
             print(f"Error formatting RAG answer: {e}")
             return "I found some information but couldn't format it properly."
@@ -199,42 +151,10 @@ class ResponseFormatter:
         except Exception as e:
             print(f"Error formatting general answer: {e}")
             return "I encountered an error while processing your question."
-    
-    @staticmethod
-    def _extract_accounts(result: Any) -> List[Dict[str, Any]]:
-        """Extract accounts from a complex result object."""
-        accounts = []
-        
-        # If result is a list of dictionaries
-        if isinstance(result, list):
-            for item in result:
-                if isinstance(item, dict) and 'account_name' in item and 'account_number' in item:
-                    accounts.append(item)
-        
-        # If result is a dictionary with account info
-        elif isinstance(result, dict) and 'account_name' in result and 'account_number' in result:
-            accounts.append(result)
-        
-        return accounts
-    
-    @staticmethod
-    def _extract_rag_answer(result: Any) -> Optional[str]:
-        """Extract the answer from a RAG result."""
-        try:
-            # If it's a dictionary with an answer
-            if isinstance(result, dict) and 'answer' in result:
-                return result['answer']
-            
-            # If it's a list, try to find the first item with an answer
-            if isinstance(result, list):
-                for item in result:
-                    if isinstance(item, dict) and 'answer' in item:
-                        return item['answer']
-            
-            # If it's a string, return it directly
-            if isinstance(result, str):
-                return result
-            
-            return None
-        except:
-            return None
\ No newline at end of file
+
+
+# Tool name -> formatter (format_<tool name> methods)
+_FORMATTERS = {
+    name[len("format_"):]: getattr(ResponseFormatter, name)
+    for name in vars(ResponseFormatter) if name.startswith("format_")
+}
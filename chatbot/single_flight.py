@@ -0,0 +1,144 @@
+"""Coalescing of identical concurrent LLM calls.
+
+During a burst (product launch, outage) many users ask the same thing at the
+same time. Without coalescing each request pays for its own identical LLM call;
+with it, the first request (the leader) runs the call and the requests that
+arrive while it is in flight wait for its result instead.
+
+Calls are identified by prompt_key(): a hash of the model parameters and of the
+whitespace/case-normalized prompt. Only the in-flight call is shared; once it
+completes the next identical request runs again (the response cache keeps
+finished answers).
+
+  * AsyncSingleFlight: for coroutines, on one event loop (banking assistant);
+  * SingleFlight: for blocking calls, across threads (RAG chain in the MCP server).
+"""
+import asyncio
+import hashlib
+import json
+import threading
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+
+def prompt_key(*parts) -> str:
+    """Key of an LLM call: model parameters and prompt, normalized and hashed."""
+    normalized = [" ".join(part.split()).casefold() if isinstance(part, str) else part for part in parts]
+    return hashlib.sha256(json.dumps(normalized, default=str).encode()).hexdigest()
+
+
+class _FlightMetrics:
+    """Counters shared by both implementations."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._metrics_lock = threading.Lock()
+        self._metrics = {"requests": 0, "executions": 0, "coalesced": 0, "errors": 0}
+
+    def _count(self, key: str):
+        with self._metrics_lock:
+            self._metrics[key] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the request, execution and coalescing counters."""
+        with self._metrics_lock:
+            stats = dict(self._metrics)
+        stats["name"] = self.name
+        stats["in_flight"] = len(self._calls)
+        stats["coalesced_rate"] = stats["coalesced"] / stats["requests"] if stats["requests"] else 0.0
+        return stats
+
+
+class AsyncSingleFlight(_FlightMetrics):
+    """Share one in-flight coroutine between concurrent callers with the same key."""
+
+    def __init__(self, name: str = "async"):
+        super().__init__(name)
+        self._calls: Dict[str, asyncio.Task] = {}
+
+    async def do(self, key: str, call: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Run call() unless an identical call is already in flight, and return its result.
+
+        The call runs in its own task: a caller that is cancelled does not cancel
+        it for the others.
+
+        :param key: Key of the call (see prompt_key)
+        :param call: Function returning the coroutine to run
+        :return: (result, shared); shared is True if the result came from another caller's call
+        """
+        self._count("requests")
+        loop = asyncio.get_running_loop()
+        task = self._calls.get(key)
+        if task is not None and task.get_loop() is loop:
+            self._count("coalesced")
+            return await asyncio.shield(task), True
+
+        self._count("executions")
+        task = loop.create_task(call())
+        self._calls[key] = task
+        task.add_done_callback(lambda done: self._finish(key, done))
+        return await asyncio.shield(task), False
+
+    def _finish(self, key: str, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Retrieving the exception also silences "exception was never retrieved"
+        if not task.cancelled() and task.exception() is not None:
+            self._count("errors")
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight(_FlightMetrics):
+    """Share one in-flight blocking call between threads with the same key."""
+
+    def __init__(self, name: str = "thread"):
+        super().__init__(name)
+        self._calls: Dict[str, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, fn: Callable[..., Any], *args, **kwargs) -> Tuple[Any, bool]:
+        """
+        Run fn(*args, **kwargs) unless an identical call is already in flight, and return its result.
+
+        :param key: Key of the call (see prompt_key)
+        :return: (result, shared); shared is True if the result came from another thread's call
+        """
+        self._count("requests")
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            self._count("coalesced")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        self._count("executions")
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result, False
+        except BaseException as e:
+            call.error = e
+            self._count("errors")
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+# Process-wide flights
+general_question_flight = AsyncSingleFlight("general")
+rag_flight = SingleFlight("rag")
@@ -0,0 +1,237 @@
+"""Typed results of the MCP tools.
+
+Each tool returns one of the result classes below. Over SSE the result is
+encoded once by the server into a compact JSON array,
+
+    [tag, schema version, [field values...]]
+
+with nested results as arrays of field values too, and decoded once by the
+client (decode_result). The in-process transport passes the objects as they
+are. The formatter and the agent loop then read typed attributes instead of
+guessing the shape of parsed JSON.
+
+A change to the fields of a class must bump its SCHEMA_VERSION: a client
+refuses to decode a version it does not know.
+
+The server registers the tools with register_typed_tool.
+"""
+import functools
+import inspect
+import json
+from dataclasses import dataclass, asdict, fields
+from itertools import starmap
+from operator import attrgetter
+from typing import Any, ClassVar, Dict, Optional, Tuple
+
+
+@dataclass(slots=True)
+class AccountBalance:
+    account_number: str
+    account_name: str
+    balance: str
+    currency: str = "MAD"
+
+
+@dataclass(slots=True)
+class AccountSummary:
+    account_number: str
+    account_name: str
+    balance: str
+
+
+@dataclass(slots=True)
+class Transaction:
+    transaction_id: str
+    date: str
+    description: str
+    amount: str
+    transaction_type: str
+    balance_after: str
+
+
+@dataclass(slots=True)
+class BalanceResult:
+    """Result of get_account_balance (one or several accounts)."""
+    TAG: ClassVar[str] = "balance"
+    SCHEMA_VERSION: ClassVar[int] = 1
+    NESTED: ClassVar[Dict[str, type]] = {"balances": AccountBalance, "not_found": str}
+
+    balances: Tuple[AccountBalance, ...]
+    not_found: Tuple[str, ...] = ()
+
+
+@dataclass(slots=True)
+class AccountList:
+    """Result of list_user_accounts and list_target_accounts."""
+    TAG: ClassVar[str] = "accounts"
+    SCHEMA_VERSION: ClassVar[int] = 1
+    NESTED: ClassVar[Dict[str, type]] = {"accounts": AccountSummary}
+
+    accounts: Tuple[AccountSummary, ...]
+
+
+@dataclass(slots=True)
+class TransactionPage:
+    """Result of get_transaction_history."""
+    TAG: ClassVar[str] = "transactions"
+    SCHEMA_VERSION: ClassVar[int] = 1
+    NESTED: ClassVar[Dict[str, type]] = {"transactions": Transaction}
+
+    transactions: Tuple[Transaction, ...]
+    next_cursor: Optional[str] = None
+
+
+@dataclass(slots=True)
+class TransferResult:
+    """Result of transfer_funds."""
+    TAG: ClassVar[str] = "transfer"
+    SCHEMA_VERSION: ClassVar[int] = 1
+    NESTED: ClassVar[Dict[str, type]] = {}
+
+    ok: bool
+    from_account: str
+    to_account: str
+    amount: str
+    currency: str = "MAD"
+    message: str = ""
+
+
+@dataclass(slots=True)
+class RagAnswer:
+    """Result of answer_banking_question."""
+    TAG: ClassVar[str] = "rag"
+    SCHEMA_VERSION: ClassVar[int] = 1
+    NESTED: ClassVar[Dict[str, type]] = {"sources": str}
+
+    answer: str
+    sources: Tuple[str, ...] = ()
+    answer_type: str = "banking"
+
+    @classmethod
+    def from_rag_result(cls, result: Dict[str, Any]) -> "RagAnswer":
+        """Build from the dict returned by S2MChatbot.answer_question."""
+        return cls(
+            answer=result.get("answer", ""),
+            sources=tuple(result.get("sources") or ()),
+            answer_type=result.get("type", "banking")
+        )
+
+
+@dataclass(slots=True)
+class ToolError:
+    """A tool call that failed (server error, timeout, unknown tool...)."""
+    TAG: ClassVar[str] = "error"
+    SCHEMA_VERSION: ClassVar[int] = 1
+    NESTED: ClassVar[Dict[str, type]] = {}
+
+    message: str
+
+
+RESULT_TYPES = {cls.TAG: cls for cls in (BalanceResult, AccountList, TransactionPage, TransferResult, RagAnswer, ToolError)}
+ToolResult = (BalanceResult, AccountList, TransactionPage, TransferResult, RagAnswer, ToolError)
+
+
+def _getter(cls):
+    """Function returning the tuple of the field values of an object of cls, in wire order."""
+    names = [field.name for field in fields(cls)]
+    if len(names) == 1:
+        # attrgetter of a single name returns the value itself, not a tuple
+        name = names[0]
+        return lambda obj: (getattr(obj, name),)
+    return attrgetter(*names)
+
+
+_GETTERS = {cls: _getter(cls) for cls in (*RESULT_TYPES.values(), AccountBalance, AccountSummary, Transaction)}
+# (position, item class) of the nested fields of each result class
+_NESTED = {cls: tuple((index, cls.NESTED[field.name]) for index, field in enumerate(fields(cls))
+                      if field.name in cls.NESTED)
+           for cls in RESULT_TYPES.values()}
+
+
+def _decoder(cls):
+    """Function building an object of cls from its decoded field values."""
+    nested = _NESTED[cls]
+    if not nested:
+        # Flat result (transfer, error): the values are the arguments as they are
+        return lambda values: cls(*values)
+    if len(nested) == 1:
+        (index, item_cls), = nested
+        if item_cls is str:
+            def decode(values):
+                values[index] = tuple(values[index])
+                return cls(*values)
+        else:
+            def decode(values):
+                values[index] = tuple(starmap(item_cls, values[index]))
+                return cls(*values)
+        return decode
+
+    def decode(values):
+        for index, item_cls in nested:
+            if item_cls is str:
+                values[index] = tuple(values[index])
+            else:
+                values[index] = tuple(starmap(item_cls, values[index]))
+        return cls(*values)
+    return decode
+
+
+# tag -> (schema version, decoder)
+_DECODERS = {tag: (cls.SCHEMA_VERSION, _decoder(cls)) for tag, cls in RESULT_TYPES.items()}
+_json_decode = json.JSONDecoder().decode
+
+
+def encode_result(result) -> str:
+    """Encode a tool result as [tag, version, [fields...]] (compact JSON)."""
+    cls = type(result)
+    values = list(_GETTERS[cls](result))
+    for index, item_cls in _NESTED[cls]:
+        if item_cls is not str:
+            getter = _GETTERS[item_cls]
+            values[index] = [getter(item) for item in values[index]]
+    return json.dumps([cls.TAG, cls.SCHEMA_VERSION, values], separators=(",", ":"), ensure_ascii=False)
+
+
+def decode_result(text: str):
+    """
+    Decode a result encoded by encode_result.
+
+    :raise ValueError: if the text is not an encoded result, or its tag or version is unknown
+    """
+    try:
+        tag, version, values = _json_decode(text)
+        expected_version, decode = _DECODERS[tag]
+    except (TypeError, ValueError, KeyError) as e:  # JSONDecodeError is a ValueError
+        raise ValueError(f"Not an encoded tool result: {text[:80]!r}") from e
+    if version != expected_version:
+        raise ValueError(f"Unsupported {tag} result version {version} (expected {expected_version})")
+    return decode(values)
+
+
+def result_to_json(result) -> str:
+    """Readable JSON of a result (field names included), as sent back to the model in tool messages."""
+    if isinstance(result, ToolError):
+        return json.dumps({"error": result.message}, ensure_ascii=False)
+    return json.dumps(asdict(result), ensure_ascii=False)
+
+
+def register_typed_tool(server, function):
+    """
+    Register a function returning a typed result as a tool of a FastMCP server.
+
+    The MCP clients receive the result encoded once by encode_result, as plain
+    text: no output schema, so no structured copy of the result and no JSON
+    schema validation of every call by the client. The function itself is
+    returned unchanged, so in-process callers get the typed object.
+    """
+    @functools.wraps(function)
+    def encoded(*args, **kwargs):
+        return encode_result(function(*args, **kwargs))
+
+    # Same parameters (and input schema) as the function, text result
+    encoded.__signature__ = inspect.signature(function).replace(return_annotation=str)
+    try:
+        server.tool(structured_output=False)(encoded)
+    except TypeError:  # SDKs without structured output
+        server.tool()(encoded)
+    return function
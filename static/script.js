@@ -160,6 +160,63 @@ function removeTypingIndicator() {
   }
 }
 
+// Render a Server-Sent Events reply from /chat/stream into a single bot message
+async function renderChatStream(res) {
+  const chatBox = document.getElementById('chat-box');
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  let msgElem = null;
+  let buffer = '';
+  let text = '';
+  let renderPending = false;
+
+  function render() {
+    renderPending = false;
+    if (!msgElem) {
+      removeTypingIndicator();
+      msgElem = document.createElement('div');
+      msgElem.classList.add('message', 'bot-message');
+      chatBox.appendChild(msgElem);
+    }
+    msgElem.innerHTML = parseMarkdown(text);
+    chatBox.scrollTop = chatBox.scrollHeight;
+  }
+
+  function scheduleRender() {
+    if (!renderPending) {
+      renderPending = true;
+      requestAnimationFrame(render);
+    }
+  }
+
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    // Events are separated by a blank line
+    let boundary;
+    while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+      const rawEvent = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      const dataLine = rawEvent.split('\n').find(line => line.startsWith('data: '));
+      if (!dataLine) continue;
+      const event = JSON.parse(dataLine.slice(6));
+
+      if (event.type === 'token') {
+        text += event.content;
+      } else if (event.type === 'tool' || event.type === 'error') {
+        text += (text ? '\n' : '') + event.content;
+      } else if (event.type === 'done') {
+        text = event.content;
+      }
+      scheduleRender();
+    }
+  }
+
+  render();
+}
+
 // Send a chat message to the backend
 async function sendMessage() {
   const input = document.getElementById('message');
@@ -179,7 +236,7 @@ async function sendMessage() {
     // Show typing indicator
     showTypingIndicator();
     
-    const res = await fetch('/chat', {
+    const res = await fetch('/chat/stream', {
       method: 'POST',
       headers: {
         'Content-Type': 'application/json',
@@ -188,13 +245,15 @@ async function sendMessage() {
       body: JSON.stringify({ message })
     });
     
-    const data = await res.json();
-    
-    // Remove typing indicator after we get the response
-    removeTypingIndicator();
+    if (!res.ok || !res.body) {
+      const data = await res.json();
+      removeTypingIndicator();
+      appendMessage('Bot', data.reply);
+      return;
+    }
     
-    // Display the bot's response
-    appendMessage('Bot', data.reply);
+    // Render the bot's response incrementally as events arrive
+    await renderChatStream(res);
   } catch (err) {
     // Remove typing indicator
     removeTypingIndicator();